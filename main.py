@@ -1,4 +1,8 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, status
+from src.conf.config import settings
 from src.api import contacts, auth, users
 
 from starlette.responses import JSONResponse
@@ -6,7 +10,58 @@ from slowapi.errors import RateLimitExceeded
 
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+from src.services.admission import AdmissionControlMiddleware
+from src.services.birthdays import birthday_digest
+from src.services.auth import benchmark_token_verification, configure_password_policy
+from src.services.cache import cache
+from src.services.deadline import DeadlineMiddleware
+from src.services.email import email_queue, precompile_templates
+from src.services.limiter import limiter
+from src.services.refresh_tokens import refresh_token_purge
+from src.services.reminders import birthday_reminders
+from src.services.revocation import revocation_list
+from src.services.scheduler import scheduler
+from src.services.storage import CachedStaticFiles
+from src.services.tracing import TracingMiddleware, configure_logging, tracer
+from src.services.warmup import cache_warmer
+
+logger = logging.getLogger(__name__)
+
+scheduler.daily("birthday-digest", birthday_digest.refresh_all)
+scheduler.daily("birthday-reminders", birthday_reminders.send, require_lock=True)
+scheduler.daily("refresh-token-purge", refresh_token_purge.run, require_lock=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запуск і зупинка фонових воркерів додатка.
+    """
+    configure_logging()
+    precompile_templates()
+    configure_password_policy()
+    logger.info(
+        "JWT verification cost: %.1f us per token",
+        benchmark_token_verification() * 1_000_000,
+    )
+    await revocation_list.load()
+    revocation_list.start()
+    cache.start()
+    cache_warmer.start(settings.WARMUP_STARTUP_USERS)
+    email_queue.start()
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    yield
+    await scheduler.stop()
+    await email_queue.stop()
+    await cache_warmer.stop()
+    await cache.stop()
+    await revocation_list.stop()
+    tracer.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+app.state.limiter = limiter
 
 origins = ["<http://localhost:8000>"]
 
@@ -16,7 +71,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Total-Count-Estimated"],
 )
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(TracingMiddleware)
 
 
 @app.exception_handler(RateLimitExceeded)
@@ -31,6 +90,13 @@ app.include_router(contacts.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 
+if settings.AVATAR_STORAGE == "local":
+    app.mount(
+        settings.AVATAR_URL_PREFIX,
+        CachedStaticFiles(directory=settings.AVATAR_LOCAL_DIR, check_dir=False),
+        name="avatars",
+    )
+
 if __name__ == "__main__":
     import uvicorn
 
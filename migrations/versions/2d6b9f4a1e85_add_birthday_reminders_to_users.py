@@ -0,0 +1,36 @@
+"""add birthday_reminders to users
+
+Revision ID: 2d6b9f4a1e85
+Revises: e3a8c5d1f702
+Create Date: 2026-10-19 16:40:27.551306
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "2d6b9f4a1e85"
+down_revision: Union[str, None] = "e3a8c5d1f702"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column(
+            "birthday_reminders",
+            sa.Boolean(),
+            server_default=sa.false(),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "birthday_reminders")
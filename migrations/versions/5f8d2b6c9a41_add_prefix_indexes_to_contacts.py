@@ -0,0 +1,41 @@
+"""add prefix search indexes to contacts
+
+Revision ID: 5f8d2b6c9a41
+Revises: c7e1a4b8d3f6
+Create Date: 2026-10-19 19:12:48.306172
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5f8d2b6c9a41"
+down_revision: Union[str, None] = "c7e1a4b8d3f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ("first_name", "last_name", "email")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # text_pattern_ops дозволяє використовувати індекс для LIKE 'abc%'
+    # незалежно від правил сортування бази даних (лише PostgreSQL).
+    ops = " text_pattern_ops" if op.get_bind().dialect.name == "postgresql" else ""
+    for column in COLUMNS:
+        op.create_index(
+            f"ix_contact_book_user_id_{column}_lower",
+            "contact_book",
+            ["user_id", sa.text(f"lower({column}){ops}")],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in COLUMNS:
+        op.drop_index(
+            f"ix_contact_book_user_id_{column}_lower", table_name="contact_book"
+        )
@@ -0,0 +1,30 @@
+"""add avatar_hash to User
+
+Revision ID: 7c3e91a2d5b4
+Revises: 32f0ac448d0a
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7c3e91a2d5b4"
+down_revision: Union[str, None] = "32f0ac448d0a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users", sa.Column("avatar_hash", sa.String(length=64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "avatar_hash")
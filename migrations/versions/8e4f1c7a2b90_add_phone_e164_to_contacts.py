@@ -0,0 +1,109 @@
+"""add phone_e164 to contacts
+
+Revision ID: 8e4f1c7a2b90
+Revises: 5f8d2b6c9a41
+Create Date: 2026-10-19 20:31:15.774028
+
+"""
+
+import re
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4f1c7a2b90"
+down_revision: Union[str, None] = "5f8d2b6c9a41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+# Код країни для номерів без нього; змінюється через 'alembic -x phone_country_code=...'.
+DEFAULT_COUNTRY_CODE = "380"
+
+
+def normalize_phone(raw: str | None, country_code: str) -> str | None:
+    # Навмисна копія src.utils.phone.normalize_phone на момент міграції:
+    # результат міграції не має залежати від подальших змін коду додатка,
+    # тож розбіжність з пізнішими версіями функції очікувана.
+    if not raw:
+        return None
+    raw = raw.strip()
+    digits = re.sub(r"\D", "", raw)
+    if raw.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith(country_code):
+        pass
+    elif digits.startswith("0"):
+        digits = country_code + digits[1:]
+    else:
+        digits = country_code + digits
+    if not 8 <= len(digits) <= 15 or digits[0] == "0":
+        return None
+    return "+" + digits
+
+
+def backfill_phone_e164(conn: sa.Connection, country_code: str) -> None:
+    """
+    Заповнення phone_e164 для наявних контактів порціями по BATCH_SIZE.
+    """
+    contacts = sa.table(
+        "contact_book",
+        sa.column("id", sa.Integer),
+        sa.column("phone", sa.String),
+        sa.column("phone_e164", sa.String),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(contacts.c.id, contacts.c.phone)
+            .where(contacts.c.id > last_id)
+            .order_by(contacts.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        updates = [
+            {"row_id": row.id, "e164": normalize_phone(row.phone, country_code)}
+            for row in rows
+        ]
+        conn.execute(
+            contacts.update()
+            .where(contacts.c.id == sa.bindparam("row_id"))
+            .values(phone_e164=sa.bindparam("e164")),
+            updates,
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Заповнення phone_e164 читає рядки з бази даних, тому в офлайн-режимі
+    ('alembic upgrade --sql') генерується лише зміна схеми: у такому разі
+    наявні контакти залишаються з phone_e164 = NULL і не знаходяться
+    пошуком за номером, доки заповнення не виконано окремо функцією
+    backfill_phone_e164 з підключенням до бази даних.
+    """
+    op.add_column(
+        "contact_book", sa.Column("phone_e164", sa.String(length=16), nullable=True)
+    )
+    if not context.is_offline_mode():
+        country_code = context.get_x_argument(as_dictionary=True).get(
+            "phone_country_code", DEFAULT_COUNTRY_CODE
+        )
+        backfill_phone_e164(op.get_bind(), country_code)
+    op.create_index(
+        "ix_contact_book_user_id_phone_e164",
+        "contact_book",
+        ["user_id", "phone_e164"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_contact_book_user_id_phone_e164", table_name="contact_book")
+    op.drop_column("contact_book", "phone_e164")
@@ -0,0 +1,46 @@
+"""add case-insensitive unique indexes to users
+
+Revision ID: 9b2f6c4e8a17
+Revises: 4a9d2e7f1c03
+Create Date: 2026-10-19 13:21:44.907315
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9b2f6c4e8a17"
+down_revision: Union[str, None] = "4a9d2e7f1c03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Міграція не виконається, якщо вже існують email або імена, що
+    відрізняються лише регістром: такі записи потрібно об'єднати вручну.
+    Чутливі до регістру обмеження унікальності з 5e7ee74e8096 видаляються:
+    функціональні індекси їх покривають, а підтримка обох лише сповільнює
+    запис. Назви обмежень - стандартні назви PostgreSQL для безіменних
+    UNIQUE.
+    """
+    op.create_index(
+        "ix_users_email_lower", "users", [sa.text("lower(email)")], unique=True
+    )
+    op.create_index(
+        "ix_users_username_lower", "users", [sa.text("lower(username)")], unique=True
+    )
+    op.drop_constraint("users_email_key", "users", type_="unique")
+    op.drop_constraint("users_username_key", "users", type_="unique")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint("users_username_key", "users", ["username"])
+    op.create_unique_constraint("users_email_key", "users", ["email"])
+    op.drop_index("ix_users_username_lower", table_name="users")
+    op.drop_index("ix_users_email_lower", table_name="users")
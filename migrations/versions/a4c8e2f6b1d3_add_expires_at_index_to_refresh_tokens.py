@@ -0,0 +1,33 @@
+"""add expires_at index to refresh_tokens
+
+Revision ID: a4c8e2f6b1d3
+Revises: 8e4f1c7a2b90
+Create Date: 2026-10-19 17:42:08.316524
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c8e2f6b1d3"
+down_revision: Union[str, None] = "8e4f1c7a2b90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_refresh_tokens_expires_at"),
+        "refresh_tokens",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_refresh_tokens_expires_at"), table_name="refresh_tokens")
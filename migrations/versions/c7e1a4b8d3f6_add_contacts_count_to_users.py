@@ -0,0 +1,35 @@
+"""add contacts_count to users
+
+Revision ID: c7e1a4b8d3f6
+Revises: 2d6b9f4a1e85
+Create Date: 2026-10-19 17:55:03.127640
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e1a4b8d3f6"
+down_revision: Union[str, None] = "2d6b9f4a1e85"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("contacts_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        "UPDATE users SET contacts_count = "
+        "(SELECT count(*) FROM contact_book WHERE contact_book.user_id = users.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "contacts_count")
@@ -0,0 +1,49 @@
+"""add birthday_md to contacts
+
+Revision ID: e3a8c5d1f702
+Revises: 9b2f6c4e8a17
+Create Date: 2026-10-19 15:02:11.418903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e3a8c5d1f702"
+down_revision: Union[str, None] = "9b2f6c4e8a17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "contact_book", sa.Column("birthday_md", sa.SmallInteger(), nullable=True)
+    )
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(
+            "UPDATE contact_book SET birthday_md = "
+            "CAST(strftime('%m', birthday) AS INTEGER) * 100 "
+            "+ CAST(strftime('%d', birthday) AS INTEGER)"
+        )
+    else:
+        op.execute(
+            "UPDATE contact_book SET birthday_md = "
+            "EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday)"
+        )
+    op.create_index(
+        "ix_contact_book_user_id_birthday_md",
+        "contact_book",
+        ["user_id", "birthday_md"],
+    )
+    op.create_index("ix_contact_book_birthday_md", "contact_book", ["birthday_md"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_contact_book_birthday_md", table_name="contact_book")
+    op.drop_index("ix_contact_book_user_id_birthday_md", table_name="contact_book")
+    op.drop_column("contact_book", "birthday_md")
@@ -6,24 +6,61 @@ from fastapi import (
     BackgroundTasks,
     Request,
 )
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
-from src.schemas import UserCreate, Token, User, RequestEmail, ResetPassword
+from src.schemas import (
+    UserCreate,
+    Token,
+    User,
+    RequestEmail,
+    ResetPassword,
+    RefreshTokenRequest,
+)
 from src.services.auth import (
     create_access_token,
     Hash,
     get_email_from_token,
     get_password_from_token,
+    get_token_payload,
+    get_current_user,
 )
 from src.services.users import UserService
+from src.services.refresh_tokens import RefreshTokenService
 from src.services.email import send_email, send_reset_password_email
+from src.services.cache import cache, principal_key
+from src.services.limiter import limiter
+from src.services.warmup import warm_up_after_login
+from src.services.revocation import revocation_list
+from src.conf.config import settings
 from src.database.db import get_db
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def registration_conflict(users: list, user_data: UserCreate) -> HTTPException | None:
+    """
+    Формування відповіді 409 для користувачів, що вже мають такий email або ім'я.
+
+    Конфлікт за email має пріоритет над конфліктом за ім'ям. Порівняння
+    не враховує регістр, як і унікальні індекси таблиці users.
+    """
+    if any(user.email.lower() == user_data.email.lower() for user in users):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Користувач з таким email вже існує",
+        )
+    if any(user.username.lower() == user_data.username.lower() for user in users):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Користувач з таким іменем вже існує",
+        )
+    return None
+
+
 @router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
+@limiter.limit(settings.RATE_LIMIT_REGISTER)
 async def register_user(
     user_data: UserCreate,
     background_tasks: BackgroundTasks,
@@ -33,6 +70,9 @@ async def register_user(
     """
     Реєстрація нового користувача.
 
+    Обмеження:
+    - Кількість реєстрацій з однієї адреси обмежена RATE_LIMIT_REGISTER.
+
     Параметри:
     - user_data: Дані нового користувача.
     - background_tasks: Об'єкт для виконання фонових задач.
@@ -40,25 +80,30 @@ async def register_user(
     - db: Сесія бази даних.
 
     Повертає:
-    - User: Дані зареєстрованого користувача, або HTTPException (409), якщо користувач з таким email вже існує.
+    - User: Дані зареєстрованого користувача, або HTTPException (409), якщо користувач з таким email або ім'ям вже існує.
     """
     user_service = UserService(db)
 
-    email_user = await user_service.get_user_by_email(user_data.email)
-    if email_user:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Користувач з таким email вже існує",
-        )
+    existing = await user_service.get_users_by_email_or_username(
+        user_data.email, user_data.username
+    )
+    conflict = registration_conflict(existing, user_data)
+    if conflict:
+        raise conflict
 
-    username_user = await user_service.get_user_by_username(user_data.username)
-    if username_user:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Користувач з таким іменем вже існує",
-        )
     user_data.password = Hash().get_password_hash(user_data.password)
-    new_user = await user_service.create_user(user_data)
+    try:
+        new_user = await user_service.create_user(user_data)
+    except IntegrityError:
+        # Паралельна реєстрація з тими самими даними пройшла перевірку раніше.
+        existing = await user_service.get_users_by_email_or_username(
+            user_data.email, user_data.username
+        )
+        conflict = registration_conflict(existing, user_data)
+        if conflict is None:
+            raise
+        raise conflict
+    await cache.delete(principal_key(new_user.username))
     background_tasks.add_task(
         send_email, new_user.email, new_user.username, request.base_url
     )
@@ -67,22 +112,36 @@ async def register_user(
 
 
 @router.post("/login", response_model=Token)
+@limiter.limit(settings.RATE_LIMIT_LOGIN)
 async def login_user(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
 ):
     """
     Авторизація користувача.
 
+    Обмеження:
+    - Кількість спроб входу з однієї адреси обмежена RATE_LIMIT_LOGIN.
+
     Параметри:
+    - request: HTTP-запит для відстеження ліміту.
+    - background_tasks: Об'єкт для виконання фонових задач (прогрів кешу).
     - form_data: Дані для авторизації.
     - db: Сесія бази даних.
 
     Повертає:
-    - Token: JWT токен доступу, або HTTPException (401), якщо логін або пароль неправильний, або не підтверджений email.
+    - Token: JWT токен доступу і токен оновлення, або HTTPException (401), якщо логін або пароль неправильний, або не підтверджений email.
     """
     user_service = UserService(db)
     user = await user_service.get_user_by_username(form_data.username)
-    if not user or not Hash().verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = (
+        Hash().verify_and_update(form_data.password, user.hashed_password)
+        if user
+        else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неправильний логін або пароль",
@@ -95,8 +154,75 @@ async def login_user(
             detail="Електронна адреса не підтверджена",
         )
 
+    if new_hash:
+        user = await user_service.update_password_hash(user, new_hash)
     access_token = await create_access_token(data={"sub": user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
+    background_tasks.add_task(warm_up_after_login, user.id)
+    refresh_token = await RefreshTokenService(db).issue(user.id)
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_token(body: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """
+    Оновлення токену доступу без повторної перевірки пароля.
+
+    Токен оновлення одноразовий: у відповідь видається новий. Повторне
+    використання старого токена відкликає всі токени, отримані від того ж входу.
+
+    Параметри:
+    - body: Токен оновлення.
+    - db: Сесія бази даних.
+
+    Повертає:
+    - Token: Новий токен доступу і новий токен оновлення, або HTTPException (401), якщо токен оновлення недійсний.
+    """
+    username, new_refresh_token = await RefreshTokenService(db).rotate(
+        body.refresh_token
+    )
+    access_token = await create_access_token(data={"sub": username})
+    return {
+        "access_token": access_token,
+        "refresh_token": new_refresh_token,
+        "token_type": "bearer",
+    }
+
+
+@router.post("/logout")
+async def logout_user(
+    body: RefreshTokenRequest | None = None,
+    payload: dict = Depends(get_token_payload),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Вихід користувача: відкликання поточного токена доступу і токенів оновлення.
+
+    Якщо передано токен оновлення, відкликається лише його родина (вихід на
+    цьому пристрої); інакше відкликаються всі токени оновлення користувача.
+
+    Параметри:
+    - body: Токен оновлення поточного входу (необов'язково).
+    - payload: Вміст перевіреного токена доступу.
+    - user: Поточний авторизований користувач.
+    - db: Сесія бази даних.
+
+    Повертає:
+    - dict: Повідомлення про успішний вихід, або HTTPException (401), якщо токен недійсний.
+    """
+    jti = payload.get("jti")
+    if jti is not None:
+        await revocation_list.revoke(jti, payload["exp"])
+    refresh_service = RefreshTokenService(db)
+    if body is not None:
+        await refresh_service.revoke(body.refresh_token, user.id)
+    else:
+        await refresh_service.revoke_user(user.id)
+    return {"message": "Ви вийшли з системи"}
 
 
 @router.get("/confirmed_email/{token}")
@@ -156,6 +282,7 @@ async def request_email(
 
 
 @router.post("/reset_password")
+@limiter.limit(settings.RATE_LIMIT_RESET_PASSWORD)
 async def reset_password_request(
     body: ResetPassword,
     background_tasks: BackgroundTasks,
@@ -165,6 +292,9 @@ async def reset_password_request(
     """
     Запит на скидання пароля.
 
+    Обмеження:
+    - Кількість запитів з однієї адреси обмежена RATE_LIMIT_RESET_PASSWORD.
+
     Параметри:
     - body: Дані для запиту.
     - background_tasks: Об'єкт для виконання фонових задач.
@@ -203,6 +333,9 @@ async def confirm_reset_password(token: str, db: Session = Depends(get_db)):
     """
     Підтвердження скидання пароля.
 
+    Усі токени оновлення користувача відкликаються, тож вкрадений токен
+    не дає нових токенів доступу після зміни пароля.
+
     Параметри:
     - token: Токен підтвердження скидання пароля.
     - db: Сесія бази даних.
@@ -226,4 +359,5 @@ async def confirm_reset_password(token: str, db: Session = Depends(get_db)):
             detail="Користувача з такою електронною адресою не знайдено",
         )
     await user_service.reset_password(user.id, hashed_password)
+    await RefreshTokenService(db).revoke_user(user.id)
     return {"message": "Пароль успішно змінено"}
@@ -1,27 +1,54 @@
-import redis
-import pickle
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
+from src.conf.config import settings
 from src.database.db import get_db
 from src.database.models import Contact, User
 from src.services.contacts import ContactBookService
 from src.services.auth import get_current_user
-from src.schemas import ContactSet, ContactGet, ContactUpdate
+from src.services.birthdays import (
+    BIRTHDAY_MAX_DAYS,
+    BIRTHDAY_WINDOW_DAYS,
+    birthday_digest,
+)
+from src.services.cache import (
+    CONTACT_TTL,
+    CONTACTS_PAGE_TTL,
+    DEFAULT_PAGE_SIZE,
+    STATS_TTL,
+    cache,
+    contact_codec,
+    contact_key,
+    contacts_page_key,
+    invalidate_contacts,
+    phone_key,
+    stats_codec,
+    stats_key,
+)
+from src.schemas import (
+    ContactSet,
+    ContactGet,
+    ContactStats,
+    ContactSuggestion,
+    ContactUpdate,
+)
+from src.services.suggest import SUGGEST_MAX_LIMIT, contact_suggester
+from src.utils.phone import normalize_phone
 
 from typing import List
 
 
 router = APIRouter(prefix="/contacts")
-r = redis.Redis(host="localhost", port=6379, db=0)
 
 
 @router.get("/", response_model=List[ContactGet])
 async def get_all_contacts(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = DEFAULT_PAGE_SIZE,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ) -> List[Contact]:
@@ -29,8 +56,10 @@ async def get_all_contacts(
     Отримати список всіх контактів.
 
     Параметри:
+    - response: Відповідь для заголовка X-Total-Count.
     - skip: Кількість записів, які потрібно пропустити (за замовчуванням 0).
     - limit: Максимальна кількість записів, які потрібно повернути (за замовчуванням 100).
+    - include_total: Додати заголовок X-Total-Count із загальною кількістю контактів (за замовчуванням False).
     - db: Сесія бази даних.
     - user: Поточний авторизований користувач.
 
@@ -39,11 +68,25 @@ async def get_all_contacts(
     """
 
     contact_service = ContactBookService(db)
+    if include_total:
+        total = await contact_service.count_contacts(user)
+        response.headers["X-Total-Count"] = str(total)
+    cacheable = skip == 0 and limit == DEFAULT_PAGE_SIZE
+    if cacheable:
+        found, contacts = await cache.get_object(
+            contacts_page_key(user.id), contact_codec
+        )
+        if found:
+            return contacts
     contacts = await contact_service.get_all_contacts(skip, limit, user)
+    if cacheable:
+        await cache.set_object(
+            contacts_page_key(user.id), contact_codec, contacts, CONTACTS_PAGE_TTL
+        )
     return contacts
 
 
-@router.get("/{contact_id}", response_model=ContactGet)
+@router.get("/{contact_id:int}", response_model=ContactGet)
 async def get_contact(
     contact_id: int,
     db: AsyncSession = Depends(get_db),
@@ -64,14 +107,13 @@ async def get_contact(
     - HTTPException (404): Якщо контакт не знайдено.
     """
 
-    contact = r.get(f"contact:{contact_id}")
-    if contact is None:
+    key = contact_key(user.id, contact_id)
+    found, contact = await cache.get_object(key, contact_codec)
+    if not found:
         contact_service = ContactBookService(db)
         contact = await contact_service.get_contact(contact_id, user)
-        r.set(f"contact:{contact_id}", pickle.dumps(contact))
-        r.expire(f"contact:{contact_id}", 300)
-    else:
-        contact = pickle.loads(contact)
+        ttl = CONTACT_TTL if contact is not None else settings.NEGATIVE_CACHE_TTL
+        await cache.set_object(key, contact_codec, contact, ttl)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
@@ -98,10 +140,13 @@ async def create_contact(
     """
 
     contact_service = ContactBookService(db)
-    return await contact_service.create_contact(body, user)
+    contact = await contact_service.create_contact(body, user)
+    await invalidate_contacts(user.id, contact.id, phones=(contact.phone_e164,))
+    await birthday_digest.apply_change(user.id, contact.birthday)
+    return contact
 
 
-@router.patch("/{contact_id}", response_model_exclude_unset=True)
+@router.patch("/{contact_id:int}", response_model_exclude_unset=True)
 async def update_contact(
     body: ContactUpdate,
     contact_id: int,
@@ -125,15 +170,24 @@ async def update_contact(
     """
 
     contact_service = ContactBookService(db)
+    old_phone = old_birthday = None
+    if body.phone is not None or body.birthday is not None:
+        current = await contact_service.get_contact(contact_id, user)
+        if current is not None:
+            old_phone, old_birthday = current.phone_e164, current.birthday
     contact = await contact_service.update_contact(contact_id, body, user)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
+    await invalidate_contacts(
+        user.id, contact_id, phones=(old_phone, contact.phone_e164)
+    )
+    await birthday_digest.apply_change(user.id, contact.birthday, old_birthday)
     return contact
 
 
-@router.delete("/{contact_id}")
+@router.delete("/{contact_id:int}")
 async def remove_contact(
     contact_id: int,
     db: AsyncSession = Depends(get_db),
@@ -160,55 +214,160 @@ async def remove_contact(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
+    await invalidate_contacts(user.id, contact_id, phones=(contact.phone_e164,))
+    await birthday_digest.apply_change(user.id, None, contact.birthday)
     return contact
 
 
 @router.get("/birthdays/", response_model=List[ContactGet])
 async def get_birthdays(
     skip: int = 0,
-    limit: int = 100,
+    limit: int = DEFAULT_PAGE_SIZE,
+    days: int = Query(BIRTHDAY_WINDOW_DAYS, ge=0, le=BIRTHDAY_MAX_DAYS),
+    tz: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """
-    Отримання списку контактів, які мають день народження протягом наступних 7 днів.
+    Отримання списку контактів, які мають день народження протягом наступних days днів.
+
+    Список читається з готового зведення, яке щодня перераховується
+    планувальником і оновлюється після змін контактів. "Сьогодні"
+    визначається в часовому поясі tz, тож користувачі в інших поясах
+    отримують вікно зі свого поточного дня.
 
     Параметри:
     - skip: Кількість записів, які потрібно пропустити (за замовчуванням 0).
     - limit: Максимальна кількість записів, які потрібно повернути (за замовчуванням 100).
+    - days: Кількість днів після сьогоднішнього, що входять у вікно (за замовчуванням 7, не більше 31).
+    - tz: Часовий пояс IANA, напр. 'America/New_York' (за замовчуванням — часовий пояс сервера).
     - db: Сесія бази даних.
     - user: Поточний авторизований користувач.
 
     Повертає:
-    - List[Contact]: Список контактів із найближчими днями народження.
+    - List[Contact]: Список контактів у порядку наближення дня народження, або HTTPException (400), якщо часовий пояс невідомий.
     """
 
-    bdays = r.get(f"bdays")
-    if bdays is None:
+    try:
+        day = birthday_digest.today(tz)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown time zone"
+        )
+    bdays = await birthday_digest.get(db, user.id, day, days)
+    return bdays[skip : skip + limit]
+
+
+@router.get("/stats", response_model=ContactStats)
+@router.get("/stats/", response_model=ContactStats, include_in_schema=False)
+async def get_stats(
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Отримання статистики контактів для панелей клієнта.
+
+    Параметри:
+    - db: Сесія бази даних.
+    - user: Поточний авторизований користувач.
+
+    Повертає:
+    - ContactStats: Загальна кількість контактів, кількість днів народження за місяцями та 10 найпоширеніших доменів електронної пошти.
+    """
+
+    found, stats = await cache.get_object(stats_key(user.id), stats_codec)
+    if not found:
         contact_service = ContactBookService(db)
-        bdays = await contact_service.get_birthdays(skip, limit, user)
-        r.set(f"bdays", pickle.dumps(bdays))
-        r.expire(f"bdays", 600)
-    else:
-        bdays = pickle.loads(bdays)
-    return bdays
+        stats = await contact_service.get_stats(user)
+        await cache.set_object(stats_key(user.id), stats_codec, stats, STATS_TTL)
+    return stats
+
+
+@router.get("/suggest", response_model=List[ContactSuggestion])
+@router.get(
+    "/suggest/", response_model=List[ContactSuggestion], include_in_schema=False
+)
+async def suggest_contacts(
+    prefix: str = Query(min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=SUGGEST_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Підказки для автодоповнення: контакти, ім'я, прізвище або email яких починається з prefix.
+
+    Параметри:
+    - prefix: Початок імені, прізвища або email (без урахування регістру).
+    - limit: Максимальна кількість підказок (за замовчуванням 10, не більше 50).
+    - db: Сесія бази даних.
+    - user: Поточний авторизований користувач.
+
+    Повертає:
+    - List[ContactSuggestion]: Контакти, впорядковані за прізвищем та ім'ям.
+    """
+
+    return await contact_suggester.suggest(db, user, prefix, limit)
+
+
+@router.get("/by-phone/{number}", response_model=List[ContactGet])
+async def get_contacts_by_phone(
+    number: str,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Пошук контактів за номером телефону (напр. для визначення номера вхідного дзвінка).
+
+    Номер приводиться до формату E.164, тож '+380 44 123 45 67' та
+    '0441234567' знаходять той самий контакт.
+
+    Параметри:
+    - number: Номер телефону в довільному форматі.
+    - db: Сесія бази даних.
+    - user: Поточний авторизований користувач.
+
+    Повертає:
+    - List[Contact]: Контакти з цим номером, або HTTPException (400), якщо номер неможливо розпізнати.
+    """
+
+    phone_e164 = normalize_phone(number, settings.PHONE_DEFAULT_COUNTRY_CODE)
+    if phone_e164 is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid phone number"
+        )
+    key = phone_key(user.id, phone_e164)
+    found, contacts = await cache.get_object(key, contact_codec)
+    if not found:
+        contact_service = ContactBookService(db)
+        contacts = await contact_service.get_contacts_by_phone(phone_e164, user)
+        ttl = CONTACT_TTL if contacts else settings.NEGATIVE_CACHE_TTL
+        await cache.set_object(key, contact_codec, contacts, ttl)
+    return contacts
 
 
 @router.get("/find/", response_model=List[ContactGet])
 async def find_contacts(
     query: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """
     Пошук контактів за фільтрами.
 
+    Загальна кількість результатів точна, якщо сторінка неповна або
+    результатів не більше FIND_COUNT_LIMIT. Інакше X-Total-Count дорівнює
+    FIND_COUNT_LIMIT, а заголовок X-Total-Count-Estimated має значення true.
+
     Параметри:
     - query: Пошуковий запит.
+    - response: Відповідь для заголовка X-Total-Count.
     - skip: Кількість записів, які потрібно пропустити (за замовчуванням 0).
     - limit: Максимальна кількість записів, які потрібно повернути (за замовчуванням 100).
+    - include_total: Додати заголовок X-Total-Count з кількістю знайдених контактів (за замовчуванням False).
     - db: Сесія бази даних.
     - user: Поточний авторизований користувач.
 
@@ -217,4 +376,15 @@ async def find_contacts(
     """
 
     contact_service = ContactBookService(db)
-    return await contact_service.find_contacts(query, skip, limit, user)
+    contacts = await contact_service.find_contacts(query, skip, limit, user)
+    if include_total:
+        if len(contacts) < limit and (contacts or skip == 0):
+            total = skip + len(contacts)
+        else:
+            cap = settings.FIND_COUNT_LIMIT
+            total = await contact_service.count_found_contacts(query, user, cap)
+            if total > cap:
+                total = cap
+                response.headers["X-Total-Count-Estimated"] = "true"
+        response.headers["X-Total-Count"] = str(total)
+    return contacts
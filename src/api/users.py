@@ -4,22 +4,21 @@ from src.conf.config import settings
 from src.database.db import get_db
 from src.services.auth import get_current_user, get_current_user_admin
 from src.services.users import UserService
-from src.services.upload_file import UploadFileService
-from src.schemas import User
-
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from src.services.upload_file import UploadFileService, get_upload_service
+from src.services.limiter import limiter
+from src.services.deadline import timeout_for
+from src.services.cache import cache
+from src.schemas import BirthdayRemindersUpdate, User
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(prefix="/users", tags=["users"])
-limiter = Limiter(key_func=get_remote_address)
 
 
 @router.get(
     "/me", response_model=User, description="No more than 10 requests per minute"
 )
-@limiter.limit("10/minute")
+@limiter.limit(settings.RATE_LIMIT_ME)
 async def me(request: Request, user: User = Depends(get_current_user)):
     """
     Отримання інформації про поточного авторизованого користувача.
@@ -42,25 +41,71 @@ async def update_avatar_user(
     file: UploadFile = File(),
     user: User = Depends(get_current_user_admin),
     db: AsyncSession = Depends(get_db),
+    upload_service: UploadFileService = Depends(get_upload_service),
 ):
     """
     Оновлення аватара для поточного адміністратора.
 
+    Зображення зменшується та стискається локально; якщо результат збігається
+    з поточним аватаром, повторне завантаження не виконується.
+
     Параметри:
     - file: Завантажений файл аватара.
     - user: Поточний авторизований адміністратор.
     - db: Сесія бази даних.
+    - upload_service: Сервіс завантаження файлів.
 
     Повертає:
     - User: Оновлені дані користувача з новим URL аватара.
+
+    Викликає:
+    - HTTPException (400): Якщо файл не є коректним зображенням.
+    - HTTPException (415): Якщо тип файлу не підтримується.
+    - HTTPException (413): Якщо файл завеликий.
     """
-    avatar_url = UploadFileService(
-        settings.CLOUDINARY_NAME,
-        settings.CLOUDINARY_API_KEY,
-        settings.CLOUDINARY_API_SECRET,
-    ).upload_file(file, user.username)
+    image = await upload_service.process(file)
+    if image.digest == user.avatar_hash:
+        return user
+
+    avatar_url = await upload_service.upload(
+        image, user.username, timeout=timeout_for(settings.UPLOAD_TIMEOUT)
+    )
 
     user_service = UserService(db)
-    user = await user_service.update_avatar_url(user.email, avatar_url)
+    user = await user_service.update_avatar_url(user.email, avatar_url, image.digest)
 
     return user
+
+
+@router.patch("/birthday_reminders", response_model=User)
+async def update_birthday_reminders(
+    body: BirthdayRemindersUpdate,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ввімкнення або вимкнення щоденного листа з найближчими днями народження контактів.
+
+    Параметри:
+    - body: Нове значення налаштування.
+    - user: Поточний авторизований користувач.
+    - db: Сесія бази даних.
+
+    Повертає:
+    - User: Оновлені дані користувача.
+    """
+    return await UserService(db).set_birthday_reminders(user.id, body.enabled)
+
+
+@router.get("/cache_stats")
+async def cache_stats(user: User = Depends(get_current_user_admin)):
+    """
+    Статистика влучань у кеш поточного воркера (лише для адміністраторів).
+
+    Параметри:
+    - user: Поточний авторизований адміністратор.
+
+    Повертає:
+    - dict: Кількість влучань у L1 (пам'ять процесу), L2 (Redis), промахів та їх частки.
+    """
+    return cache.stats.snapshot()
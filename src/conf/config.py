@@ -11,6 +11,16 @@ class Settings(BaseSettings):
     - JWT_SECRET: Секретний ключ для підпису JWT-токенів.
     - JWT_ALGORITHM: Алгоритм для генерації JWT-токенів (за замовчуванням: 'HS256').
     - JWT_EXPIRATION_SECONDS: Час життя токенів у секундах (за замовчуванням: 3600).
+    - REFRESH_TOKEN_EXPIRATION_SECONDS: Час життя токенів оновлення у секундах (за замовчуванням: 30 днів).
+    - PASSWORD_HASH_SCHEME: Схема хешування паролів: 'bcrypt' або 'argon2' (за замовчуванням: 'bcrypt').
+    - PASSWORD_BCRYPT_ROUNDS: Кількість раундів bcrypt (за замовчуванням: 12).
+    - PASSWORD_ARGON2_TIME_COST: Кількість ітерацій argon2 (за замовчуванням: 3).
+    - PASSWORD_ARGON2_MEMORY_COST: Обсяг пам'яті argon2 у КіБ (за замовчуванням: 65536).
+    - PASSWORD_ARGON2_PARALLELISM: Кількість потоків argon2 (за замовчуванням: 4).
+    - PASSWORD_HASH_TARGET_MS: Цільовий час перевірки пароля; якщо задано, вартість хешування калібрується під час запуску (за замовчуванням: None).
+    - TOKEN_CACHE_SIZE: Кількість перевірених токенів, підпис яких не перевіряється повторно (за замовчуванням: 1024).
+    - REVOCATION_BLOOM_CAPACITY: Розрахункова кількість відкликаних токенів для фільтра Блума (за замовчуванням: 100000).
+    - REVOCATION_BLOOM_ERROR_RATE: Допустима частка хибнопозитивних відповідей фільтра Блума (за замовчуванням: 0.001).
     - MAIL_USERNAME: Логін для SMTP сервера.
     - MAIL_PASSWORD: Пароль для SMTP сервера.
     - MAIL_FROM: Електронна адреса, від якої надсилаються листи.
@@ -21,9 +31,64 @@ class Settings(BaseSettings):
     - MAIL_SSL_TLS: Чи використовувати SSL/TLS для SMTP (за замовчуванням: True).
     - USE_CREDENTIALS: Чи використовувати облікові дані для SMTP (за замовчуванням: True).
     - VALIDATE_CERTS: Чи перевіряти сертифікати SSL (за замовчуванням: True).
+    - MAIL_TIMEOUT: Тайм-аут операцій SMTP у секундах (за замовчуванням: 30.0).
+    - MAIL_BACKEND: Бекенд надсилання листів: 'smtp' або 'memory' для тестів (за замовчуванням: 'smtp').
+    - MAIL_POOL_SIZE: Максимальна кількість SMTP-з'єднань у пулі (за замовчуванням: 4).
+    - MAIL_KEEPALIVE: Час простою з'єднання, після якого воно перевіряється командою NOOP, у секундах (за замовчуванням: 30).
+    - MAIL_CONCURRENCY: Максимальна кількість листів, що надсилаються одночасно (за замовчуванням: 4).
+    - MAIL_BATCH_SIZE: Максимальний розмір пакета листів у черзі (за замовчуванням: 50).
     - CLOUDINARY_NAME: Ім'я облікового запису Cloudinary.
     - CLOUDINARY_API_KEY: API-ключ для Cloudinary.
     - CLOUDINARY_API_SECRET: Секретний ключ для Cloudinary.
+    - REDIS_HOST: Хост сервера Redis (за замовчуванням: 'localhost').
+    - REDIS_PORT: Порт сервера Redis (за замовчуванням: 6379).
+    - REDIS_PASSWORD: Пароль для Redis (за замовчуванням: None).
+    - CACHE_L1_MAX_ENTRIES: Максимальна кількість записів у кеші процесу (за замовчуванням: 10000).
+    - CACHE_L1_TTL: Максимальний час життя запису в кеші процесу у секундах (за замовчуванням: 30).
+    - NEGATIVE_CACHE_TTL: Час кешування відсутності контакту або користувача у секундах (за замовчуванням: 30).
+    - WARMUP_CONCURRENCY: Максимальна кількість користувачів, для яких кеш прогрівається одночасно (за замовчуванням: 4).
+    - WARMUP_STARTUP_USERS: Кількість нещодавно активних користувачів, для яких кеш прогрівається під час запуску; 0 вимикає прогрів (за замовчуванням: 100).
+    - WARMUP_ACTIVE_USERS_MAX: Максимальний розмір списку нещодавно активних користувачів у Redis (за замовчуванням: 10000).
+    - SCHEDULER_TIMEZONE: Часовий пояс, опівночі за яким виконуються щоденні задачі та визначається "сьогодні" для днів народження (за замовчуванням: 'Europe/Kyiv').
+    - SCHEDULER_ENABLED: Чи запускати щоденні задачі у цьому процесі (за замовчуванням: True).
+    - BIRTHDAY_REMINDER_DAYS: Кількість днів після сьогоднішнього, дні народження в яких входять у щоденне нагадування; 0 — лише сьогоднішні (за замовчуванням: 0).
+    - SUGGEST_INDEX_MIN_CONTACTS: Кількість контактів, починаючи з якої підказки обслуговуються індексом у пам'яті воркера (за замовчуванням: 2000).
+    - SUGGEST_INDEX_MAX_USERS: Максимальна кількість користувачів з індексом підказок у пам'яті (за замовчуванням: 64).
+    - SUGGEST_INDEX_TTL: Максимальний час життя індексу підказок у секундах (за замовчуванням: 300).
+    - PHONE_DEFAULT_COUNTRY_CODE: Код країни для номерів телефону без міжнародного коду (за замовчуванням: '380').
+    - FIND_COUNT_LIMIT: Максимальна кількість результатів пошуку, що підраховується точно для X-Total-Count (за замовчуванням: 1000).
+    - BIRTHDAY_REMINDER_BATCH_DELAY: Пауза між пакетами листів-нагадувань у секундах (за замовчуванням: 1.0).
+    - TRACING_EXPORTER: Експортер спанів трасування: 'none', 'memory' або 'file' (за замовчуванням: 'none').
+    - TRACING_FILE: Файл для експортера 'file' (за замовчуванням: 'traces.jsonl').
+    - RATE_LIMIT_STORAGE_URI: Сховище лічильників лімітів, напр. 'redis://host:6379/1' або 'memory://' для одного воркера (за замовчуванням: Redis з REDIS_HOST і REDIS_PORT).
+    - RATE_LIMIT_IN_MEMORY_FALLBACK: Рахувати ліміти в пам'яті кожного процесу, поки сховище недоступне (за замовчуванням: True).
+    - RATE_LIMIT_STRATEGY: Стратегія підрахунку лімітів (за замовчуванням: 'moving-window').
+    - RATE_LIMIT_ME: Ліміт для /users/me (за замовчуванням: '10/minute').
+    - RATE_LIMIT_LOGIN: Ліміт для входу (за замовчуванням: '5/minute').
+    - RATE_LIMIT_REGISTER: Ліміт для реєстрації (за замовчуванням: '5/minute').
+    - RATE_LIMIT_RESET_PASSWORD: Ліміт для запиту скидання пароля (за замовчуванням: '3/minute').
+    - ADMISSION_MAX_IN_FLIGHT: Максимум одночасних запитів на воркер (за замовчуванням: 100).
+    - ADMISSION_MAX_EXPENSIVE: Максимум одночасних дорогих запитів на воркер (за замовчуванням: 8).
+    - ADMISSION_QUEUE_TIMEOUT: Максимальний час очікування в черзі у секундах (за замовчуванням: 2.0).
+    - ADMISSION_EXPENSIVE_ROUTES: Префікси дорогих маршрутів (вхід, реєстрація, скидання пароля, аватар).
+    - REQUEST_TIMEOUT: Стандартний крайній термін обробки запиту у секундах (за замовчуванням: 30.0).
+    - REQUEST_TIMEOUT_MAX: Максимальний тайм-аут, який клієнт може задати заголовком X-Request-Timeout (за замовчуванням: 60.0).
+    - REQUEST_TIMEOUT_ROUTES: Тайм-аути для окремих маршрутів за префіксом шляху.
+    - REDIS_SOCKET_TIMEOUT: Максимальний тайм-аут операцій Redis у секундах (за замовчуванням: 0.5).
+    - UPLOAD_TIMEOUT: Максимальний тайм-аут завантаження файлу на Cloudinary у секундах (за замовчуванням: 30.0).
+    - UPLOAD_WORKERS: Кількість потоків для завантаження файлів (за замовчуванням: 4).
+    - IMAGE_WORKERS: Кількість процесів для обробки зображень (за замовчуванням: 2).
+    - AVATAR_MAX_SIZE: Максимальний розмір файлу аватара у байтах (за замовчуванням: 5 МБ).
+    - AVATAR_CONTENT_TYPES: Дозволені MIME-типи файлу аватара.
+    - AVATAR_MAX_PIXELS: Максимальна кількість пікселів вихідного зображення аватара (за замовчуванням: 50 Мп).
+    - AVATAR_SIZE: Розмір сторони аватара в пікселях (за замовчуванням: 250).
+    - AVATAR_FORMAT: Формат збереження аватара: 'WEBP' або 'JPEG' (за замовчуванням: 'WEBP').
+    - AVATAR_QUALITY: Якість стиснення аватара (за замовчуванням: 80).
+    - AVATAR_THUMBNAIL_SIZES: Розміри мініатюр, що створюються під час завантаження (за замовчуванням: [100, 50]).
+    - AVATAR_STORAGE: Сховище аватарів: 'cloudinary' або 'local' (за замовчуванням: 'cloudinary').
+    - AVATAR_LOCAL_DIR: Каталог для сховища 'local' (за замовчуванням: 'media/avatars').
+    - AVATAR_URL_PREFIX: Префікс URL, за яким віддаються локальні аватари (за замовчуванням: '/avatars').
+    - GRAVATAR_DEFAULT: Зображення Gravatar для email без власного аватара (за замовчуванням: 'mp').
 
     Методи:
     - model_config: Конфігурація для завантаження налаштувань із файлу '.env'.
@@ -33,6 +98,16 @@ class Settings(BaseSettings):
     JWT_SECRET: str = ""
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_SECONDS: int = 3600
+    REFRESH_TOKEN_EXPIRATION_SECONDS: int = 30 * 24 * 3600
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_ARGON2_TIME_COST: int = 3
+    PASSWORD_ARGON2_MEMORY_COST: int = 65536
+    PASSWORD_ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_TARGET_MS: float | None = None
+    TOKEN_CACHE_SIZE: int = 1024
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
 
     MAIL_USERNAME: EmailStr = "user@mail.com"
     MAIL_PASSWORD: str = ""
@@ -44,11 +119,85 @@ class Settings(BaseSettings):
     MAIL_SSL_TLS: bool = True
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
+    MAIL_TIMEOUT: float = 30.0
+    MAIL_BACKEND: str = "smtp"
+    MAIL_POOL_SIZE: int = 4
+    MAIL_KEEPALIVE: int = 30
+    MAIL_CONCURRENCY: int = 4
+    MAIL_BATCH_SIZE: int = 50
 
     CLOUDINARY_NAME: str = ""
     CLOUDINARY_API_KEY: int = 0
     CLOUDINARY_API_SECRET: str = ""
 
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_PASSWORD: str | None = None
+    CACHE_L1_MAX_ENTRIES: int = 10000
+    CACHE_L1_TTL: float = 30.0
+    NEGATIVE_CACHE_TTL: int = 30
+    WARMUP_CONCURRENCY: int = 4
+    WARMUP_STARTUP_USERS: int = 100
+    WARMUP_ACTIVE_USERS_MAX: int = 10000
+    SCHEDULER_TIMEZONE: str = "Europe/Kyiv"
+    SCHEDULER_ENABLED: bool = True
+    BIRTHDAY_REMINDER_DAYS: int = 0
+    BIRTHDAY_REMINDER_BATCH_DELAY: float = 1.0
+    FIND_COUNT_LIMIT: int = 1000
+    PHONE_DEFAULT_COUNTRY_CODE: str = "380"
+    SUGGEST_INDEX_MIN_CONTACTS: int = 2000
+    SUGGEST_INDEX_MAX_USERS: int = 64
+    SUGGEST_INDEX_TTL: float = 300.0
+
+    TRACING_EXPORTER: str = "none"
+    TRACING_FILE: str = "traces.jsonl"
+
+    RATE_LIMIT_STORAGE_URI: str | None = None
+    RATE_LIMIT_IN_MEMORY_FALLBACK: bool = True
+    RATE_LIMIT_STRATEGY: str = "moving-window"
+    RATE_LIMIT_ME: str = "10/minute"
+    RATE_LIMIT_LOGIN: str = "5/minute"
+    RATE_LIMIT_REGISTER: str = "5/minute"
+    RATE_LIMIT_RESET_PASSWORD: str = "3/minute"
+
+    ADMISSION_MAX_IN_FLIGHT: int = 100
+    ADMISSION_MAX_EXPENSIVE: int = 8
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    ADMISSION_EXPENSIVE_ROUTES: list[str] = [
+        "/api/auth/login",
+        "/api/auth/register",
+        "/api/auth/reset_password",
+        "/api/users/avatar",
+    ]
+
+    REQUEST_TIMEOUT: float = 30.0
+    REQUEST_TIMEOUT_MAX: float = 60.0
+    REQUEST_TIMEOUT_ROUTES: dict[str, float] = {
+        "/api/contacts/find/": 5.0,
+        "/api/users/avatar": 60.0,
+    }
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    UPLOAD_TIMEOUT: float = 30.0
+    UPLOAD_WORKERS: int = 4
+    IMAGE_WORKERS: int = 2
+    AVATAR_MAX_SIZE: int = 5 * 1024 * 1024
+    AVATAR_CONTENT_TYPES: list[str] = [
+        "image/jpeg",
+        "image/png",
+        "image/webp",
+        "image/gif",
+    ]
+    AVATAR_MAX_PIXELS: int = 50_000_000
+    AVATAR_SIZE: int = 250
+    AVATAR_FORMAT: str = "WEBP"
+    AVATAR_QUALITY: int = 80
+    AVATAR_THUMBNAIL_SIZES: list[int] = [100, 50]
+    AVATAR_STORAGE: str = "cloudinary"
+    AVATAR_LOCAL_DIR: str = "media/avatars"
+    AVATAR_URL_PREFIX: str = "/avatars"
+
+    GRAVATAR_DEFAULT: str = "mp"
+
     model_config = ConfigDict(
         extra="ignore", env_file=".env", env_file_encoding="utf-8", case_sensitive=True
     )
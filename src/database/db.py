@@ -1,13 +1,22 @@
 import contextlib
+from typing import AsyncContextManager, Callable
 
+from sqlalchemy import event
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
+    AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
 from src.conf.config import settings
+from src.services.deadline import remaining_time
+from src.services.tracing import instrument_engine
+
+# Фабрика сесій для фонових задач поза запитом, напр. sessionmanager.session.
+SessionFactory = Callable[[], AsyncContextManager[AsyncSession]]
 
 
 class DatabaseSessionManager:
@@ -33,6 +42,7 @@ class DatabaseSessionManager:
         """
 
         self._engine: AsyncEngine | None = create_async_engine(url)
+        instrument_engine(self._engine)
         self._session_maker: async_sessionmaker = async_sessionmaker(
             autoflush=False, autocommit=False, bind=self._engine
         )
@@ -59,6 +69,21 @@ class DatabaseSessionManager:
             await session.close()
 
 
+@event.listens_for(Session, "after_begin")
+def apply_statement_timeout(session, transaction, connection):
+    """
+    Обмеження часу виконання запитів у транзакції крайнім терміном HTTP-запиту.
+
+    Для PostgreSQL встановлює statement_timeout на час, що залишився до
+    крайнього терміну, тож сервер сам перериває запити, результат яких
+    клієнт уже не дочекається.
+    """
+    remaining = remaining_time()
+    if remaining is not None and connection.dialect.name == "postgresql":
+        timeout_ms = max(int(remaining * 1000), 1)
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
 sessionmanager = DatabaseSessionManager(settings.DB_URL)
 
 
@@ -1,8 +1,23 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from enum import Enum
-from sqlalchemy import String, ForeignKey, func, Enum as SqlEnum
-from sqlalchemy.orm import mapped_column, Mapped, DeclarativeBase, relationship
+from sqlalchemy import (
+    String,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    false,
+    func,
+    Enum as SqlEnum,
+)
+from sqlalchemy.orm import (
+    mapped_column,
+    Mapped,
+    DeclarativeBase,
+    relationship,
+    validates,
+)
 from sqlalchemy.sql.sqltypes import DateTime, Boolean
 
 
@@ -12,6 +27,18 @@ class Base(DeclarativeBase):
     pass
 
 
+def birthday_md(value: date | datetime | str) -> int:
+    """
+    Місяць і день дати у вигляді числа MMDD (напр. 9 березня — 309).
+
+    Такі числа впорядковані так само, як дні календарного року, тому
+    діапазон найближчих днів народження стає діапазоном за індексом.
+    """
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.month * 100 + value.day
+
+
 class Contact(Base):
     """
     Модель для таблиці contacts.
@@ -24,8 +51,13 @@ class Contact(Base):
     - phone: Телефонний номер контакту (обов'язковий), максимум 20 символів.
     - birthday: Дата народження контакту (обов'язкова).
     - info: Додаткова інформація про контакт (опціональна).
+    - phone_e164: Телефонний номер у форматі E.164, заповнюється репозиторієм разом з phone.
+    - birthday_md: Місяць і день народження у вигляді MMDD, оновлюється разом з birthday.
     - user_id: Зовнішній ключ для прив'язки до користувача.
     - user: Відношення до моделі User.
+
+    Індекси за (user_id, lower(...)) імені, прізвища та email з класом
+    операторів text_pattern_ops обслуговують пошук за префіксом (LIKE 'abc%').
     """
 
     __tablename__ = "contact_book"
@@ -36,9 +68,40 @@ class Contact(Base):
     phone: Mapped[str] = mapped_column(String(20), nullable=False)
     birthday: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     info: Mapped[str] = mapped_column(String(200), nullable=True)
+    phone_e164: Mapped[str] = mapped_column(String(16), nullable=True)
+    birthday_md: Mapped[int] = mapped_column(SmallInteger, nullable=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     user: Mapped["User"] = relationship("User", backref="contact_book")
 
+    __table_args__ = (
+        Index("ix_contact_book_user_id_birthday_md", user_id, birthday_md),
+        Index("ix_contact_book_birthday_md", birthday_md),
+        Index("ix_contact_book_user_id_phone_e164", user_id, phone_e164),
+        Index(
+            "ix_contact_book_user_id_first_name_lower",
+            user_id,
+            func.lower(first_name).label("first_name_lower"),
+            postgresql_ops={"first_name_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_contact_book_user_id_last_name_lower",
+            user_id,
+            func.lower(last_name).label("last_name_lower"),
+            postgresql_ops={"last_name_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_contact_book_user_id_email_lower",
+            user_id,
+            func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+        ),
+    )
+
+    @validates("birthday")
+    def _sync_birthday_md(self, key, value):
+        self.birthday_md = None if value is None else birthday_md(value)
+        return value
+
 
 class UserRole(str, Enum):
     """
@@ -64,18 +127,73 @@ class User(Base):
     - hashed_password: Зашифрований пароль (обов'язкове).
     - created_at: Дата створення запису (автоматично).
     - avatar: URL-адреса аватара користувача (обов'язкове).
+    - avatar_hash: SHA-256 хеш вмісту поточного аватара (для пропуску повторних завантажень).
     - confirmed: Стан підтвердження користувача.
     - role: Роль користувача (USER або ADMIN).
+    - birthday_reminders: Чи надсилати щоденний лист про дні народження контактів.
+    - contacts_count: Кількість контактів користувача, оновлюється в тій самій транзакції, що й контакти.
+
+    Функціональні унікальні індекси за lower(email) та lower(username)
+    забезпечують нечутливу до регістру унікальність і пошук за індексом,
+    тому окремі чутливі до регістру обмеження unique не потрібні.
     """
 
     __tablename__ = "users"
     id: Mapped[int] = mapped_column(primary_key=True)
-    username: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
-    email: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    username: Mapped[str] = mapped_column(String(50), nullable=False)
+    email: Mapped[str] = mapped_column(String(100), nullable=False)
     hashed_password: Mapped[str] = mapped_column(nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, default=func.now()
     )
     avatar: Mapped[str] = mapped_column(String(255), nullable=True)
+    avatar_hash: Mapped[str] = mapped_column(String(64), nullable=True)
     confirmed = mapped_column(Boolean, default=False)
     role = mapped_column(SqlEnum(UserRole), default=UserRole.USER, nullable=False)
+    birthday_reminders = mapped_column(
+        Boolean, default=False, server_default=false(), nullable=False
+    )
+    contacts_count = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+    __table_args__ = (
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        Index("ix_users_username_lower", func.lower(username), unique=True),
+    )
+
+
+class RefreshToken(Base):
+    """
+    Модель для таблиці refresh_tokens.
+
+    Зберігається лише SHA-256 хеш токена. Усі токени, отримані ланцюжком
+    оновлень від одного входу, мають спільний family_id: повторне використання
+    вже заміненого токена відкликає всю родину.
+
+    Атрибути:
+    - id: Первинний ключ.
+    - user_id: Зовнішній ключ для прив'язки до користувача (з індексом).
+    - token_hash: SHA-256 хеш токена (унікальний індекс).
+    - family_id: Ідентифікатор родини токенів.
+    - created_at: Дата створення запису (автоматично).
+    - expires_at: Дата закінчення строку дії (з індексом для очищення).
+    - revoked_at: Дата заміни або відкликання токена.
+    - user: Відношення до моделі User.
+    """
+
+    __tablename__ = "refresh_tokens"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    token_hash: Mapped[str] = mapped_column(
+        String(64), nullable=False, unique=True, index=True
+    )
+    family_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=func.now()
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    user: Mapped["User"] = relationship("User")
@@ -1,13 +1,81 @@
 from typing import List
 from datetime import date, timedelta
 
-from sqlalchemy import select, or_
+from sqlalchemy import String, case, func, literal_column, select, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.sql.functions import FunctionElement
 
-from src.database.models import Contact, User
+from src.conf.config import settings
+from src.database.models import Contact, User, birthday_md
 from src.schemas import ContactSet, ContactUpdate
+from src.services.tracing import instrument
+from src.utils.phone import normalize_phone
 
 
+class email_domain(FunctionElement):
+    """
+    Домен адреси електронної пошти в нижньому регістрі.
+    """
+
+    type = String()
+    name = "email_domain"
+    inherit_cache = True
+
+
+@compiles(email_domain)
+def _email_domain_default(element, compiler, **kw):
+    return "lower(split_part(%s, '@', 2))" % compiler.process(element.clauses, **kw)
+
+
+@compiles(email_domain, "sqlite")
+def _email_domain_sqlite(element, compiler, **kw):
+    email = compiler.process(element.clauses, **kw)
+    return f"lower(substr({email}, instr({email}, '@') + 1))"
+
+
+def search_condition(query: str):
+    """
+    Умова пошуку контактів за підрядком в імені, прізвищі або email.
+    """
+    return or_(
+        Contact.first_name.ilike(f"%{query}%"),
+        Contact.last_name.ilike(f"%{query}%"),
+        Contact.email.ilike(f"%{query}%"),
+    )
+
+
+def escape_like(value: str) -> str:
+    """
+    Екранування символів шаблону LIKE (%, _ та \\) для використання з escape="\\".
+    """
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def birthday_window(start: date, days: int):
+    """
+    Умова та порядок вибірки днів народження з start по start + days включно.
+
+    Вікно, що переходить через кінець року, розбивається на два діапазони
+    birthday_md, тож обидва обслуговуються індексом. День народження 29 лютого
+    у невисокосний рік потрапляє у вікно між 28 лютого та 1 березня.
+
+    Повертає:
+    - tuple: (умова WHERE, вирази ORDER BY у порядку наближення дат).
+    """
+    start_md = birthday_md(start)
+    end_md = birthday_md(start + timedelta(days=days))
+    if start_md <= end_md:
+        return Contact.birthday_md.between(start_md, end_md), (Contact.birthday_md,)
+    condition = or_(Contact.birthday_md >= start_md, Contact.birthday_md <= end_md)
+    return condition, (
+        case((Contact.birthday_md < start_md, 1), else_=0),
+        Contact.birthday_md,
+    )
+
+
+@instrument("repository")
 class ContactBookRepository:
     def __init__(self, session: AsyncSession):
         self.db = session
@@ -28,10 +96,35 @@ class ContactBookRepository:
         """
 
         res = await self.db.execute(
-            select(Contact).filter_by(user=user).offset(skip).limit(limit)
+            select(Contact).filter_by(user_id=user.id).offset(skip).limit(limit)
         )
         return res.scalars().all()
 
+    async def count_contacts(self, user: User) -> int:
+        """
+        Кількість контактів користувача з лічильника в таблиці users.
+
+        Параметри:
+        - user: Поточний авторизований користувач.
+
+        Повертає:
+        - int: Кількість контактів.
+        """
+
+        result = await self.db.execute(
+            select(User.contacts_count).where(User.id == user.id)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def _add_to_count(self, user_id: int, delta: int) -> None:
+        # Атомарне оновлення в поточній транзакції: лічильник фіксується
+        # або відкочується разом зі зміною контактів.
+        await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(contacts_count=User.contacts_count + delta)
+        )
+
     async def get_contact(self, contact_id: int, user: User) -> Contact | None:
         """
         Отримання інформації про контакт за його ID.
@@ -44,9 +137,30 @@ class ContactBookRepository:
         - Contact: Дані контакту.
         """
 
-        res = await self.db.execute(select(Contact).filter_by(id=contact_id, user=user))
+        res = await self.db.execute(
+            select(Contact).filter_by(id=contact_id, user_id=user.id)
+        )
         return res.scalar_one_or_none()
 
+    async def get_contacts_by_phone(self, phone_e164: str, user: User) -> List[Contact]:
+        """
+        Отримання контактів за номером телефону у форматі E.164.
+
+        Параметри:
+        - phone_e164: Нормалізований номер телефону.
+        - user: Поточний авторизований користувач.
+
+        Повертає:
+        - List[Contact]: Контакти з цим номером.
+        """
+
+        result = await self.db.execute(
+            select(Contact)
+            .filter_by(user_id=user.id, phone_e164=phone_e164)
+            .order_by(Contact.id)
+        )
+        return result.scalars().all()
+
     async def create_contact(self, body: ContactSet, user: User) -> Contact:
         """
         Створення нового контакту.
@@ -59,8 +173,13 @@ class ContactBookRepository:
         - Contact: Дані створеного контакту.
         """
 
-        contact = Contact(**body.model_dump(), user=user)
+        contact = Contact(
+            **body.model_dump(),
+            user_id=user.id,
+            phone_e164=normalize_phone(body.phone, settings.PHONE_DEFAULT_COUNTRY_CODE),
+        )
         self.db.add(contact)
+        await self._add_to_count(user.id, 1)
         await self.db.commit()
         await self.db.refresh(contact)
         return await self.get_contact(contact.id, user)
@@ -80,6 +199,7 @@ class ContactBookRepository:
         contact = await self.get_contact(contact_id, user)
         if contact:
             await self.db.delete(contact)
+            await self._add_to_count(user.id, -1)
             await self.db.commit()
         return contact
 
@@ -100,34 +220,142 @@ class ContactBookRepository:
 
         contact = await self.get_contact(contact_id, user)
         if contact:
-            for key, value in body.model_dump(exclude_unset=True).items():
+            data = body.model_dump(exclude_unset=True)
+            for key, value in data.items():
                 setattr(contact, key, value)
+            if "phone" in data:
+                contact.phone_e164 = normalize_phone(
+                    contact.phone, settings.PHONE_DEFAULT_COUNTRY_CODE
+                )
             await self.db.commit()
             await self.db.refresh(contact)
         return contact
 
-    async def get_birthdays(self, skip: int, limit: int, user: User) -> List[Contact]:
+    async def get_birthdays(
+        self, user_id: int, start: date, days: int
+    ) -> List[Contact]:
         """
-        Отримання списку контактів, які мають день народження протягом наступних 7 днів.
+        Отримання контактів користувача з днями народження протягом days днів від start.
+
+        Параметри:
+        - user_id: ID користувача.
+        - start: Перший день вікна.
+        - days: Кількість днів після start, що входять у вікно.
+
+        Повертає:
+        - List[Contact]: Контакти в порядку наближення дня народження.
+        """
+
+        condition, order_by = birthday_window(start, days)
+        result = await self.db.execute(
+            select(Contact)
+            .filter_by(user_id=user_id)
+            .where(condition)
+            .order_by(*order_by, Contact.id)
+        )
+        return result.scalars().all()
+
+    async def get_all_birthdays(self, start: date, days: int) -> List[Contact]:
+        """
+        Отримання контактів усіх користувачів з днями народження протягом days днів від start.
+
+        Параметри:
+        - start: Перший день вікна.
+        - days: Кількість днів після start, що входять у вікно.
+
+        Повертає:
+        - List[Contact]: Контакти, згруповані за user_id, у порядку наближення дня народження.
+        """
+
+        condition, order_by = birthday_window(start, days)
+        result = await self.db.execute(
+            select(Contact)
+            .where(condition)
+            .order_by(Contact.user_id, *order_by, Contact.id)
+        )
+        return result.scalars().all()
+
+    async def get_reminder_birthdays(
+        self, start: date, days: int, after_user_id: int, user_limit: int
+    ) -> List[Contact]:
+        """
+        Дні народження для наступної порції користувачів, що ввімкнули нагадування.
+
+        Користувачі вибираються за зростанням id після after_user_id
+        (keyset-пагінація), тож кожна порція читається окремим коротким запитом.
+
+        Параметри:
+        - start: Перший день вікна.
+        - days: Кількість днів після start, що входять у вікно.
+        - after_user_id: ID останнього користувача попередньої порції (0 для першої).
+        - user_limit: Максимальна кількість користувачів у порції.
+
+        Повертає:
+        - List[Contact]: Контакти разом з власником, згруповані за user_id.
+        """
+
+        condition, order_by = birthday_window(start, days)
+        opted_in = (
+            condition,
+            User.birthday_reminders.is_(True),
+            User.confirmed.is_(True),
+        )
+        user_ids = await self.db.execute(
+            select(Contact.user_id)
+            .join(Contact.user)
+            .where(*opted_in, Contact.user_id > after_user_id)
+            .group_by(Contact.user_id)
+            .order_by(Contact.user_id)
+            .limit(user_limit)
+        )
+        user_ids = user_ids.scalars().all()
+        if not user_ids:
+            return []
+        contacts = await self.db.execute(
+            select(Contact)
+            .join(Contact.user)
+            .options(contains_eager(Contact.user))
+            .where(*opted_in, Contact.user_id.in_(user_ids))
+            .order_by(Contact.user_id, *order_by, Contact.id)
+        )
+        return contacts.scalars().all()
+
+    async def get_stats(self, user: User, top_domains: int) -> dict:
+        """
+        Статистика контактів користувача, обчислена агрегатними запитами.
 
         Параметри:
-        - skip: Кількість записів, які потрібно пропустити.
-        - limit: Максимальна кількість записів, які потрібно повернути.
         - user: Поточний авторизований користувач.
+        - top_domains: Кількість найпоширеніших доменів електронної пошти.
 
         Повертає:
-        - List[Contact]: Список контактів із найближчими днями народження.
+        - dict: Загальна кількість контактів, кількість днів народження за
+          місяцями та найпоширеніші домени електронної пошти.
         """
 
-        today = date.today()
-        nextweek = today + timedelta(days=7)
-        contacts = await self.get_all_contacts(skip, limit, user)
-        res = []
-        for contact in contacts:
-            bday = contact.birthday.replace(year=today.year).date()
-            if bday >= today and bday <= nextweek:
-                res.append(contact)
-        return res
+        # Дільник без параметра, щоб вираз у SELECT і GROUP BY збігався.
+        month = (Contact.birthday_md // literal_column("100")).label("month")
+        months = await self.db.execute(
+            select(month, func.count()).filter_by(user_id=user.id).group_by(month)
+        )
+        domain = email_domain(Contact.email).label("domain")
+        domains = await self.db.execute(
+            select(domain, func.count().label("count"))
+            .filter_by(user_id=user.id)
+            .group_by(domain)
+            .order_by(func.count().desc(), domain)
+            .limit(top_domains)
+        )
+        by_month = dict(months.all())
+        return {
+            "total": sum(by_month.values()),
+            "birthdays_by_month": [
+                {"month": m, "count": by_month.get(m, 0)} for m in range(1, 13)
+            ],
+            "email_domains": [
+                {"domain": d, "count": count} for d, count in domains.all()
+            ],
+        }
 
     async def find_contacts(self, query: str, skip: int, limit: int, user: User):
         """
@@ -145,15 +373,87 @@ class ContactBookRepository:
 
         result = await self.db.execute(
             select(Contact)
-            .filter_by(user=user)
+            .filter_by(user_id=user.id)
+            .where(search_condition(query))
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def count_found_contacts(self, query: str, user: User, cap: int) -> int:
+        """
+        Кількість контактів, що відповідають пошуку, але не більше cap + 1.
+
+        Підрахунок зупиняється після cap + 1 рядків, тож його вартість
+        обмежена незалежно від розміру книги контактів.
+
+        Параметри:
+        - query: Пошуковий запит.
+        - user: Поточний авторизований користувач.
+        - cap: Максимальна кількість, яку потрібно підрахувати точно.
+
+        Повертає:
+        - int: Кількість знайдених контактів; значення більше за cap означає "більше ніж cap".
+        """
+
+        found = (
+            select(Contact.id)
+            .filter_by(user_id=user.id)
+            .where(search_condition(query))
+            .limit(cap + 1)
+            .subquery()
+        )
+        result = await self.db.execute(select(func.count()).select_from(found))
+        return result.scalar_one()
+
+    async def suggest_contacts(
+        self, prefix: str, limit: int, user: User
+    ) -> List[Contact]:
+        """
+        Контакти, ім'я, прізвище або email яких починається з prefix.
+
+        Порівняння нечутливе до регістру й обслуговується індексами
+        за (user_id, lower(...)).
+
+        Параметри:
+        - prefix: Початок імені, прізвища або email.
+        - limit: Максимальна кількість контактів.
+        - user: Поточний авторизований користувач.
+
+        Повертає:
+        - List[Contact]: Контакти, впорядковані за прізвищем та ім'ям.
+        """
+
+        pattern = escape_like(prefix.lower()) + "%"
+        result = await self.db.execute(
+            select(Contact)
+            .filter_by(user_id=user.id)
             .where(
                 or_(
-                    Contact.first_name.ilike(f"%{query}%"),
-                    Contact.last_name.ilike(f"%{query}%"),
-                    Contact.email.ilike(f"%{query}%"),
+                    func.lower(Contact.first_name).like(pattern, escape="\\"),
+                    func.lower(Contact.last_name).like(pattern, escape="\\"),
+                    func.lower(Contact.email).like(pattern, escape="\\"),
                 )
             )
-            .offset(skip)
+            .order_by(Contact.last_name, Contact.first_name, Contact.id)
             .limit(limit)
         )
         return result.scalars().all()
+
+    async def get_suggestion_entries(self, user: User) -> list:
+        """
+        Поля всіх контактів користувача, потрібні для індексу підказок.
+
+        Параметри:
+        - user: Поточний авторизований користувач.
+
+        Повертає:
+        - list: Рядки (id, first_name, last_name, email).
+        """
+
+        result = await self.db.execute(
+            select(
+                Contact.id, Contact.first_name, Contact.last_name, Contact.email
+            ).filter_by(user_id=user.id)
+        )
+        return result.all()
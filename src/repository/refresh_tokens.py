@@ -0,0 +1,117 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from src.database.models import RefreshToken
+from src.services.tracing import instrument
+
+
+@instrument("repository")
+class RefreshTokenRepository:
+    def __init__(self, session: AsyncSession):
+        self.db = session
+
+    async def create_token(
+        self, user_id: int, token_hash: str, family_id: str, expires_at: datetime
+    ) -> RefreshToken:
+        """
+        Збереження нового токена оновлення.
+        """
+        token = RefreshToken(
+            user_id=user_id,
+            token_hash=token_hash,
+            family_id=family_id,
+            expires_at=expires_at,
+        )
+        self.db.add(token)
+        await self.db.commit()
+        return token
+
+    async def get_token_by_hash(self, token_hash: str) -> RefreshToken | None:
+        """
+        Отримання токена оновлення за хешем разом з користувачем.
+        """
+        token = await self.db.execute(
+            select(RefreshToken)
+            .options(joinedload(RefreshToken.user))
+            .filter_by(token_hash=token_hash)
+        )
+        return token.scalar_one_or_none()
+
+    async def rotate_token(
+        self,
+        stored: RefreshToken,
+        token_hash: str,
+        expires_at: datetime,
+        now: datetime,
+    ) -> bool:
+        """
+        Заміна токена новим в одній транзакції.
+
+        Старий токен відкликається, а новий зберігається в тій самій родині
+        одним комітом, тож збій не залишає клієнта без дійсного токена.
+
+        Повертає:
+        - bool: False, якщо токен вже був відкликаний (зокрема паралельним запитом).
+        """
+        result = await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        if result.rowcount != 1:
+            await self.db.rollback()
+            return False
+        self.db.add(
+            RefreshToken(
+                user_id=stored.user_id,
+                token_hash=token_hash,
+                family_id=stored.family_id,
+                expires_at=expires_at,
+            )
+        )
+        await self.db.commit()
+        return True
+
+    async def revoke_family(self, family_id: str, now: datetime) -> None:
+        """
+        Відкликання всіх активних токенів родини.
+        """
+        await self.db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.family_id == family_id,
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(revoked_at=now)
+        )
+        await self.db.commit()
+
+    async def revoke_user(self, user_id: int, now: datetime) -> None:
+        """
+        Відкликання всіх активних токенів користувача.
+        """
+        await self.db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.user_id == user_id,
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(revoked_at=now)
+        )
+        await self.db.commit()
+
+    async def purge_expired(self, now: datetime) -> int:
+        """
+        Видалення токенів, строк дії яких минув.
+
+        Повертає:
+        - int: Кількість видалених токенів.
+        """
+        result = await self.db.execute(
+            delete(RefreshToken).where(RefreshToken.expires_at < now)
+        )
+        await self.db.commit()
+        return result.rowcount
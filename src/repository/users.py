@@ -1,10 +1,13 @@
-from sqlalchemy import select
+from sqlalchemy import func, or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.schemas import UserCreate
+from src.services.tracing import instrument
 
 
+@instrument("repository")
 class UserRepository:
     def __init__(self, session: AsyncSession):
         self.db = session
@@ -18,21 +21,45 @@ class UserRepository:
 
     async def get_user_by_username(self, username: str) -> User | None:
         """
-        Отримання користувача за його ім'ям користувача.
+        Отримання користувача за його ім'ям користувача (без урахування регістру).
         """
-        user = await self.db.execute(select(User).filter_by(username=username))
+        user = await self.db.execute(
+            select(User).where(func.lower(User.username) == func.lower(username))
+        )
         return user.scalar_one_or_none()
 
     async def get_user_by_email(self, email: str) -> User | None:
         """
-        Отримання користувача за його email.
+        Отримання користувача за його email (без урахування регістру).
         """
-        user = await self.db.execute(select(User).filter_by(email=email))
+        user = await self.db.execute(
+            select(User).where(func.lower(User.email) == func.lower(email))
+        )
         return user.scalar_one_or_none()
 
+    async def get_users_by_email_or_username(
+        self, email: str, username: str
+    ) -> list[User]:
+        """
+        Отримання користувачів з таким email або ім'ям одним запитом
+        (без урахування регістру).
+        """
+        users = await self.db.execute(
+            select(User).where(
+                or_(
+                    func.lower(User.email) == func.lower(email),
+                    func.lower(User.username) == func.lower(username),
+                )
+            )
+        )
+        return list(users.scalars().all())
+
     async def create_user(self, body: UserCreate, avatar: str = None) -> User:
         """
         Створення нового користувача.
+
+        Унікальність email та імені гарантують обмеження бази даних: при
+        конфлікті транзакція відкочується, а IntegrityError передається далі.
         """
         user = User(
             **body.model_dump(exclude_unset=True, exclude={"password"}),
@@ -40,28 +67,57 @@ class UserRepository:
             avatar=avatar
         )
         self.db.add(user)
-        await self.db.commit()
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            raise
         await self.db.refresh(user)
         return user
 
-    async def confirmed_email(self, email: str) -> None:
+    async def confirmed_email(self, email: str) -> User:
         """
         Підтвердження email користувача.
         """
         user = await self.get_user_by_email(email)
         user.confirmed = True
         await self.db.commit()
+        await self.db.refresh(user)
+        return user
 
-    async def update_avatar_url(self, email: str, url: str) -> User:
+    async def update_avatar_url(
+        self, email: str, url: str, avatar_hash: str | None = None
+    ) -> User:
         """
-        Оновлення URL аватару користувача.
+        Оновлення URL аватару користувача та хешу його вмісту.
         """
         user = await self.get_user_by_email(email)
         user.avatar = url
+        user.avatar_hash = avatar_hash
         await self.db.commit()
         await self.db.refresh(user)
         return user
 
+    async def update_password_hash(self, user: User, password: str) -> User:
+        """
+        Заміна хешу пароля на перехешований за поточною політикою.
+        """
+        user.hashed_password = password
+        await self.db.commit()
+        await self.db.refresh(user)
+        return user
+
+    async def set_birthday_reminders(self, user_id: int, enabled: bool) -> User:
+        """
+        Ввімкнення або вимкнення нагадувань про дні народження.
+        """
+        user = await self.get_user_by_id(user_id)
+        if user:
+            user.birthday_reminders = enabled
+            await self.db.commit()
+            await self.db.refresh(user)
+        return user
+
     async def reset_password(self, user_id: int, password: str) -> User:
         """
         Скидання пароля користувача.
@@ -36,6 +36,7 @@ class ContactGet(BaseModel):
         last_name: прізвище контакту
         email: електронна пошта контакту
         phone: номер телефону контакту
+        phone_e164: номер телефону у форматі E.164 (якщо його вдалося розпізнати)
         birthday: дата народження контакту
     """
 
@@ -44,6 +45,7 @@ class ContactGet(BaseModel):
     last_name: str
     email: EmailStr
     phone: str
+    phone_e164: Optional[str] = None
     birthday: date
 
     model_config = ConfigDict(from_attributes=True)
@@ -70,6 +72,66 @@ class ContactUpdate(BaseModel):
     info: Optional[str] | None = None
 
 
+class ContactSuggestion(BaseModel):
+    """
+    Модель підказки для автодоповнення контактів.
+
+    Атрибути:
+        id: унікальний ідентифікатор контакту
+        first_name: ім'я контакту
+        last_name: прізвище контакту
+        email: електронна пошта контакту
+    """
+
+    id: int
+    first_name: str
+    last_name: str
+    email: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MonthCount(BaseModel):
+    """
+    Кількість днів народження контактів у місяці.
+
+    Атрибути:
+        month: номер місяця (1-12)
+        count: кількість контактів
+    """
+
+    month: int
+    count: int
+
+
+class DomainCount(BaseModel):
+    """
+    Кількість контактів з електронною поштою в домені.
+
+    Атрибути:
+        domain: домен електронної пошти
+        count: кількість контактів
+    """
+
+    domain: str
+    count: int
+
+
+class ContactStats(BaseModel):
+    """
+    Модель для статистики контактів користувача.
+
+    Атрибути:
+        total: загальна кількість контактів
+        birthdays_by_month: кількість днів народження за місяцями (усі 12 місяців)
+        email_domains: найпоширеніші домени електронної пошти
+    """
+
+    total: int
+    birthdays_by_month: list[MonthCount]
+    email_domains: list[DomainCount]
+
+
 class User(BaseModel):
     """
     Модель для представлення користувача.
@@ -80,6 +142,7 @@ class User(BaseModel):
         email: електронна пошта користувача
         avatar: URL до аватара користувача
         role: роль користувача
+        birthday_reminders: чи надсилаються нагадування про дні народження
     """
 
     id: int
@@ -87,10 +150,49 @@ class User(BaseModel):
     email: str
     avatar: Optional[str] | None = None
     role: UserRole
+    birthday_reminders: bool = False
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class Principal(BaseModel):
+    """
+    Модель автентифікованого користувача для кешу.
+
+    Атрибути:
+        id: унікальний ідентифікатор користувача
+        username: ім'я користувача
+        email: електронна пошта користувача
+        avatar: URL до аватара користувача
+        avatar_hash: хеш вмісту аватара
+        confirmed: чи підтверджено email
+        role: роль користувача
+        birthday_reminders: чи надсилаються нагадування про дні народження
+    """
+
+    id: int
+    username: str
+    email: str
+    avatar: Optional[str] = None
+    avatar_hash: Optional[str] = None
+    confirmed: Optional[bool] = None
+    role: UserRole
+    birthday_reminders: bool = False
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BirthdayRemindersUpdate(BaseModel):
+    """
+    Модель для ввімкнення або вимкнення нагадувань про дні народження.
+
+    Атрибут:
+        enabled: чи надсилати щоденний лист з днями народження контактів
+    """
+
+    enabled: bool
+
+
 class UserCreate(BaseModel):
     """
     Модель для створення нового користувача.
@@ -114,13 +216,26 @@ class Token(BaseModel):
 
     Атрибути:
         access_token: токен доступу
+        refresh_token: токен оновлення
         token_type: тип токену
     """
 
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str
 
 
+class RefreshTokenRequest(BaseModel):
+    """
+    Модель для оновлення токену доступу.
+
+    Атрибут:
+        refresh_token: токен оновлення
+    """
+
+    refresh_token: str
+
+
 class RequestEmail(BaseModel):
     """
     Модель для запиту електронної пошти для відновлення паролю.
@@ -0,0 +1,162 @@
+import asyncio
+import math
+import time
+
+from starlette.responses import JSONResponse
+
+from src.conf.config import settings
+
+
+class AdmissionController:
+    """
+    Обмеження кількості одночасних запитів у межах одного воркера.
+
+    Запити поділяються на звичайні та "дорогі" (bcrypt, завантаження файлів).
+    Дорогі запити мають окремий, менший ліміт і поступаються місцем звичайним,
+    якщо ті чекають у черзі. Запит, що не отримав місця за queue_timeout,
+    відхиляється.
+
+    Атрибути:
+    - max_in_flight: Максимальна кількість одночасних запитів.
+    - max_expensive: Максимальна кількість одночасних дорогих запитів.
+    - queue_timeout: Максимальний час очікування місця в черзі (секунди).
+    """
+
+    _EWMA_WEIGHT = 0.2
+
+    def __init__(self, max_in_flight: int, max_expensive: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_expensive = max_expensive
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.expensive_in_flight = 0
+        self.waiting = 0
+        self.waiting_regular = 0
+        self.avg_queue_time = 0.0
+        self.avg_service_time = 0.0
+        self._cond = asyncio.Condition()
+
+    def _can_admit(self, expensive: bool) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        if expensive:
+            return (
+                self.expensive_in_flight < self.max_expensive
+                and self.waiting_regular == 0
+            )
+        return True
+
+    def _record(self, attr: str, value: float) -> None:
+        old = getattr(self, attr)
+        setattr(self, attr, old + self._EWMA_WEIGHT * (value - old))
+
+    async def acquire(self, expensive: bool = False) -> bool:
+        """
+        Отримання місця для обробки запиту.
+
+        Повертає:
+        - bool: True, якщо запит допущено, або False, якщо його слід відхилити.
+        """
+        started = time.monotonic()
+        async with self._cond:
+            if not self._can_admit(expensive):
+                self.waiting += 1
+                if not expensive:
+                    self.waiting_regular += 1
+                try:
+                    await asyncio.wait_for(
+                        self._cond.wait_for(lambda: self._can_admit(expensive)),
+                        self.queue_timeout,
+                    )
+                except asyncio.TimeoutError:
+                    self._record("avg_queue_time", time.monotonic() - started)
+                    return False
+                finally:
+                    self.waiting -= 1
+                    if not expensive:
+                        self.waiting_regular -= 1
+                    self._cond.notify_all()
+            self.in_flight += 1
+            if expensive:
+                self.expensive_in_flight += 1
+        self._record("avg_queue_time", time.monotonic() - started)
+        return True
+
+    async def release(self, expensive: bool, service_time: float) -> None:
+        """
+        Звільнення місця після завершення обробки запиту.
+        """
+        async with self._cond:
+            self.in_flight -= 1
+            if expensive:
+                self.expensive_in_flight -= 1
+            self._record("avg_service_time", service_time)
+            self._cond.notify_all()
+
+    def retry_after(self) -> int:
+        """
+        Оцінка часу (у секундах), через який варто повторити запит.
+        """
+        drain_time = self.avg_service_time * (self.waiting + 1) / self.max_in_flight
+        return max(1, math.ceil(max(self.avg_queue_time, drain_time)))
+
+
+def is_expensive_route(path: str) -> bool:
+    """
+    Перевірка, чи належить шлях до дорогих маршрутів з налаштувань.
+    """
+    return any(path.startswith(route) for route in settings.ADMISSION_EXPENSIVE_ROUTES)
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI-проміжний шар для контролю допуску запитів.
+
+    Надлишкові запити отримують відповідь 503 із заголовком Retry-After замість
+    того, щоб чекати в черзі і збільшувати затримку для всіх інших.
+    """
+
+    def __init__(self, app, controller: AdmissionController | None = None):
+        self.app = app
+        self.controller = controller or AdmissionController(
+            settings.ADMISSION_MAX_IN_FLIGHT,
+            settings.ADMISSION_MAX_EXPENSIVE,
+            settings.ADMISSION_QUEUE_TIMEOUT,
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        expensive = is_expensive_route(scope["path"])
+        if not await self.controller.acquire(expensive):
+            response = JSONResponse(
+                status_code=503,
+                content={"error": "Сервер перевантажений. Спробуйте пізніше."},
+                headers={"Retry-After": str(self.controller.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        released = False
+
+        async def release():
+            nonlocal released
+            if not released:
+                released = True
+                await self.controller.release(expensive, time.monotonic() - started)
+
+        async def send_wrapper(message):
+            await send(message)
+            # Фонові задачі виконуються після відповіді і не займають місце.
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                await release()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await release()
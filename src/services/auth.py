@@ -1,30 +1,140 @@
+import functools
+import logging
+import math
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from passlib.context import CryptContext
+from passlib.hash import argon2
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from jose import JWTError, jwt
+from jose import ExpiredSignatureError, JWTError, jwk, jwt
 
 from src.database.db import get_db
 from src.conf.config import settings
 from src.services.users import UserService
 from src.database.models import User, UserRole
+from src.services.cache import PRINCIPAL_TTL, cache, principal_codec, principal_key
+from src.services.revocation import revocation_list
+from src.services.tracing import traced
 
 UTC = timezone.utc
 
+logger = logging.getLogger(__name__)
+
+
+def build_password_context(
+    scheme: str | None = None,
+    bcrypt_rounds: int | None = None,
+    argon2_time_cost: int | None = None,
+) -> CryptContext:
+    """
+    Створення контексту хешування паролів відповідно до політики.
+
+    Хеші, створені іншою схемою або з іншою вартістю, вважаються застарілими
+    (needs_update) і перехешовуються під час наступного входу.
+
+    Аргументи:
+        scheme: Схема хешування: 'bcrypt' або 'argon2' (потребує argon2-cffi).
+        bcrypt_rounds: Кількість раундів bcrypt.
+        argon2_time_cost: Кількість ітерацій argon2.
+
+    Винятки:
+    - ValueError: Невідома схема або argon2 без встановленого argon2-cffi.
+    """
+    scheme = scheme or settings.PASSWORD_HASH_SCHEME
+    if scheme not in ("bcrypt", "argon2"):
+        raise ValueError(f"Unknown PASSWORD_HASH_SCHEME: {scheme!r}")
+    if scheme == "argon2" and not argon2.has_backend():
+        raise ValueError(
+            "PASSWORD_HASH_SCHEME='argon2' requires the argon2-cffi package"
+        )
+    rounds = bcrypt_rounds or settings.PASSWORD_BCRYPT_ROUNDS
+    time_cost = argon2_time_cost or settings.PASSWORD_ARGON2_TIME_COST
+    schemes = ["argon2", "bcrypt"] if scheme == "argon2" else ["bcrypt"]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+        argon2__time_cost=time_cost,
+        argon2__memory_cost=settings.PASSWORD_ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+    )
+
+
+def _hash_time(context: CryptContext) -> float:
+    start = time.perf_counter()
+    context.hash("calibration")
+    return time.perf_counter() - start
+
+
+def calibrate_password_context(target_ms: float) -> CryptContext:
+    """
+    Підбір вартості хешування під цільовий час перевірки на поточному обладнанні.
+
+    Для bcrypt час подвоюється з кожним раундом, для argon2 зростає лінійно
+    з кількістю ітерацій, тож достатньо одного вимірювання.
+
+    Аргументи:
+        target_ms: Цільовий час перевірки пароля в мілісекундах.
+    """
+    target = target_ms / 1000
+    if settings.PASSWORD_HASH_SCHEME == "argon2":
+        elapsed = _hash_time(build_password_context(argon2_time_cost=1))
+        return build_password_context(argon2_time_cost=max(1, round(target / elapsed)))
+    base_rounds = 8
+    elapsed = _hash_time(build_password_context(bcrypt_rounds=base_rounds))
+    rounds = base_rounds + round(math.log2(target / elapsed))
+    return build_password_context(bcrypt_rounds=min(max(rounds, 4), 31))
+
+
+def configure_password_policy() -> None:
+    """
+    Застосування політики хешування під час запуску додатка.
+
+    Якщо задано PASSWORD_HASH_TARGET_MS, вартість хешування калібрується,
+    інакше використовуються параметри з налаштувань.
+    """
+    if settings.PASSWORD_HASH_TARGET_MS:
+        Hash.pwd_context = calibrate_password_context(settings.PASSWORD_HASH_TARGET_MS)
+    else:
+        Hash.pwd_context = build_password_context()
+    start = time.perf_counter()
+    Hash.pwd_context.verify("calibration", Hash.pwd_context.hash("calibration"))
+    logger.info(
+        "Password hashing policy: %s, verify cost %.1f ms",
+        Hash.pwd_context.to_dict(),
+        (time.perf_counter() - start) * 1000,
+    )
+
 
 class Hash:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = build_password_context()
 
+    @traced("bcrypt.verify")
     def verify_password(self, plain_password, hashed_password):
         """
         Перевірка, чи співпадає відкритий пароль з захешованим.
         """
         return self.pwd_context.verify(plain_password, hashed_password)
 
+    @traced("bcrypt.verify_and_update")
+    def verify_and_update(self, plain_password, hashed_password):
+        """
+        Перевірка пароля з перехешуванням за поточною політикою.
+
+        Повертає:
+            tuple: (чи співпадає пароль, новий хеш або None, якщо хеш актуальний).
+        """
+        return self.pwd_context.verify_and_update(plain_password, hashed_password)
+
+    @traced("bcrypt.hash")
     def get_password_hash(self, password: str):
         """
         Генерація хешу для пароля.
@@ -35,6 +145,61 @@ class Hash:
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
+@functools.lru_cache(maxsize=1)
+def signing_key():
+    """
+    Ключ підпису JWT, створений один раз замість розбору секрету при кожному виклику.
+    """
+    return jwk.construct(settings.JWT_SECRET, settings.JWT_ALGORITHM)
+
+
+@functools.lru_cache(maxsize=settings.TOKEN_CACHE_SIZE)
+def _verify_signature(token: str) -> dict:
+    # Перевірка підпису кешується за самим токеном; строк дії перевіряється
+    # окремо під час кожного звернення в decode_token.
+    return jwt.decode(
+        token,
+        signing_key(),
+        algorithms=[settings.JWT_ALGORITHM],
+        options={"verify_exp": False},
+    )
+
+
+@traced("jwt.decode")
+def decode_token(token: str) -> dict:
+    """
+    Перевірка токена та отримання його вмісту.
+
+    Повторна перевірка того самого токена не обчислює підпис заново.
+
+    Винятки:
+    - JWTError: Токен недійсний або прострочений.
+    """
+    payload = _verify_signature(token)
+    exp = payload.get("exp")
+    if exp is not None and exp <= time.time():
+        raise ExpiredSignatureError("Signature has expired.")
+    return payload
+
+
+def benchmark_token_verification(iterations: int = 1000) -> float:
+    """
+    Вимірювання середнього часу повної перевірки одного токена (без кешу).
+
+    Повертає:
+    - float: Час перевірки одного токена у секундах.
+    """
+    token = jwt.encode(
+        {"sub": "benchmark", "exp": time.time() + 60},
+        signing_key(),
+        algorithm=settings.JWT_ALGORITHM,
+    )
+    start = time.perf_counter()
+    for _ in range(iterations):
+        jwt.decode(token, signing_key(), algorithms=[settings.JWT_ALGORITHM])
+    return (time.perf_counter() - start) / iterations
+
+
 async def create_access_token(data: dict, expires_delta: Optional[int] = None):
     """
     Створення токену доступу з переданими даними та часом життя.
@@ -44,18 +209,47 @@ async def create_access_token(data: dict, expires_delta: Optional[int] = None):
         expire = datetime.now(UTC) + timedelta(seconds=expires_delta)
     else:
         expire = datetime.now(UTC) + timedelta(seconds=settings.JWT_EXPIRATION_SECONDS)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM
-    )
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    encoded_jwt = jwt.encode(to_encode, signing_key(), algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
+async def get_token_payload(request: Request, token: str = Depends(oauth2_scheme)):
+    """
+    Перевірка токена доступу один раз на запит.
+
+    Вміст токена зберігається в request.state.token_payload, тож повторні
+    залежності в межах запиту не перевіряють підпис заново. Токени, чий jti
+    відкликано, відхиляються без звернення до бази даних.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = getattr(request.state, "token_payload", None)
+    if payload is not None:
+        return payload
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        raise credentials_exception
+    jti = payload.get("jti")
+    if jti is not None and await revocation_list.is_revoked(jti):
+        raise credentials_exception
+    request.state.token_payload = payload
+    return payload
+
+
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    payload: dict = Depends(get_token_payload), db: Session = Depends(get_db)
 ):
     """
-    Отримання користувача з бази даних.
+    Отримання користувача з кешу або бази даних.
+
+    Дані користувача кешуються на PRINCIPAL_TTL, а його відсутність — на
+    NEGATIVE_CACHE_TTL, тож токени видалених користувачів не створюють
+    запитів до бази даних. Користувач з кешу не прив'язаний до сесії.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -63,17 +257,19 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
-        )
-        username = payload["sub"]
-        if username is None:
-            raise credentials_exception
-    except JWTError as e:
+    username = payload.get("sub")
+    if username is None:
         raise credentials_exception
+    key = principal_key(username)
+    found, principal = await cache.get_object(key, principal_codec)
+    if found:
+        if principal is None:
+            raise credentials_exception
+        return User(**principal.model_dump())
     user_service = UserService(db)
     user = await user_service.get_user_by_username(username)
+    ttl = PRINCIPAL_TTL if user is not None else settings.NEGATIVE_CACHE_TTL
+    await cache.set_object(key, principal_codec, user, ttl)
     if user is None:
         raise credentials_exception
     return user
@@ -86,7 +282,7 @@ def create_email_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(UTC) + timedelta(days=7)
     to_encode.update({"iat": datetime.now(UTC), "exp": expire})
-    token = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    token = jwt.encode(to_encode, signing_key(), algorithm=settings.JWT_ALGORITHM)
     return token
 
 
@@ -95,9 +291,7 @@ async def get_email_from_token(token: str):
     Отримання email з токену для підтвердження електронної пошти.
     """
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = decode_token(token)
         email = payload["sub"]
         return email
     except JWTError as e:
@@ -112,9 +306,7 @@ async def get_password_from_token(token: str):
     Отримання пароля з токену для скидання пароля.
     """
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = decode_token(token)
         password = payload["password"]
         return password
     except JWTError as e:
@@ -0,0 +1,173 @@
+import logging
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import SessionFactory, sessionmanager
+from src.database.models import User, birthday_md
+from src.services.cache import (
+    BIRTHDAYS_TTL,
+    birthdays_key,
+    cache,
+    contact_codec,
+)
+from src.services.contacts import ContactBookService
+from src.services.scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+BIRTHDAY_WINDOW_DAYS = 7
+# Зведення містить найдовше вікно, яке можна запросити; коротші є його частиною.
+BIRTHDAY_MAX_DAYS = 31
+# Кількість зведень, що записуються в Redis одним конвеєром.
+BATCH_SIZE = 1000
+
+
+def in_birthday_window(birthday: date, start: date, days: int) -> bool:
+    """
+    Чи входить день народження у вікно з start по start + days включно.
+
+    Межі порівнюються так само, як у SQL-умові birthday_window, тож відбір
+    зі зведення збігається з відбором у базі даних.
+    """
+    start_md = birthday_md(start)
+    end_md = birthday_md(start + timedelta(days=days))
+    md = birthday_md(birthday)
+    if start_md <= end_md:
+        return start_md <= md <= end_md
+    return md >= start_md or md <= end_md
+
+
+class BirthdayDigest:
+    """
+    Зведення найближчих днів народження контактів для кожного користувача.
+
+    Зведення перераховується для всіх користувачів раз на добу щоденною
+    задачею планувальника і зберігається за ключем (користувач, день), тож
+    після півночі вчорашні зведення просто перестають читатися. Для
+    користувачів, у чиєму часовому поясі вже (або ще) інший день, зведення
+    на їхній день обчислюється під час першого читання. Коротші вікна
+    відбираються з того самого зведення. Зміна контакту скидає зведення
+    його власника, у вікно яких вона потрапляє.
+    """
+
+    def __init__(
+        self, days: int, session_factory: SessionFactory = sessionmanager.session
+    ):
+        """
+        Ініціалізація.
+
+        Аргументи:
+            days: Кількість днів після сьогоднішнього, що входять у зведення.
+            session_factory: Фабрика сесій для щоденної задачі.
+        """
+        self.days = days
+        self.session_factory = session_factory
+
+    def today(self, tz: str | None = None) -> date:
+        """
+        Поточна дата в часовому поясі tz або, якщо його не задано, планувальника.
+
+        Винятки:
+        - ValueError: Невідомий часовий пояс.
+        """
+        if tz is None:
+            return scheduler.today()
+        try:
+            return datetime.now(ZoneInfo(tz)).date()
+        except (ZoneInfoNotFoundError, ValueError) as e:
+            raise ValueError(f"Unknown time zone: {tz}") from e
+
+    async def get(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        day: date | None = None,
+        days: int = BIRTHDAY_WINDOW_DAYS,
+    ) -> list:
+        """
+        Отримання контактів з днями народження протягом days днів від day.
+
+        Аргументи:
+            db: Сесія бази даних для обчислення зведення при промаху.
+            user_id: ID користувача.
+            day: Сьогоднішня дата користувача (за замовчуванням — планувальника).
+            days: Довжина вікна, не більша за довжину зведення.
+        """
+        day = day or scheduler.today()
+        key = birthdays_key(user_id, day)
+        found, digest = await cache.get_object(key, contact_codec)
+        if not found:
+            digest = await ContactBookService(db).get_birthdays(user_id, day, self.days)
+            await cache.set_object(key, contact_codec, digest, BIRTHDAYS_TTL)
+        if days >= self.days:
+            return digest
+        return [c for c in digest if in_birthday_window(c.birthday, day, days)]
+
+    async def apply_change(
+        self,
+        user_id: int,
+        birthday: date | None,
+        old_birthday: date | None = None,
+    ) -> None:
+        """
+        Скидання збережених зведень користувача після зміни одного контакту.
+
+        Зведення на сьогодні та сусідні дні (для інших часових поясів)
+        видаляються, лише якщо старий або новий день народження контакту
+        потрапляє в їхнє вікно; наступне читання обчислить їх заново запитом
+        за індексом birthday_md. Зведення не редагуються на місці: два
+        паралельні зчитування-зміни-записи одного ключа втрачали б одну зі змін.
+
+        Аргументи:
+            user_id: ID користувача.
+            birthday: День народження контакту після зміни (None, якщо контакт видалено).
+            old_birthday: День народження до зміни, якщо він міг змінитися.
+        """
+        today = scheduler.today()
+        keys = [
+            birthdays_key(user_id, day)
+            for day in (today + timedelta(days=d) for d in (-1, 0, 1))
+            if any(
+                value is not None and in_birthday_window(value, day, self.days)
+                for value in (old_birthday, birthday)
+            )
+        ]
+        if keys:
+            # Видалення повідомляє інші воркери, що їхня копія в L1 застаріла.
+            await cache.delete(*keys)
+
+    async def refresh_all(self, day: date) -> None:
+        """
+        Щоденна задача: перерахунок зведень усіх користувачів на день day.
+
+        Контакти всіх користувачів вибираються одним запитом за індексом
+        birthday_md; користувачі без найближчих днів народження отримують
+        порожнє зведення, щоб запит до API не звертався до бази даних.
+        """
+        async with self.session_factory() as db:
+            user_ids = (await db.execute(select(User.id))).scalars().all()
+            contacts = await ContactBookService(db).get_all_birthdays(day, self.days)
+        by_user = {
+            user_id: list(items)
+            for user_id, items in groupby(contacts, key=lambda c: c.user_id)
+        }
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            await cache.remote.set_many(
+                {
+                    birthdays_key(user_id, day): contact_codec.dumps(
+                        by_user.get(user_id, [])
+                    )
+                    for user_id in user_ids[start : start + BATCH_SIZE]
+                },
+                BIRTHDAYS_TTL,
+            )
+        logger.info(
+            "Birthday digests for %s recomputed for %d users", day, len(user_ids)
+        )
+
+
+birthday_digest = BirthdayDigest(BIRTHDAY_MAX_DAYS)
@@ -0,0 +1,419 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.services.deadline import timeout_for
+from src.schemas import ContactGet, ContactStats, Principal
+from src.services.serialization import CacheFormatError, ModelCodec
+from src.services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class RedisCache:
+    """
+    Тонка обгортка над асинхронним клієнтом Redis для кешування відповідей API.
+
+    Кожна операція виконується у власному спані трасування та обмежена
+    крайнім терміном поточного запиту. Помилки та тайм-аути Redis не
+    переривають запит: читання вважається промахом, запис пропускається.
+    """
+
+    def __init__(self, client: redis.Redis):
+        """
+        Ініціалізація кешу.
+
+        Аргументи:
+            client: Асинхронний клієнт Redis.
+        """
+        self.client = client
+
+    async def _call(self, coro):
+        try:
+            return await asyncio.wait_for(
+                coro, timeout_for(settings.REDIS_SOCKET_TIMEOUT)
+            )
+        except (RedisError, asyncio.TimeoutError, OSError) as e:
+            logger.warning("Redis call failed: %r", e)
+            return None
+
+    async def get(self, key: str) -> bytes | None:
+        """
+        Отримання значення з кешу за ключем.
+        """
+        with tracer.start_span("redis.get", **{"cache.key": key}) as span:
+            value = await self._call(self.client.get(key))
+            span.set_attribute("cache.hit", value is not None)
+            return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        """
+        Збереження значення в кеші з часом життя у секундах.
+        """
+        with tracer.start_span("redis.set", **{"cache.key": key}):
+            await self._call(self.client.set(key, value, ex=ttl))
+
+    async def set_many(self, items: dict[str, bytes], ttl: int) -> None:
+        """
+        Збереження кількох значень одним конвеєром з однаковим часом життя.
+        """
+        with tracer.start_span("redis.set_many", **{"cache.keys": len(items)}):
+            pipeline = self.client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipeline.set(key, value, ex=ttl)
+            await self._call(pipeline.execute())
+
+    async def delete(self, *keys: str) -> None:
+        """
+        Видалення значень з кешу.
+        """
+        with tracer.start_span("redis.delete", **{"cache.keys": len(keys)}):
+            await self._call(self.client.delete(*keys))
+
+    async def acquire_lock(self, key: str, ttl: int) -> bool | None:
+        """
+        Захоплення блокування, яке звільняється лише після закінчення ttl секунд.
+
+        Повертає:
+            bool | None: True, якщо блокування захоплено; False, якщо його
+            вже утримує інший воркер; None, якщо Redis недоступний.
+        """
+        with tracer.start_span("redis.lock", **{"cache.key": key}) as span:
+            try:
+                acquired = await asyncio.wait_for(
+                    self.client.set(key, b"1", nx=True, ex=ttl),
+                    timeout_for(settings.REDIS_SOCKET_TIMEOUT),
+                )
+            except (RedisError, asyncio.TimeoutError, OSError) as e:
+                logger.warning("Redis call failed: %r", e)
+                return None
+            span.set_attribute("lock.acquired", bool(acquired))
+            return bool(acquired)
+
+    async def add_recent(self, key: str, member: str, limit: int) -> None:
+        """
+        Додавання елемента до відсортованої за часом множини, обмеженої limit елементами.
+        """
+        with tracer.start_span("redis.zadd", **{"cache.key": key}):
+            pipeline = self.client.pipeline(transaction=False)
+            pipeline.zadd(key, {member: time.time()})
+            pipeline.zremrangebyrank(key, 0, -limit - 1)
+            await self._call(pipeline.execute())
+
+    async def get_recent(self, key: str, count: int) -> list[str]:
+        """
+        Отримання count останніх доданих елементів множини.
+        """
+        with tracer.start_span("redis.zrevrange", **{"cache.key": key}):
+            members = await self._call(self.client.zrevrange(key, 0, count - 1))
+            return [member.decode() for member in members or []]
+
+    async def publish(self, channel: str, message: str) -> None:
+        """
+        Публікація повідомлення в канал Redis.
+        """
+        with tracer.start_span("redis.publish", **{"redis.channel": channel}):
+            await self._call(self.client.publish(channel, message))
+
+
+class LocalCache:
+    """
+    Кеш у пам'яті процесу (L1) з обмеженням кількості записів (LRU) та часу життя.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        """
+        Ініціалізація кешу.
+
+        Аргументи:
+            max_entries: Максимальна кількість записів.
+            ttl: Максимальний час життя запису у секундах.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + min(ttl, self.ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class CacheStats:
+    """
+    Лічильники влучань у кеш за рівнями.
+    """
+
+    def __init__(self):
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+
+    def snapshot(self) -> dict:
+        """
+        Поточні лічильники та частки влучань.
+        """
+        total = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "l1_hit_rate": self.l1_hits / total if total else 0.0,
+            "l2_hit_rate": self.l2_hits / total if total else 0.0,
+        }
+
+
+class TieredCache:
+    """
+    Дворівневий кеш: LocalCache (L1) у кожному воркері перед RedisCache (L2).
+
+    Видалення ключів публікується в канал Redis, і кожен воркер видаляє їх
+    зі свого L1. Якщо повідомлення втрачено (наприклад, під час розриву
+    з'єднання), застарілий запис L1 живе не довше за CACHE_L1_TTL.
+
+    Інші кеші процесу можуть підписатися на ті самі інвалідації через
+    add_listener: слухач отримує список ключів або None, якщо потрібно
+    очистити все.
+    """
+
+    def __init__(self, local: LocalCache, remote: RedisCache, channel: str):
+        """
+        Ініціалізація кешу.
+
+        Аргументи:
+            local: Кеш у пам'яті процесу.
+            remote: Спільний кеш Redis.
+            channel: Канал Redis для повідомлень про інвалідацію.
+        """
+        self.local = local
+        self.remote = remote
+        self.channel = channel
+        self.stats = CacheStats()
+        self._listener: asyncio.Task | None = None
+        self._subscribers: list[Callable[[list[str] | None], None]] = []
+
+    def add_listener(self, callback: Callable[[list[str] | None], None]) -> None:
+        """
+        Підписка кешу процесу на інвалідацію ключів у цьому та інших воркерах.
+        """
+        self._subscribers.append(callback)
+
+    def _drop_local(self, keys: list[str] | None = None) -> None:
+        if keys is None:
+            self.local.clear()
+        else:
+            self.local.delete(*keys)
+        for callback in self._subscribers:
+            callback(keys)
+
+    async def get(self, key: str) -> bytes | None:
+        """
+        Отримання значення з L1, а при промаху — з Redis.
+        """
+        value = self.local.get(key)
+        if value is not None:
+            self.stats.l1_hits += 1
+            return value
+        value = await self.remote.get(key)
+        if value is None:
+            self.stats.misses += 1
+            return None
+        self.stats.l2_hits += 1
+        self.local.set(key, value, self.local.ttl)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        """
+        Збереження значення в обох рівнях.
+        """
+        self.local.set(key, value, ttl)
+        await self.remote.set(key, value, ttl)
+
+    async def get_object(self, key: str, codec: ModelCodec) -> tuple[bool, Any]:
+        """
+        Отримання та декодування значення.
+
+        Записи іншої версії схеми вважаються промахом.
+
+        Повертає:
+            tuple: (чи знайдено значення, значення).
+        """
+        data = await self.get(key)
+        if data is None:
+            return False, None
+        try:
+            return True, codec.loads(data)
+        except CacheFormatError:
+            self.local.delete(key)
+            return False, None
+
+    async def set_object(
+        self, key: str, codec: ModelCodec, value: Any, ttl: int
+    ) -> None:
+        """
+        Кодування та збереження значення.
+        """
+        await self.set(key, codec.dumps(value), ttl)
+
+    async def delete(self, *keys: str) -> None:
+        """
+        Видалення значень з обох рівнів та повідомлення інших воркерів.
+        """
+        self._drop_local(list(keys))
+        await self.remote.delete(*keys)
+        await self.remote.publish(self.channel, "\n".join(keys))
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.remote.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # Під час розриву з'єднання повідомлення могли загубитися.
+                    self._drop_local()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._drop_local(message["data"].decode().split("\n"))
+            except (RedisError, OSError) as e:
+                logger.warning("Cache invalidation listener error: %r", e)
+                self._drop_local()
+                await asyncio.sleep(5)
+
+    def start(self) -> None:
+        """
+        Запуск фонового слухача повідомлень про інвалідацію.
+        """
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """
+        Зупинка фонового слухача.
+        """
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+
+redis_cache = RedisCache(
+    redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        db=0,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
+)
+cache = TieredCache(
+    LocalCache(settings.CACHE_L1_MAX_ENTRIES, settings.CACHE_L1_TTL),
+    redis_cache,
+    "cache-invalidation",
+)
+
+contact_codec = ModelCodec(ContactGet)
+principal_codec = ModelCodec(Principal)
+stats_codec = ModelCodec(ContactStats)
+
+# Кешується лише перша сторінка списків контактів розміром DEFAULT_PAGE_SIZE.
+DEFAULT_PAGE_SIZE = 100
+CONTACT_TTL = 300
+CONTACTS_PAGE_TTL = 300
+# Зведення днів народження перераховується щодня; запас на випадок пропуску.
+BIRTHDAYS_TTL = 2 * 24 * 3600
+PRINCIPAL_TTL = 300
+STATS_TTL = 3600
+
+
+def contact_key(user_id: int, contact_id: int) -> str:
+    """
+    Ключ кешу контакту в межах користувача.
+    """
+    return f"contact:{user_id}:{contact_id}"
+
+
+def contacts_page_key(user_id: int) -> str:
+    """
+    Ключ кешу першої сторінки контактів користувача.
+    """
+    return f"contacts:{user_id}"
+
+
+def birthdays_key(user_id: int, day: date) -> str:
+    """
+    Ключ зведення найближчих днів народження контактів користувача на день day.
+    """
+    return f"bdays:{user_id}:{day.isoformat()}"
+
+
+def phone_key(user_id: int, phone_e164: str) -> str:
+    """
+    Ключ кешу контактів користувача з номером телефону phone_e164.
+    """
+    return f"phone:{user_id}:{phone_e164}"
+
+
+def stats_key(user_id: int) -> str:
+    """
+    Ключ кешу статистики контактів користувача.
+    """
+    return f"stats:{user_id}"
+
+
+def suggest_key(user_id: int) -> str:
+    """
+    Ключ інвалідації індексу підказок контактів користувача.
+    """
+    return f"suggest:{user_id}"
+
+
+def principal_key(username: str) -> str:
+    """
+    Ключ кешу даних автентифікованого користувача (або його відсутності).
+    """
+    return f"user:{username.lower()}"
+
+
+async def invalidate_contacts(
+    user_id: int, *contact_ids: int, phones: tuple[str | None, ...] = ()
+) -> None:
+    """
+    Інвалідація кешованих даних контактів користувача після змін.
+
+    Аргументи:
+        user_id: ID користувача.
+        contact_ids: ID змінених контактів.
+        phones: Номери E.164 змінених контактів до і після зміни.
+    """
+    await cache.delete(
+        contacts_page_key(user_id),
+        stats_key(user_id),
+        suggest_key(user_id),
+        *(contact_key(user_id, contact_id) for contact_id in contact_ids),
+        *(phone_key(user_id, phone) for phone in set(phones) if phone),
+    )
@@ -1,11 +1,15 @@
+from datetime import date
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repository.contacts import ContactBookRepository
 from src.schemas import ContactSet, ContactUpdate
 
 from src.database.models import User
+from src.services.tracing import instrument
 
 
+@instrument("service")
 class ContactBookService:
     """
     Сервіс для роботи з контактами користувача. Дозволяє створювати, оновлювати, видаляти та отримувати контакти.
@@ -32,12 +36,24 @@ class ContactBookService:
         """
         return await self.contact_repository.get_all_contacts(skip, limit, user)
 
+    async def count_contacts(self, user: User):
+        """
+        Кількість контактів користувача.
+        """
+        return await self.contact_repository.count_contacts(user)
+
     async def get_contact(self, contact_id: int, user: User):
         """
         Отримання контакту по ID.
         """
         return await self.contact_repository.get_contact(contact_id, user)
 
+    async def get_contacts_by_phone(self, phone_e164: str, user: User):
+        """
+        Отримання контактів за номером телефону у форматі E.164.
+        """
+        return await self.contact_repository.get_contacts_by_phone(phone_e164, user)
+
     async def update_contact(self, contact_id: int, body: ContactUpdate, user: User):
         """
         Оновлення контакту по ID.
@@ -50,14 +66,54 @@ class ContactBookService:
         """
         return await self.contact_repository.remove_contact(contact_id, user)
 
-    async def get_birthdays(self, skip: int, limit: int, user: User):
+    async def get_birthdays(self, user_id: int, start: date, days: int):
+        """
+        Отримання контактів користувача з днями народження протягом days днів від start.
+        """
+        return await self.contact_repository.get_birthdays(user_id, start, days)
+
+    async def get_all_birthdays(self, start: date, days: int):
+        """
+        Отримання контактів усіх користувачів з днями народження протягом days днів від start.
+        """
+        return await self.contact_repository.get_all_birthdays(start, days)
+
+    async def get_reminder_birthdays(
+        self, start: date, days: int, after_user_id: int, user_limit: int
+    ):
         """
-        Отримання списку контактів, які мають день народження протягом наступних 7 днів.
+        Дні народження для наступної порції користувачів, що ввімкнули нагадування.
         """
-        return await self.contact_repository.get_birthdays(skip, limit, user)
+        return await self.contact_repository.get_reminder_birthdays(
+            start, days, after_user_id, user_limit
+        )
+
+    async def get_stats(self, user: User, top_domains: int = 10):
+        """
+        Статистика контактів: загальна кількість, дні народження за місяцями та домени пошти.
+        """
+        return await self.contact_repository.get_stats(user, top_domains)
 
     async def find_contacts(self, query: str, skip: int, limit: int, user: User):
         """
         Пошук контактів за фільтрами.
         """
         return await self.contact_repository.find_contacts(query, skip, limit, user)
+
+    async def count_found_contacts(self, query: str, user: User, cap: int):
+        """
+        Обмежений підрахунок контактів, що відповідають пошуку.
+        """
+        return await self.contact_repository.count_found_contacts(query, user, cap)
+
+    async def suggest_contacts(self, prefix: str, limit: int, user: User):
+        """
+        Контакти, ім'я, прізвище або email яких починається з prefix.
+        """
+        return await self.contact_repository.suggest_contacts(prefix, limit, user)
+
+    async def get_suggestion_entries(self, user: User):
+        """
+        Поля всіх контактів користувача для індексу підказок.
+        """
+        return await self.contact_repository.get_suggestion_entries(user)
@@ -0,0 +1,162 @@
+import asyncio
+import contextvars
+import time
+
+from starlette.responses import JSONResponse
+
+from src.conf.config import settings
+
+
+class Deadline:
+    """
+    Крайній термін обробки запиту.
+
+    Атрибути:
+    - expires_at: Момент (за time.monotonic), після якого робота втрачає сенс,
+      або None, якщо обмеження знято (наприклад, для фонових задач після відповіді).
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, timeout: float):
+        self.expires_at: float | None = time.monotonic() + timeout
+
+    def remaining(self) -> float | None:
+        """
+        Час, що залишився до крайнього терміну (секунди), або None.
+        """
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+
+_deadline: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar(
+    "deadline", default=None
+)
+
+
+def remaining_time() -> float | None:
+    """
+    Час, що залишився до крайнього терміну поточного запиту, або None.
+    """
+    deadline = _deadline.get()
+    return deadline.remaining() if deadline else None
+
+
+def timeout_for(default: float) -> float:
+    """
+    Тайм-аут для зовнішнього виклику: менше зі стандартного значення
+    та часу, що залишився до крайнього терміну запиту.
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return default
+    return max(min(default, remaining), 0.001)
+
+
+def route_timeout(path: str) -> float:
+    """
+    Стандартний тайм-аут для маршруту (найдовший збіг префікса з налаштувань).
+    """
+    matches = [
+        prefix for prefix in settings.REQUEST_TIMEOUT_ROUTES if path.startswith(prefix)
+    ]
+    if not matches:
+        return settings.REQUEST_TIMEOUT
+    return settings.REQUEST_TIMEOUT_ROUTES[max(matches, key=len)]
+
+
+def _requested_timeout(scope) -> float | None:
+    for name, value in scope.get("headers") or []:
+        if name == b"x-request-timeout":
+            try:
+                timeout = float(value)
+            except ValueError:
+                return None
+            return timeout if timeout > 0 else None
+    return None
+
+
+class DeadlineMiddleware:
+    """
+    ASGI-проміжний шар, що встановлює крайній термін для кожного запиту.
+
+    Тайм-аут береться із заголовка X-Request-Timeout (секунди, не більше
+    REQUEST_TIMEOUT_MAX) або з налаштувань маршруту. Обробка скасовується,
+    якщо крайній термін минув до початку відповіді (відповідь 504) або якщо
+    клієнт від'єднався. Після надсилання відповіді обмеження знімається,
+    щоб не переривати фонові задачі.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = route_timeout(scope["path"])
+        requested = _requested_timeout(scope)
+        if requested is not None:
+            timeout = min(requested, settings.REQUEST_TIMEOUT_MAX)
+
+        deadline = Deadline(timeout)
+        token = _deadline.set(deadline)
+        messages: asyncio.Queue = asyncio.Queue(maxsize=1)
+        response_started = False
+        response_complete = False
+        cancelled_by = None
+
+        async def receive_wrapper():
+            return await messages.get()
+
+        async def send_wrapper(message):
+            nonlocal response_started, response_complete
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_complete = True
+                deadline.expires_at = None
+                timer.cancel()
+            await send(message)
+
+        app_task = asyncio.create_task(self.app(scope, receive_wrapper, send_wrapper))
+
+        def cancel(reason: str):
+            nonlocal cancelled_by
+            if not response_complete and not app_task.done():
+                cancelled_by = reason
+                app_task.cancel()
+
+        async def pump():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    cancel("disconnect")
+                    await messages.put(message)
+                    return
+                await messages.put(message)
+
+        timer = asyncio.get_running_loop().call_later(
+            timeout, lambda: None if response_started else cancel("timeout")
+        )
+        pump_task = asyncio.create_task(pump())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if cancelled_by is None:
+                app_task.cancel()
+                raise
+            if cancelled_by == "timeout" and not response_started:
+                response = JSONResponse(
+                    status_code=504,
+                    content={"error": "Час обробки запиту вичерпано."},
+                )
+                await response(scope, receive, send)
+        finally:
+            timer.cancel()
+            pump_task.cancel()
+            _deadline.reset(token)
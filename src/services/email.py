@@ -1,27 +1,298 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from email.utils import formataddr
 from pathlib import Path
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+import aiosmtplib
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pydantic import EmailStr
 
 from src.services.auth import create_email_token
 from src.conf.config import settings
+from src.services.tracing import traced, tracer
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=settings.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+logger = logging.getLogger(__name__)
+
+TEMPLATE_FOLDER = Path(__file__).parent / "templates"
+
+# Шаблони компілюються один раз і зберігаються в кеші оточення;
+# auto_reload вимкнено, щоб не перевіряти файли на диску під час кожного листа.
+templates = Environment(
+    loader=FileSystemLoader(TEMPLATE_FOLDER),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
 )
 
 
+def precompile_templates() -> None:
+    """
+    Попередня компіляція всіх шаблонів листів (викликається під час запуску).
+    """
+    for name in templates.list_templates():
+        templates.get_template(name)
+
+
+def build_message(
+    subject: str, recipient: str, template_name: str, context: dict
+) -> EmailMessage:
+    """
+    Формування HTML-листа з шаблону.
+
+    Аргументи:
+        subject: Тема листа.
+        recipient: Адреса отримувача.
+        template_name: Ім'я шаблону в папці templates.
+        context: Змінні для шаблону.
+
+    Повертає:
+        EmailMessage: Готовий до надсилання лист.
+    """
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = formataddr((settings.MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = recipient
+    message.set_content(
+        templates.get_template(template_name).render(**context), subtype="html"
+    )
+    return message
+
+
+class SMTPConnectionPool:
+    """
+    Пул автентифікованих SMTP-з'єднань.
+
+    З'єднання повторно використовуються між листами. З'єднання, що простояло
+    довше MAIL_KEEPALIVE секунд, перевіряється командою NOOP і за потреби
+    перевідкривається; з'єднання, на якому сталася помилка, закривається.
+    """
+
+    def __init__(self, size: int):
+        """
+        Ініціалізація пулу.
+
+        Аргументи:
+            size: Максимальна кількість одночасних з'єднань.
+        """
+        self.size = size
+        self._idle: list[tuple[aiosmtplib.SMTP, float]] = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            username=settings.MAIL_USERNAME if settings.USE_CREDENTIALS else None,
+            password=settings.MAIL_PASSWORD if settings.USE_CREDENTIALS else None,
+            use_tls=settings.MAIL_SSL_TLS,
+            start_tls=settings.MAIL_STARTTLS,
+            validate_certs=settings.VALIDATE_CERTS,
+            timeout=settings.MAIL_TIMEOUT,
+        )
+        with tracer.start_span("smtp.connect"):
+            await smtp.connect()
+        return smtp
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            smtp, idle_since = self._idle.pop()
+            if not smtp.is_connected:
+                continue
+            if time.monotonic() - idle_since < settings.MAIL_KEEPALIVE:
+                return smtp
+            try:
+                await smtp.noop()
+                return smtp
+            except (aiosmtplib.SMTPException, OSError):
+                smtp.close()
+        return await self._connect()
+
+    @asynccontextmanager
+    async def connection(self):
+        """
+        Контекстний менеджер для отримання з'єднання з пулу.
+        """
+        async with self._semaphore:
+            smtp = await self._acquire()
+            try:
+                yield smtp
+            except BaseException:
+                smtp.close()
+                raise
+            else:
+                self._idle.append((smtp, time.monotonic()))
+
+    async def close(self) -> None:
+        """
+        Закриття всіх вільних з'єднань.
+        """
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            try:
+                await smtp.quit()
+            except (aiosmtplib.SMTPException, OSError):
+                smtp.close()
+
+
+class SMTPBackend:
+    """
+    Надсилання листів через пул SMTP-з'єднань з одним повтором при розриві.
+    """
+
+    def __init__(self, pool: SMTPConnectionPool):
+        self.pool = pool
+
+    async def send(self, message: EmailMessage) -> None:
+        for attempt in range(2):
+            try:
+                async with self.pool.connection() as smtp:
+                    await smtp.send_message(message)
+                return
+            except aiosmtplib.SMTPServerDisconnected:
+                if attempt:
+                    raise
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+
+class MemoryBackend:
+    """
+    Локальний приймач листів для тестів: листи зберігаються у списку outbox.
+    """
+
+    def __init__(self):
+        self.outbox: list[EmailMessage] = []
+
+    async def send(self, message: EmailMessage) -> None:
+        self.outbox.append(message)
+
+    async def close(self) -> None:
+        pass
+
+
+class EmailSender:
+    """
+    Надсилання листів поодинці або пакетами з обмеженням паралельності.
+    """
+
+    def __init__(self, backend, concurrency: int):
+        """
+        Ініціалізація відправника.
+
+        Аргументи:
+            backend: Бекенд надсилання (SMTPBackend або MemoryBackend).
+            concurrency: Максимальна кількість листів, що надсилаються одночасно.
+        """
+        self.backend = backend
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(self, message: EmailMessage) -> bool:
+        """
+        Надсилання одного листа. Помилки логуються і не передаються далі.
+
+        Повертає:
+            bool: True, якщо лист надіслано.
+        """
+        async with self._semaphore:
+            with tracer.start_span(
+                "email.send", **{"email.subject": message["Subject"]}
+            ):
+                try:
+                    await self.backend.send(message)
+                    return True
+                except (aiosmtplib.SMTPException, OSError) as err:
+                    logger.warning("Email sending failed: %s", err)
+                    return False
+
+    async def send_batch(self, messages: list[EmailMessage]) -> int:
+        """
+        Надсилання пакета листів.
+
+        Повертає:
+            int: Кількість успішно надісланих листів.
+        """
+        with tracer.start_span("email.send_batch", **{"email.count": len(messages)}):
+            results = await asyncio.gather(*(self.send(m) for m in messages))
+        return sum(results)
+
+
+class EmailQueue:
+    """
+    Черга листів, що обробляється фоновим воркером пакетами до batch_size.
+    """
+
+    def __init__(self, sender: EmailSender, batch_size: int):
+        self.sender = sender
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue[EmailMessage] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def put(self, message: EmailMessage) -> None:
+        """
+        Додавання листа до черги.
+        """
+        await self._queue.put(message)
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self.sender.send_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def start(self) -> None:
+        """
+        Запуск фонового воркера.
+        """
+        if not self.running:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Надсилання листів, що залишилися в черзі, та зупинка воркера.
+        """
+        if self.running:
+            await self._queue.join()
+            self._worker.cancel()
+        self._worker = None
+        await self.sender.backend.close()
+
+
+def build_backend():
+    """
+    Створення бекенду надсилання відповідно до налаштування MAIL_BACKEND.
+    """
+    if settings.MAIL_BACKEND == "memory":
+        return MemoryBackend()
+    return SMTPBackend(SMTPConnectionPool(settings.MAIL_POOL_SIZE))
+
+
+email_sender = EmailSender(build_backend(), settings.MAIL_CONCURRENCY)
+email_queue = EmailQueue(email_sender, settings.MAIL_BATCH_SIZE)
+
+
+async def deliver(message: EmailMessage) -> None:
+    """
+    Передача листа у чергу, якщо воркер запущено, або негайне надсилання.
+    """
+    if email_queue.running:
+        await email_queue.put(message)
+    else:
+        await email_sender.send(message)
+
+
+@traced("email.send_verification")
 async def send_email(email: EmailStr, username: str, host: str):
     """
     Відправляє електронну пошту з посиланням для підтвердження адреси та створює токен для підтвердження.
@@ -30,30 +301,19 @@ async def send_email(email: EmailStr, username: str, host: str):
         email: Адреса електронної пошти отримувача.
         username: Ім'я користувача.
         host: Хост, який використовується для побудови посилання.
+    """
 
-    Повертає:
-        ConnectionErrors: Якщо виникає помилка під час підключення до сервера електронної пошти.
-    """
-
-    try:
-        token_verification = create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Confirm your email",
-            recipients=[email],
-            template_body={
-                "host": host,
-                "username": username,
-                "token": token_verification,
-            },
-            subtype=MessageType.html,
-        )
-
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="verify_email.html")
-    except ConnectionErrors as err:
-        print(err)
+    token_verification = create_email_token({"sub": email})
+    message = build_message(
+        "Confirm your email",
+        email,
+        "verify_email.html",
+        {"host": host, "username": username, "token": token_verification},
+    )
+    await deliver(message)
 
 
+@traced("email.send_reset_password")
 async def send_reset_password_email(
     email: EmailStr, username: str, host: str, reset_token: str
 ):
@@ -68,23 +328,11 @@ async def send_reset_password_email(
         username: Ім'я користувача.
         host: Хост, який використовується для побудови посилання.
         reset_token: Токен для скидання пароля, що додається до посилання.
-
-    Повертає:
-        ConnectionErrors: Якщо виникає помилка під час підключення до сервера електронної пошти.
-    """
-    try:
-        message = MessageSchema(
-            subject="Important: Update your account information",
-            recipients=[email],
-            template_body={
-                "host": host,
-                "username": username,
-                "reset_token": reset_token,
-            },
-            subtype=MessageType.html,
-        )
-
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="reset_password.html")
-    except ConnectionErrors as err:
-        print(err)
+    """
+    message = build_message(
+        "Important: Update your account information",
+        email,
+        "reset_password.html",
+        {"host": host, "username": username, "reset_token": reset_token},
+    )
+    await deliver(message)
@@ -0,0 +1,27 @@
+from functools import lru_cache
+
+from libgravatar import Gravatar
+
+from src.conf.config import settings
+
+
+@lru_cache(maxsize=10_000)
+def _gravatar_url(email: str, default: str) -> str:
+    return Gravatar(email).get_image(default=default)
+
+
+def gravatar_url(email: str) -> str:
+    """
+    URL аватара Gravatar для email.
+
+    URL будується локально з хешу email без звернення до Gravatar. Параметр
+    default (GRAVATAR_DEFAULT) задає зображення, яке Gravatar віддасть для
+    email без власного аватара, тож URL завжди дійсний.
+
+    Аргументи:
+        email: Електронна пошта користувача.
+
+    Повертає:
+        str: URL аватара.
+    """
+    return _gravatar_url(email.strip().lower(), settings.GRAVATAR_DEFAULT)
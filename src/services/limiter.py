@@ -0,0 +1,50 @@
+from urllib.parse import quote
+
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from src.conf.config import settings
+
+
+def rate_limit_storage_uri() -> str:
+    """
+    Сховище лічильників лімітів.
+
+    Якщо RATE_LIMIT_STORAGE_URI не задано, використовується той самий Redis,
+    що й для кешу (REDIS_HOST, REDIS_PORT, REDIS_PASSWORD), тож за
+    замовчуванням ліміти спільні для всіх воркерів і вузлів. Сховище
+    'memory://' рахує ліміти окремо в кожному процесі і придатне лише для
+    одного воркера (напр. у тестах).
+    """
+    if settings.RATE_LIMIT_STORAGE_URI:
+        return settings.RATE_LIMIT_STORAGE_URI
+    auth = (
+        f":{quote(settings.REDIS_PASSWORD, safe='')}@"
+        if settings.REDIS_PASSWORD
+        else ""
+    )
+    return f"redis://{auth}{settings.REDIS_HOST}:{settings.REDIS_PORT}/0"
+
+
+_storage_uri = rate_limit_storage_uri()
+
+# Спільний обмежувач для всіх маршрутів. Зі сховищем Redis лічильники
+# оновлюються атомарними Lua-скриптами. Якщо Redis недоступний і ввімкнено
+# RATE_LIMIT_IN_MEMORY_FALLBACK, ліміти тимчасово рахуються в пам'яті кожного
+# процесу (slowapi записує про це попередження в журнал); інакше запити
+# з лімітами завершуються помилкою, доки Redis не відновиться.
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=_storage_uri,
+    storage_options=(
+        {
+            "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+            "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        }
+        if _storage_uri.startswith("redis")
+        else {}
+    ),
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    key_prefix="rate-limit",
+    in_memory_fallback_enabled=settings.RATE_LIMIT_IN_MEMORY_FALLBACK,
+)
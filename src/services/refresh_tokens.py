@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import secrets
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import settings
+from src.database.db import SessionFactory, sessionmanager
+from src.repository.refresh_tokens import RefreshTokenRepository
+from src.services.tracing import instrument
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    # Колонки DateTime зберігають час UTC без часового поясу.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def hash_token(token: str) -> str:
+    """
+    SHA-256 хеш токена оновлення.
+
+    Токен має 256 біт випадковості, тому повільне хешування (bcrypt) не потрібне.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+@instrument("service")
+class RefreshTokenService:
+    """
+    Сервіс видачі та ротації токенів оновлення.
+    """
+
+    def __init__(self, db: AsyncSession):
+        """
+        Ініціалізація сервісу.
+
+        Аргументи:
+            db: Об'єкт асинхронної сесії бази даних.
+        """
+        self.repository = RefreshTokenRepository(db)
+
+    def _new_token(self) -> tuple[str, str, datetime]:
+        token = secrets.token_urlsafe(32)
+        expires_at = _utcnow() + timedelta(
+            seconds=settings.REFRESH_TOKEN_EXPIRATION_SECONDS
+        )
+        return token, hash_token(token), expires_at
+
+    async def issue(self, user_id: int) -> str:
+        """
+        Видача нового токена оновлення в новій родині (для нового входу).
+
+        Аргументи:
+            user_id: ID користувача.
+
+        Повертає:
+            str: Токен оновлення (у базі зберігається лише його хеш).
+        """
+        token, token_hash, expires_at = self._new_token()
+        await self.repository.create_token(
+            user_id, token_hash, secrets.token_hex(16), expires_at
+        )
+        return token
+
+    async def rotate(self, token: str) -> tuple[str, str]:
+        """
+        Обмін токена оновлення на новий.
+
+        Використаний токен відкликається разом зі збереженням нового в одній
+        транзакції. Якщо пред'явлено вже відкликаний токен, відкликається вся
+        його родина, оскільки токен, імовірно, викрадено. Прострочений токен
+        просто відхиляється.
+
+        Аргументи:
+            token: Токен оновлення від клієнта.
+
+        Повертає:
+            tuple: Ім'я користувача і новий токен оновлення, або HTTPException (401).
+        """
+        invalid_token = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Недійсний токен оновлення",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        stored = await self.repository.get_token_by_hash(hash_token(token))
+        if stored is None:
+            raise invalid_token
+        # Значення читаються до комітів, після яких атрибути моделі застарівають.
+        family_id, username = stored.family_id, stored.user.username
+        now = _utcnow()
+        if stored.revoked_at is None and stored.expires_at <= now:
+            raise invalid_token
+        new_token, token_hash, expires_at = self._new_token()
+        if stored.revoked_at is not None or not await self.repository.rotate_token(
+            stored, token_hash, expires_at, now
+        ):
+            await self.repository.revoke_family(family_id, now)
+            raise invalid_token
+        return username, new_token
+
+    async def revoke(self, token: str, user_id: int) -> None:
+        """
+        Відкликання родини токена оновлення, напр. під час виходу.
+
+        Аргументи:
+            token: Токен оновлення від клієнта.
+            user_id: ID користувача, якому має належати токен.
+        """
+        stored = await self.repository.get_token_by_hash(hash_token(token))
+        if stored is not None and stored.user_id == user_id:
+            await self.repository.revoke_family(stored.family_id, _utcnow())
+
+    async def revoke_user(self, user_id: int) -> None:
+        """
+        Відкликання всіх токенів оновлення користувача, напр. після зміни пароля.
+
+        Аргументи:
+            user_id: ID користувача.
+        """
+        await self.repository.revoke_user(user_id, _utcnow())
+
+
+class RefreshTokenPurge:
+    """
+    Щоденна задача: видалення прострочених токенів оновлення.
+
+    Кожна ротація додає новий рядок, тож без очищення таблиця росте
+    необмежено. Видаляються лише токени з минулим строком дії: відкликані
+    токени залишаються до кінця свого строку, щоб повторне пред'явлення
+    вкраденого токена й далі відкликало всю родину. Прострочений токен
+    однаково відхиляється, тож після видалення нічого не змінюється.
+    """
+
+    def __init__(self, session_factory: SessionFactory = sessionmanager.session):
+        """
+        Ініціалізація.
+
+        Аргументи:
+            session_factory: Фабрика сесій бази даних.
+        """
+        self.session_factory = session_factory
+
+    async def run(self, day: date) -> None:
+        """
+        Видалення токенів, прострочених на момент запуску.
+
+        Аргументи:
+            day: День, за який виконується задача.
+        """
+        async with self.session_factory() as db:
+            deleted = await RefreshTokenRepository(db).purge_expired(_utcnow())
+        logger.info("Refresh token purge for %s: %d deleted", day, deleted)
+
+
+refresh_token_purge = RefreshTokenPurge()
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from datetime import date
+from email.message import EmailMessage
+from itertools import groupby
+
+from src.conf.config import settings
+from src.database.db import SessionFactory, sessionmanager
+from src.database.models import Contact, User
+from src.services.contacts import ContactBookService
+from src.services.email import build_message, email_sender
+
+logger = logging.getLogger(__name__)
+
+
+def build_reminder(user: User, contacts: list[Contact]) -> EmailMessage:
+    """
+    Формування листа з днями народження контактів одного користувача.
+
+    Аргументи:
+        user: Отримувач.
+        contacts: Контакти в порядку наближення дня народження.
+    """
+    return build_message(
+        "Upcoming birthdays",
+        user.email,
+        "birthday_digest.html",
+        {"username": user.username, "contacts": contacts},
+    )
+
+
+class BirthdayReminders:
+    """
+    Щоденна задача: один лист на користувача з днями народження його контактів.
+
+    Користувачі, що ввімкнули нагадування, обробляються порціями по
+    MAIL_BATCH_SIZE за зростанням id. Кожна порція читається і рендериться
+    в окремій короткій сесії, а листи надсилаються вже після її закриття,
+    тож розсилка з паузами BIRTHDAY_REMINDER_BATCH_DELAY між порціями не
+    тримає з'єднання з базою даних і відкриту транзакцію.
+    """
+
+    def __init__(self, session_factory: SessionFactory = sessionmanager.session):
+        """
+        Ініціалізація.
+
+        Аргументи:
+            session_factory: Фабрика сесій бази даних.
+        """
+        self.session_factory = session_factory
+
+    async def _next_batch(
+        self, day: date, after_user_id: int
+    ) -> tuple[list[EmailMessage], int]:
+        async with self.session_factory() as db:
+            contacts = await ContactBookService(db).get_reminder_birthdays(
+                day,
+                settings.BIRTHDAY_REMINDER_DAYS,
+                after_user_id,
+                settings.MAIL_BATCH_SIZE,
+            )
+            batch = []
+            for _, group in groupby(contacts, key=lambda c: c.user_id):
+                items = list(group)
+                batch.append(build_reminder(items[0].user, items))
+            last_user_id = contacts[-1].user_id if contacts else after_user_id
+        return batch, last_user_id
+
+    async def send(self, day: date) -> None:
+        """
+        Надсилання нагадувань за день day.
+
+        Аргументи:
+            day: День, за який надсилаються нагадування.
+        """
+        sent = total = 0
+        after_user_id = 0
+        while True:
+            batch, after_user_id = await self._next_batch(day, after_user_id)
+            if not batch:
+                break
+            if total:
+                await asyncio.sleep(settings.BIRTHDAY_REMINDER_BATCH_DELAY)
+            sent += await email_sender.send_batch(batch)
+            total += len(batch)
+        logger.info("Birthday reminders for %s: %d of %d sent", day, sent, total)
+
+
+birthday_reminders = BirthdayReminders()
@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.services.cache import RedisCache, redis_cache
+from src.services.deadline import timeout_for
+
+logger = logging.getLogger(__name__)
+
+REVOKED_PREFIX = "revoked:"
+REVOCATION_CHANNEL = "token-revocations"
+
+
+class BloomFilter:
+    """
+    Фільтр Блума для швидкої перевірки належності до множини.
+
+    Відповідь "не належить" завжди точна, "належить" може бути хибною
+    з імовірністю error_rate (при кількості елементів до capacity).
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Ініціалізація фільтра.
+
+        Аргументи:
+            capacity: Очікувана кількість елементів.
+            error_rate: Допустима частка хибнопозитивних відповідей.
+        """
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        """
+        Додавання елемента до фільтра.
+        """
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item)
+        )
+
+
+class RevocationList:
+    """
+    Список відкликаних токенів (за claim jti).
+
+    Відкликані jti зберігаються в Redis до закінчення строку дії токена,
+    а кожен воркер тримає локальну копію та фільтр Блума перед нею, тож
+    перевірка невідкликаного токена не потребує мережевих запитів.
+    Воркери дізнаються про відкликання з каналу Redis pub/sub; між
+    відкликанням на іншому воркері і доставкою повідомлення є коротке вікно.
+    """
+
+    def __init__(self, redis_cache: RedisCache, capacity: int, error_rate: float):
+        """
+        Ініціалізація списку.
+
+        Аргументи:
+            redis_cache: Кеш Redis для спільного зберігання.
+            capacity: Розрахункова кількість відкликаних токенів для фільтра Блума.
+            error_rate: Допустима частка хибнопозитивних відповідей фільтра.
+        """
+        self.redis = redis_cache.client
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self._revoked: dict[str, float] = {}
+        self._listener: asyncio.Task | None = None
+
+    async def _call(self, coro):
+        try:
+            return await asyncio.wait_for(
+                coro, timeout_for(settings.REDIS_SOCKET_TIMEOUT)
+            )
+        except (RedisError, asyncio.TimeoutError, OSError) as e:
+            logger.warning("Redis call failed: %r", e)
+            return None
+
+    def _remember(self, jti: str, expires_at: float) -> None:
+        self._revoked[jti] = expires_at
+        self.bloom.add(jti)
+        if self.bloom.count > self.bloom.capacity:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        now = time.time()
+        self._revoked = {j: exp for j, exp in self._revoked.items() if exp > now}
+        self.bloom = BloomFilter(
+            max(self.bloom.capacity, 2 * len(self._revoked)), self.error_rate
+        )
+        for jti in self._revoked:
+            self.bloom.add(jti)
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """
+        Відкликання токена до моменту закінчення його строку дії.
+
+        Аргументи:
+            jti: Ідентифікатор токена.
+            expires_at: Час закінчення строку дії (Unix timestamp).
+        """
+        self._remember(jti, expires_at)
+        ttl = max(int(expires_at - time.time()), 1)
+        await self._call(self.redis.set(f"{REVOKED_PREFIX}{jti}", 1, ex=ttl))
+        await self._call(self.redis.publish(REVOCATION_CHANNEL, f"{jti}:{expires_at}"))
+
+    async def is_revoked(self, jti: str) -> bool:
+        """
+        Перевірка, чи відкликано токен.
+        """
+        if jti not in self.bloom:
+            return False
+        expires_at = self._revoked.get(jti)
+        if expires_at is not None:
+            return expires_at > time.time()
+        return bool(await self._call(self.redis.exists(f"{REVOKED_PREFIX}{jti}")))
+
+    async def load(self) -> None:
+        """
+        Завантаження відкликаних токенів з Redis (під час запуску воркера).
+        """
+        try:
+            async for key in self.redis.scan_iter(match=f"{REVOKED_PREFIX}*"):
+                ttl = await self.redis.ttl(key)
+                jti = key.decode().removeprefix(REVOKED_PREFIX)
+                self._remember(jti, time.time() + max(ttl, 1))
+        except (RedisError, OSError) as e:
+            logger.warning("Could not load revoked tokens: %r", e)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(REVOCATION_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        jti, _, expires_at = message["data"].decode().rpartition(":")
+                        self._remember(jti, float(expires_at))
+            except (RedisError, OSError) as e:
+                logger.warning("Revocation listener error: %r", e)
+                await asyncio.sleep(5)
+
+    def start(self) -> None:
+        """
+        Запуск фонового слухача відкликань з інших воркерів.
+        """
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """
+        Зупинка фонового слухача.
+        """
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+
+revocation_list = RevocationList(
+    redis_cache,
+    settings.REVOCATION_BLOOM_CAPACITY,
+    settings.REVOCATION_BLOOM_ERROR_RATE,
+)
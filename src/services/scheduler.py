@@ -0,0 +1,116 @@
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Awaitable, Callable
+from zoneinfo import ZoneInfo
+
+from src.conf.config import settings
+from src.services.cache import RedisCache, redis_cache
+from src.services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+DailyJob = Callable[[date], Awaitable[None]]
+
+# Блокування дня тримається довше за добу, щоб жоден воркер не повторив задачу.
+LOCK_TTL = 26 * 3600
+
+
+class Scheduler:
+    """
+    Планувальник щоденних задач у процесі воркера.
+
+    Кожна задача виконується під час запуску та далі щодня опівночі за
+    SCHEDULER_TIMEZONE. Перед запуском воркер захоплює в Redis блокування
+    "задача + день": його отримує лише один воркер (лідер), інші пропускають
+    цей день. Якщо Redis недоступний, ідемпотентні задачі виконуються без
+    блокування, а задачі з require_lock (напр. розсилки) пропускаються.
+    """
+
+    def __init__(self, redis_cache: RedisCache, timezone: str):
+        """
+        Ініціалізація планувальника.
+
+        Аргументи:
+            redis_cache: Кеш Redis для блокувань.
+            timezone: Назва часового поясу IANA.
+        """
+        self.redis_cache = redis_cache
+        self.tz = ZoneInfo(timezone)
+        self._jobs: dict[str, tuple[DailyJob, bool]] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def daily(self, name: str, job: DailyJob, require_lock: bool = False) -> None:
+        """
+        Реєстрація задачі, яка отримує дату дня, за який вона виконується.
+
+        Аргументи:
+            name: Унікальна назва задачі.
+            job: Асинхронна функція задачі.
+            require_lock: Не виконувати задачу, якщо блокування неможливо захопити.
+        """
+        self._jobs[name] = (job, require_lock)
+
+    def today(self) -> date:
+        """
+        Поточна дата в часовому поясі планувальника.
+        """
+        return datetime.now(self.tz).date()
+
+    def seconds_until_midnight(self) -> float:
+        """
+        Кількість секунд до наступної півночі в часовому поясі планувальника.
+        """
+        now = datetime.now(self.tz)
+        midnight = datetime.combine(
+            now.date() + timedelta(days=1), time.min, tzinfo=self.tz
+        )
+        return max((midnight - now).total_seconds(), 0.0)
+
+    async def run_once(self, name: str, day: date) -> bool:
+        """
+        Виконання задачі за день day, якщо цей воркер став лідером.
+
+        Повертає:
+            bool: True, якщо задачу запущено цим воркером.
+        """
+        lock = await self.redis_cache.acquire_lock(
+            f"scheduler:{name}:{day.isoformat()}", LOCK_TTL
+        )
+        job, require_lock = self._jobs[name]
+        if lock is False:
+            return False
+        if lock is None:
+            if require_lock:
+                logger.warning("Skipping job %s: leader lock is unavailable", name)
+                return False
+            logger.warning("Running job %s without leader lock", name)
+        with tracer.start_span("scheduler.job", **{"job.name": name}):
+            try:
+                await job(day)
+            except Exception:
+                logger.exception("Scheduled job %s failed", name)
+        return True
+
+    async def _loop(self, name: str) -> None:
+        while True:
+            await self.run_once(name, self.today())
+            await asyncio.sleep(self.seconds_until_midnight())
+
+    def start(self) -> None:
+        """
+        Запуск фонових циклів усіх зареєстрованих задач.
+        """
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._loop(name)) for name in self._jobs]
+
+    async def stop(self) -> None:
+        """
+        Зупинка фонових циклів.
+        """
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+
+scheduler = Scheduler(redis_cache, settings.SCHEDULER_TIMEZONE)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import zlib
+from typing import Any
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson є необов'язковою залежністю
+    orjson = None
+
+FORMAT_VERSION = 1
+_LIST = 0x01
+_COMPRESSED = 0x02
+
+
+class CacheFormatError(ValueError):
+    """
+    Запис кешу має іншу версію схеми або пошкоджений.
+    """
+
+
+def _dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class ModelCodec:
+    """
+    Компактне кодування Pydantic-моделей для кешу.
+
+    Запис складається з 4 байтів відбитка схеми, байта прапорців та JSON
+    (orjson, якщо встановлено) зі значеннями полів у порядку оголошення,
+    без назв полів. Відбиток обчислюється з FORMAT_VERSION та JSON-схеми
+    моделі, тож після зміни моделі старі записи автоматично відкидаються.
+    Списки, більші за compress_min_size байтів, стискаються zlib.
+    """
+
+    def __init__(self, model: type[BaseModel], compress_min_size: int = 512):
+        """
+        Ініціалізація кодека.
+
+        Аргументи:
+            model: Модель, поля якої зберігаються в кеші.
+            compress_min_size: Мінімальний розмір списку для стиснення у байтах.
+        """
+        self.model = model
+        self.fields = list(model.model_fields)
+        self.compress_min_size = compress_min_size
+        schema = json.dumps(model.model_json_schema(), sort_keys=True)
+        self.fingerprint = hashlib.blake2b(
+            f"{FORMAT_VERSION}:{schema}".encode(), digest_size=4
+        ).digest()
+
+    def _row(self, obj) -> list:
+        data = self.model.model_validate(obj, from_attributes=True).model_dump(
+            mode="json"
+        )
+        return [data[field] for field in self.fields]
+
+    def _object(self, row: list) -> BaseModel:
+        return self.model.model_validate(dict(zip(self.fields, row)))
+
+    def dumps(self, value: Any) -> bytes:
+        """
+        Кодування об'єкта, списку об'єктів або None.
+        """
+        flags = 0
+        if isinstance(value, list):
+            flags |= _LIST
+            payload = _dumps([self._row(item) for item in value])
+            if len(payload) >= self.compress_min_size:
+                flags |= _COMPRESSED
+                payload = zlib.compress(payload)
+        else:
+            payload = _dumps(None if value is None else self._row(value))
+        return self.fingerprint + bytes([flags]) + payload
+
+    def loads(self, data: bytes) -> Any:
+        """
+        Декодування запису кешу.
+
+        Винятки:
+        - CacheFormatError: Запис створено іншою версією схеми або він пошкоджений.
+        """
+        if len(data) < 5 or data[:4] != self.fingerprint:
+            raise CacheFormatError("Cache entry has an unknown schema version")
+        flags, payload = data[4], data[5:]
+        try:
+            if flags & _COMPRESSED:
+                payload = zlib.decompress(payload)
+            value = _loads(payload)
+            if flags & _LIST:
+                return [self._object(row) for row in value]
+            return None if value is None else self._object(value)
+        except (ValueError, TypeError, zlib.error) as e:
+            raise CacheFormatError(str(e)) from e
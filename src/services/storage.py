@@ -0,0 +1,158 @@
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import cloudinary
+import cloudinary.uploader
+from starlette.staticfiles import StaticFiles
+
+from src.conf.config import settings
+from src.services.tracing import traced
+
+
+class AvatarStorage(ABC):
+    """
+    Базовий клас сховища аватарів.
+
+    Кожне зображення зберігається у кількох розмірах. Імена варіантів
+    формуються як "<ім'я>_<розмір>", тому URL мініатюри можна отримати
+    з URL основного аватара заміною розміру.
+    """
+
+    @abstractmethod
+    def save(
+        self,
+        variants: dict[int, bytes],
+        digest: str,
+        username: str,
+        timeout: float | None = None,
+    ) -> dict[int, str]:
+        """
+        Збереження всіх розмірів зображення.
+
+        Аргументи:
+            variants: Стиснені зображення за розміром сторони.
+            digest: Хеш вмісту зображення.
+            username: Ім'я користувача-власника.
+            timeout: Тайм-аут зовнішнього запиту у секундах.
+
+        Повертає:
+            dict[int, str]: URL кожного розміру.
+        """
+
+
+class CloudinaryStorage(AvatarStorage):
+    """
+    Сховище аватарів у Cloudinary.
+    """
+
+    def __init__(self, cloud_name, api_key, api_secret):
+        """
+        Ініціалізація сховища і налаштування клієнта Cloudinary.
+
+        Аргументи:
+            cloud_name: Ім'я хмари в Cloudinary.
+            api_key: API ключ для доступу до Cloudinary.
+            api_secret: API секрет для доступу до Cloudinary.
+        """
+        cloudinary.config(
+            cloud_name=cloud_name,
+            api_key=api_key,
+            api_secret=api_secret,
+            secure=True,
+        )
+
+    @traced("cloudinary.upload")
+    def save(
+        self,
+        variants: dict[int, bytes],
+        digest: str,
+        username: str,
+        timeout: float | None = None,
+    ) -> dict[int, str]:
+        urls = {}
+        for size, data in variants.items():
+            public_id = f"RestApp/{username}_{size}"
+            r = cloudinary.uploader.upload(
+                data, public_id=public_id, overwrite=True, timeout=timeout
+            )
+            urls[size] = cloudinary.CloudinaryImage(public_id).build_url(
+                version=r.get("version")
+            )
+        return urls
+
+
+class LocalStorage(AvatarStorage):
+    """
+    Сховище аватарів на локальному диску з адресацією за вмістом.
+
+    Файли не перезаписуються (ім'я містить хеш вмісту), тому їх можна
+    віддавати з довготривалим кешуванням.
+    """
+
+    def __init__(self, root: str | Path, url_prefix: str, extension: str):
+        """
+        Ініціалізація сховища.
+
+        Аргументи:
+            root: Каталог для файлів.
+            url_prefix: Префікс URL, за яким каталог віддається як статика.
+            extension: Розширення файлів (напр. 'webp').
+        """
+        self.root = Path(root)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.extension = extension
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @traced("storage.local.save")
+    def save(
+        self,
+        variants: dict[int, bytes],
+        digest: str,
+        username: str,
+        timeout: float | None = None,
+    ) -> dict[int, str]:
+        urls = {}
+        directory = self.root / digest[:2]
+        directory.mkdir(exist_ok=True)
+        for size, data in variants.items():
+            filename = f"{digest}_{size}.{self.extension}"
+            path = directory / filename
+            if not path.exists():
+                fd, tmp_path = tempfile.mkstemp(dir=directory)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            urls[size] = f"{self.url_prefix}/{digest[:2]}/{filename}"
+        return urls
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    Статичні файли з довготривалими заголовками кешування.
+
+    Підходить лише для файлів, що не змінюються за тим самим шляхом.
+    """
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+def build_storage() -> AvatarStorage:
+    """
+    Створення сховища аватарів відповідно до налаштування AVATAR_STORAGE.
+    """
+    if settings.AVATAR_STORAGE == "local":
+        return LocalStorage(
+            settings.AVATAR_LOCAL_DIR,
+            settings.AVATAR_URL_PREFIX,
+            settings.AVATAR_FORMAT.lower(),
+        )
+    return CloudinaryStorage(
+        settings.CLOUDINARY_NAME,
+        settings.CLOUDINARY_API_KEY,
+        settings.CLOUDINARY_API_SECRET,
+    )
@@ -0,0 +1,172 @@
+import asyncio
+import heapq
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import islice
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import settings
+from src.database.models import User
+from src.schemas import ContactSuggestion
+from src.services.cache import cache
+from src.services.contacts import ContactBookService
+from src.services.tracing import tracer
+
+SUGGEST_MAX_LIMIT = 50
+
+
+class PrefixIndex:
+    """
+    Індекс префіксів для підказок по контактах одного користувача.
+
+    Замість дерева вузлів (trie) зберігається відсортований список пар
+    (слово, номер контакту): усі слова з однаковим префіксом лежать поруч,
+    тож пошук — це бінарний пошук початку діапазону. Так індекс займає
+    значно менше пам'яті, ніж trie з окремим словником на кожен вузол.
+
+    Контакти пронумеровані в порядку прізвища та імені, тож найкращі
+    підказки — це найменші номери. Для префіксів до SHORT_PREFIX символів,
+    під які підпадає більша частина книги, найкращі max_limit номерів
+    обчислюються заздалегідь.
+    """
+
+    SHORT_PREFIX = 2
+
+    def __init__(self, entries: list, max_limit: int):
+        """
+        Побудова індексу.
+
+        Аргументи:
+            entries: Рядки (id, first_name, last_name, email).
+            max_limit: Максимальна кількість підказок в одній відповіді.
+        """
+        self.suggestions = sorted(
+            (
+                ContactSuggestion(id=id, first_name=first, last_name=last, email=email)
+                for id, first, last, email in entries
+            ),
+            key=lambda s: (s.last_name, s.first_name, s.id),
+        )
+        self._terms = sorted(
+            (term.lower(), rank)
+            for rank, s in enumerate(self.suggestions)
+            for term in {s.first_name, s.last_name, s.email}
+        )
+        ranks: dict[str, set[int]] = {}
+        for term, rank in self._terms:
+            for length in range(1, self.SHORT_PREFIX + 1):
+                ranks.setdefault(term[:length], set()).add(rank)
+        self._short = {
+            prefix: heapq.nsmallest(max_limit, found) for prefix, found in ranks.items()
+        }
+
+    def search(self, prefix: str, limit: int) -> list[ContactSuggestion]:
+        """
+        Контакти з полем, що починається з prefix, у порядку прізвища та імені.
+        """
+        prefix = prefix.lower()
+        if len(prefix) <= self.SHORT_PREFIX:
+            found = self._short.get(prefix, [])[:limit]
+        else:
+            matches = set()
+            start = bisect_left(self._terms, (prefix,))
+            for term, rank in islice(self._terms, start, None):
+                if not term.startswith(prefix):
+                    break
+                matches.add(rank)
+            found = heapq.nsmallest(limit, matches)
+        return [self.suggestions[rank] for rank in found]
+
+
+class ContactSuggester:
+    """
+    Підказки по контактах для автодоповнення.
+
+    Невеликі книги контактів обслуговуються запитом за префіксними індексами
+    бази даних. Для книг від SUGGEST_INDEX_MIN_CONTACTS контактів у пам'яті
+    воркера будується PrefixIndex. Кеш обмежений кількістю користувачів (LRU)
+    і часом життя, а записи видаляються разом з кешем контактів користувача.
+    """
+
+    def __init__(self, min_contacts: int, max_users: int, ttl: float):
+        """
+        Ініціалізація.
+
+        Аргументи:
+            min_contacts: Мінімальна кількість контактів для побудови індексу в пам'яті.
+            max_users: Максимальна кількість користувачів з індексом у пам'яті.
+            ttl: Максимальний час життя індексу у секундах.
+        """
+        self.min_contacts = min_contacts
+        self.max_users = max_users
+        self.ttl = ttl
+        # None означає, що книга мала й підказки беруться з бази даних.
+        self._indexes: OrderedDict[int, tuple[float, PrefixIndex | None]] = (
+            OrderedDict()
+        )
+
+    def _get_index(self, user_id: int) -> tuple[bool, PrefixIndex | None]:
+        entry = self._indexes.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self._indexes.pop(user_id, None)
+            return False, None
+        self._indexes.move_to_end(user_id)
+        return True, entry[1]
+
+    def _set_index(self, user_id: int, index: PrefixIndex | None) -> None:
+        self._indexes[user_id] = (time.monotonic() + self.ttl, index)
+        self._indexes.move_to_end(user_id)
+        while len(self._indexes) > self.max_users:
+            self._indexes.popitem(last=False)
+
+    async def _load_index(
+        self, contact_service: ContactBookService, user: User
+    ) -> PrefixIndex | None:
+        if await contact_service.count_contacts(user) < self.min_contacts:
+            return None
+        with tracer.start_span("suggest.build_index", **{"user.id": user.id}):
+            entries = await contact_service.get_suggestion_entries(user)
+            # Побудова для великої книги займає сотні мілісекунд.
+            return await asyncio.to_thread(PrefixIndex, entries, SUGGEST_MAX_LIMIT)
+
+    async def suggest(
+        self, db: AsyncSession, user: User, prefix: str, limit: int
+    ) -> list:
+        """
+        Контакти, ім'я, прізвище або email яких починається з prefix.
+
+        Аргументи:
+            db: Сесія бази даних.
+            user: Поточний авторизований користувач.
+            prefix: Початок імені, прізвища або email.
+            limit: Максимальна кількість підказок.
+        """
+        contact_service = ContactBookService(db)
+        found, index = self._get_index(user.id)
+        if not found:
+            index = await self._load_index(contact_service, user)
+            self._set_index(user.id, index)
+        if index is not None:
+            return index.search(prefix, limit)
+        return await contact_service.suggest_contacts(prefix, limit, user)
+
+    def invalidate(self, keys: list[str] | None) -> None:
+        """
+        Видалення індексів за ключами suggest:{user_id}; None очищує всі індекси.
+        """
+        if keys is None:
+            self._indexes.clear()
+            return
+        for key in keys:
+            if key.startswith("suggest:"):
+                self._indexes.pop(int(key.split(":", 1)[1]), None)
+
+
+contact_suggester = ContactSuggester(
+    settings.SUGGEST_INDEX_MIN_CONTACTS,
+    settings.SUGGEST_INDEX_MAX_USERS,
+    settings.SUGGEST_INDEX_TTL,
+)
+cache.add_listener(contact_suggester.invalidate)
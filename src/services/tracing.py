@@ -0,0 +1,415 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, TextIO
+
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    """
+    Одиниця трасування (сумісна з моделлю OpenTelemetry).
+
+    Атрибути:
+    - trace_id: Ідентифікатор трасування (32 hex-символи).
+    - span_id: Ідентифікатор спану (16 hex-символів).
+    - parent_id: Ідентифікатор батьківського спану.
+    - name: Назва операції.
+    - attributes: Додаткові атрибути спану.
+    - start_time: Час початку (наносекунди з епохи).
+    - end_time: Час завершення (наносекунди з епохи).
+    - status: Статус виконання ("OK" або "ERROR").
+    """
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "attributes",
+        "start_time",
+        "end_time",
+        "status",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[dict] = None,
+    ):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.status = "OK"
+
+    def set_attribute(self, key: str, value) -> None:
+        """
+        Встановлення атрибута спану.
+        """
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        """
+        Тривалість спану в мілісекундах.
+        """
+        end = self.end_time if self.end_time is not None else time.time_ns()
+        return (end - self.start_time) / 1_000_000
+
+    @property
+    def traceparent(self) -> str:
+        """
+        Значення заголовка W3C traceparent для цього спану.
+        """
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        """
+        Представлення спану у вигляді словника для експорту.
+        """
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": self.end_time,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class InMemorySpanExporter:
+    """
+    Експортер, що зберігає завершені спани в пам'яті (для тестів).
+    """
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileSpanExporter:
+    """
+    Експортер, що дописує завершені спани у файл у форматі JSON Lines.
+
+    Файл відкривається під час першого експорту і залишається відкритим
+    до shutdown; кожен рядок записується на диск одразу (построчна буферизація).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(line + "\n")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Tracer:
+    """
+    Легковаговий трасувальник на основі contextvars.
+
+    Поточний спан зберігається у контекстній змінній, тому він автоматично
+    успадковується корутинами, фоновими задачами та greenlet-ами SQLAlchemy.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    def shutdown(self) -> None:
+        """
+        Закриття експортера під час зупинки додатка.
+        """
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+    def current_span(self) -> Optional[Span]:
+        """
+        Повертає активний спан поточного контексту.
+        """
+        return _current_span.get()
+
+    def create_span(
+        self,
+        name: str,
+        attributes: Optional[dict] = None,
+        traceparent: Optional[str] = None,
+    ) -> Span:
+        """
+        Створення нового спану без активації.
+
+        Батьківський спан береться з traceparent (якщо передано і коректний),
+        інакше з поточного контексту.
+        """
+        parent = parse_traceparent(traceparent) if traceparent else None
+        if parent is None:
+            current = _current_span.get()
+            parent = (current.trace_id, current.span_id) if current else None
+        if parent is None:
+            return Span(name, secrets.token_hex(16), None, attributes)
+        return Span(name, parent[0], parent[1], attributes)
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None) -> None:
+        """
+        Завершення спану та передача його експортеру.
+        """
+        span.end_time = time.time_ns()
+        if error is not None:
+            span.status = "ERROR"
+            span.set_attribute("error.type", type(error).__name__)
+        if self.exporter is not None:
+            try:
+                self.exporter.export(span)
+            except Exception as e:
+                logger.warning("Span export failed: %s", e)
+
+    @contextmanager
+    def start_span(self, name: str, traceparent: Optional[str] = None, **attributes):
+        """
+        Контекстний менеджер, що створює та активує спан на час виконання блоку.
+        """
+        span = self.create_span(name, attributes, traceparent)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        else:
+            self.end_span(span)
+        finally:
+            _current_span.reset(token)
+
+
+def parse_traceparent(header: str) -> Optional[tuple[str, str]]:
+    """
+    Розбір заголовка W3C traceparent.
+
+    Повертає:
+    - tuple: (trace_id, parent_span_id) або None, якщо заголовок некоректний.
+    """
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    if set(parts[1]) == {"0"} or set(parts[2]) == {"0"}:
+        return None
+    return parts[1], parts[2]
+
+
+def build_exporter(kind: str, path: str):
+    """
+    Створення експортера спанів за назвою з налаштувань.
+    """
+    if kind == "memory":
+        return InMemorySpanExporter()
+    if kind == "file":
+        return FileSpanExporter(path)
+    return None
+
+
+tracer = Tracer(build_exporter(settings.TRACING_EXPORTER, settings.TRACING_FILE))
+
+
+def traced(name: Optional[str] = None, **attributes):
+    """
+    Декоратор, що обгортає виклик функції (звичайної або асинхронної) у спан.
+    """
+
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.start_span(span_name, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument(layer: str):
+    """
+    Декоратор класу, що обгортає всі публічні асинхронні методи у спани
+    з назвою "<layer>.<Клас>.<метод>".
+    """
+
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.iscoroutinefunction(value):
+                continue
+            setattr(
+                cls,
+                attr,
+                traced(f"{layer}.{cls.__name__}.{attr}", layer=layer)(value),
+            )
+        return cls
+
+    return decorator
+
+
+def instrument_engine(engine) -> None:
+    """
+    Підключення трасування SQL-запитів до двигуна SQLAlchemy.
+
+    Параметри:
+    - engine: Синхронний або асинхронний двигун SQLAlchemy.
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.create_span(
+            "db.statement",
+            {
+                "db.system": sync_engine.dialect.name,
+                "db.statement": statement[:500],
+            },
+        )
+        conn.info.setdefault("tracing_spans", []).append(span)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("tracing_spans")
+        if spans:
+            tracer.end_span(spans.pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("tracing_spans") if conn is not None else None
+        if spans:
+            tracer.end_span(spans.pop(), exception_context.original_exception)
+
+
+class TraceIdFilter(logging.Filter):
+    """
+    Фільтр логування, що додає trace_id та span_id до кожного запису.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = _current_span.get()
+        record.trace_id = span.trace_id if span else "-"
+        record.span_id = span.span_id if span else "-"
+        return True
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Налаштування кореневого логера з ідентифікаторами трасування у форматі.
+
+    Викликається під час запуску додатка, а не під час імпорту, тож імпорт
+    модулів (alembic, тести, утиліти) не змінює налаштування журналювання.
+    Повторний виклик не додає ще один обробник.
+    """
+    root = logging.getLogger()
+    if any(isinstance(f, TraceIdFilter) for h in root.handlers for f in h.filters):
+        return
+    handler = logging.StreamHandler()
+    handler.addFilter(TraceIdFilter())
+    handler.setFormatter(
+        logging.Formatter(
+            "%(asctime)s [%(levelname)s] [trace=%(trace_id)s span=%(span_id)s] "
+            "%(name)s: %(message)s"
+        )
+    )
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+class TracingMiddleware:
+    """
+    ASGI-проміжний шар, що створює кореневий спан для кожного HTTP-запиту.
+
+    Вхідний заголовок traceparent продовжує зовнішнє трасування, а у відповідь
+    додаються заголовки traceparent та X-Trace-Id.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming = headers.get(b"traceparent")
+        name = f"HTTP {scope['method']} {scope['path']}"
+
+        with tracer.start_span(
+            name,
+            traceparent=incoming.decode("latin-1") if incoming else None,
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        ) as span:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = "ERROR"
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"traceparent", span.traceparent.encode("latin-1")),
+                        (b"x-trace-id", span.trace_id.encode("latin-1")),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
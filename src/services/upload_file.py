@@ -1,42 +1,207 @@
-import cloudinary
-import cloudinary.uploader
+import asyncio
+import contextvars
+import functools
+import hashlib
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import NamedTuple
+
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.conf.config import settings
+from src.services.storage import AvatarStorage, build_storage
+from src.services.tracing import tracer
+
+
+class ProcessedImage(NamedTuple):
+    """
+    Підготовлене до завантаження зображення.
+
+    Атрибути:
+        variants: Стиснені зображення за розміром сторони.
+        digest: SHA-256 хеш стисненого зображення основного розміру.
+    """
+
+    variants: dict[int, bytes]
+    digest: str
+
+
+def process_image(
+    data: bytes, sizes: list[int], image_format: str, quality: int, max_pixels: int
+) -> dict[int, bytes]:
+    """
+    Підготовка аватара: декодування, поворот за EXIF, обрізання до квадрата
+    кожного з розмірів та повторне стиснення без метаданих.
+
+    Виконується в окремому процесі, тому не має залежати від стану додатка.
+
+    Аргументи:
+        data: Вихідний файл зображення.
+        sizes: Розміри сторони результатів у пікселях.
+        image_format: Формат результату (напр. 'WEBP' або 'JPEG').
+        quality: Якість стиснення (1-100).
+        max_pixels: Максимальна кількість пікселів вихідного зображення.
+
+    Повертає:
+        dict[int, bytes]: Стиснені зображення за розміром сторони.
+
+    Викликає:
+        Image.DecompressionBombError: Якщо зображення має більше max_pixels пікселів.
+    """
+    # Розміри читаються із заголовка, тож перевірка відбувається до декодування.
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    variants = {}
+    with Image.open(io.BytesIO(data)) as img:
+        if img.width * img.height > max_pixels:
+            raise Image.DecompressionBombError(
+                f"Image has {img.width * img.height} pixels, limit is {max_pixels}"
+            )
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if image_format == "WEBP" else "RGB")
+        for size in sorted(sizes, reverse=True):
+            img = ImageOps.fit(img, (size, size), Image.Resampling.LANCZOS)
+            out = io.BytesIO()
+            img.save(out, format=image_format, quality=quality, optimize=True)
+            variants[size] = out.getvalue()
+    return variants
 
 
 class UploadFileService:
-    def __init__(self, cloud_name, api_key, api_secret):
+    def __init__(
+        self,
+        storage: AvatarStorage,
+        max_size: int = settings.AVATAR_MAX_SIZE,
+        content_types: list[str] = settings.AVATAR_CONTENT_TYPES,
+        max_workers: int = settings.UPLOAD_WORKERS,
+        image_workers: int = settings.IMAGE_WORKERS,
+    ):
         """
-        Ініціалізація сервісу для завантаження файлів на Cloudinary.
+        Ініціалізація сервісу для обробки та збереження аватарів.
 
         Аргументи:
-            cloud_name: Ім'я хмари в Cloudinary.
-            api_key: API ключ для доступу до Cloudinary.
-            api_secret: API секрет для доступу до Cloudinary.
-        """
-        self.cloud_name = cloud_name
-        self.api_key = api_key
-        self.api_secret = api_secret
-        cloudinary.config(
-            cloud_name=self.cloud_name,
-            api_key=self.api_key,
-            api_secret=self.api_secret,
-            secure=True,
+            storage: Сховище аватарів.
+            max_size: Максимальний розмір файлу в байтах.
+            content_types: Дозволені MIME-типи файлів.
+            max_workers: Кількість потоків для блокуючих завантажень.
+            image_workers: Кількість процесів для обробки зображень.
+        """
+        self.storage = storage
+        self.max_size = max_size
+        self.content_types = content_types
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="upload"
+        )
+        self._image_executor = ProcessPoolExecutor(
+            max_workers=image_workers,
+            mp_context=multiprocessing.get_context("forkserver"),
         )
 
-    @staticmethod
-    def upload_file(file, username) -> str:
+    def validate(self, file: UploadFile) -> None:
         """
-        Завантаження файла на Cloudinary і генерація URL для доступу до зображення.
+        Перевірка типу та розміру файлу до початку обробки.
+
+        Викликає:
+            HTTPException (415): Якщо тип файлу не підтримується.
+            HTTPException (413): Якщо файл завеликий.
+        """
+        if file.content_type not in self.content_types:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Непідтримуваний тип файлу",
+            )
+        size = file.size
+        if size is None:
+            size = file.file.seek(0, 2)
+            file.file.seek(0)
+        if size > self.max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Файл завеликий",
+            )
+
+    async def process(self, file: UploadFile) -> ProcessedImage:
+        """
+        Перевірка та обробка зображення в пулі процесів.
+
+        Аргументи:
+            file: Завантажений файл.
+
+        Повертає:
+            ProcessedImage: Стиснені зображення всіх розмірів та хеш основного.
+
+        Викликає:
+            HTTPException (400): Якщо файл не є коректним зображенням.
+            HTTPException (413): Якщо файл або зображення завеликі.
+        """
+        self.validate(file)
+        data = await file.read(self.max_size + 1)
+        if len(data) > self.max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Файл завеликий",
+            )
+        loop = asyncio.get_running_loop()
+        with tracer.start_span("image.process", **{"image.input_bytes": len(data)}):
+            try:
+                processed = await loop.run_in_executor(
+                    self._image_executor,
+                    process_image,
+                    data,
+                    [settings.AVATAR_SIZE, *settings.AVATAR_THUMBNAIL_SIZES],
+                    settings.AVATAR_FORMAT,
+                    settings.AVATAR_QUALITY,
+                    settings.AVATAR_MAX_PIXELS,
+                )
+            except Image.DecompressionBombError:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Зображення завелике",
+                )
+            except (UnidentifiedImageError, OSError, ValueError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Файл не є коректним зображенням",
+                )
+        digest = hashlib.sha256(processed[settings.AVATAR_SIZE]).hexdigest()
+        return ProcessedImage(processed, digest)
+
+    async def upload(
+        self, image: ProcessedImage, username: str, timeout: float | None = None
+    ) -> str:
+        """
+        Збереження всіх розмірів зображення без блокування циклу подій.
+
+        Блокуюче збереження виконується в обмеженому пулі потоків.
 
         Аргументи:
-            file: Файл для завантаження.
-            username: Ім'я користувача для формування унікального public_id.
+            image: Оброблене зображення.
+            username: Ім'я користувача-власника.
+            timeout: Тайм-аут зовнішнього запиту у секундах.
 
         Повертає:
-            str: URL зображення, доступного на Cloudinary.
+            str: URL аватара основного розміру.
         """
-        public_id = f"RestApp/{username}"
-        r = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
-        src_url = cloudinary.CloudinaryImage(public_id).build_url(
-            width=250, height=250, crop="fill", version=r.get("version")
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        urls = await loop.run_in_executor(
+            self._executor,
+            functools.partial(
+                context.run,
+                self.storage.save,
+                image.variants,
+                image.digest,
+                username,
+                timeout,
+            ),
         )
-        return src_url
+        return urls[settings.AVATAR_SIZE]
+
+
+@functools.lru_cache
+def get_upload_service() -> UploadFileService:
+    """
+    Єдиний налаштований екземпляр сервісу завантаження для всього процесу.
+    """
+    return UploadFileService(build_storage())
@@ -1,11 +1,21 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from libgravatar import Gravatar
 
 from src.repository.users import UserRepository
+from src.database.models import User
 from src.schemas import UserCreate
+from src.services.cache import cache, principal_key
+from src.services.gravatar import gravatar_url
+from src.services.tracing import instrument
 
 
+@instrument("service")
 class UserService:
+    """
+    Сервіс для роботи з користувачами.
+
+    Зміни даних користувача інвалідують його запис у кеші автентифікації.
+    """
+
     def __init__(self, db: AsyncSession):
         """
         Ініціалізація сервісу для роботи з користувачами.
@@ -19,20 +29,16 @@ class UserService:
         """
         Створення нового користувача.
 
+        Аватаром за замовчуванням стає URL Gravatar, що будується локально
+        без мережевих запитів.
+
         Аргументи:
             body: Дані користувача для створення нового запису.
 
         Повертає:
             User: Створений користувач.
         """
-        avatar = None
-        try:
-            g = Gravatar(body.email)
-            avatar = g.get_image()
-        except Exception as e:
-            print(e)
-
-        return await self.repository.create_user(body, avatar)
+        return await self.repository.create_user(body, gravatar_url(body.email))
 
     async def get_user_by_id(self, user_id: int):
         """
@@ -70,6 +76,19 @@ class UserService:
         """
         return await self.repository.get_user_by_email(email)
 
+    async def get_users_by_email_or_username(self, email: str, username: str):
+        """
+        Отримання користувачів з таким email або ім'ям користувача.
+
+        Аргументи:
+            email: Електронна пошта користувача.
+            username: Ім'я користувача.
+
+        Повертає:
+            list[User]: Знайдені користувачі (не більше двох).
+        """
+        return await self.repository.get_users_by_email_or_username(email, username)
+
     async def confirmed_email(self, email: str):
         """
         Підтвердження email користувача.
@@ -77,20 +96,56 @@ class UserService:
         Аргументи:
             email: Електронна пошта користувача.
         """
-        return await self.repository.confirmed_email(email)
+        user = await self.repository.confirmed_email(email)
+        await cache.delete(principal_key(user.username))
+        return user
 
-    async def update_avatar_url(self, email: str, url: str):
+    async def update_avatar_url(
+        self, email: str, url: str, avatar_hash: str | None = None
+    ):
         """
         Оновлення URL аватара користувача.
 
         Аргументи:
             email: Адреса електронної пошти користувача.
             url: Новий URL для аватара.
+            avatar_hash: Хеш вмісту нового аватара.
+
+        Повертає:
+            User: Оновлений користувач.
+        """
+        user = await self.repository.update_avatar_url(email, url, avatar_hash)
+        await cache.delete(principal_key(user.username))
+        return user
+
+    async def update_password_hash(self, user: User, password: str):
+        """
+        Збереження пароля, перехешованого за поточною політикою.
+
+        Аргументи:
+            user: Користувач.
+            password: Новий хеш пароля.
+
+        Повертає:
+            User: Оновлений користувач.
+        """
+        return await self.repository.update_password_hash(user, password)
+
+    async def set_birthday_reminders(self, user_id: int, enabled: bool):
+        """
+        Ввімкнення або вимкнення щоденних нагадувань про дні народження.
+
+        Аргументи:
+            user_id: ID користувача.
+            enabled: Чи надсилати нагадування.
 
         Повертає:
             User: Оновлений користувач.
         """
-        return await self.repository.update_avatar_url(email, url)
+        user = await self.repository.set_birthday_reminders(user_id, enabled)
+        if user is not None:
+            await cache.delete(principal_key(user.username))
+        return user
 
     async def reset_password(self, user_id: int, password: str):
         """
@@ -103,4 +158,7 @@ class UserService:
         Повертає:
             User: Оновлений користувач.
         """
-        return await self.repository.reset_password(user_id, password)
+        user = await self.repository.reset_password(user_id, password)
+        if user is not None:
+            await cache.delete(principal_key(user.username))
+        return user
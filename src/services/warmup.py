@@ -0,0 +1,122 @@
+import asyncio
+import logging
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.conf.config import settings
+from src.database.db import SessionFactory, sessionmanager
+from src.services.birthdays import birthday_digest
+from src.services.cache import (
+    CONTACTS_PAGE_TTL,
+    DEFAULT_PAGE_SIZE,
+    PRINCIPAL_TTL,
+    cache,
+    contact_codec,
+    contacts_page_key,
+    principal_codec,
+    principal_key,
+    redis_cache,
+)
+from src.services.contacts import ContactBookService
+from src.services.tracing import tracer
+from src.services.users import UserService
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_USERS_KEY = "active-users"
+
+
+class CacheWarmer:
+    """
+    Попереднє завантаження в кеш даних, які користувач запитує першими:
+    запису користувача, першої сторінки контактів та найближчих днів народження.
+
+    Кількість одночасних прогрівів обмежена, а повторний прогрів того самого
+    користувача, поки попередній ще виконується, пропускається.
+    """
+
+    def __init__(
+        self, concurrency: int, session_factory: SessionFactory = sessionmanager.session
+    ):
+        """
+        Ініціалізація.
+
+        Аргументи:
+            concurrency: Максимальна кількість користувачів, що прогріваються одночасно.
+            session_factory: Фабрика сесій бази даних.
+        """
+        self.session_factory = session_factory
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pending: set[int] = set()
+        self._task: asyncio.Task | None = None
+
+    async def warm_user(self, user_id: int) -> None:
+        """
+        Прогрів кешу для одного користувача. Помилки логуються і не передаються далі.
+        """
+        if user_id in self._pending:
+            return
+        self._pending.add(user_id)
+        try:
+            async with self._semaphore:
+                with tracer.start_span("cache.warm_user", **{"user.id": user_id}):
+                    await self._warm(user_id)
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning("Cache warm-up for user %s failed: %r", user_id, e)
+        finally:
+            self._pending.discard(user_id)
+
+    async def _warm(self, user_id: int) -> None:
+        async with self.session_factory() as db:
+            user = await UserService(db).get_user_by_id(user_id)
+            if user is None:
+                return
+            contacts = await ContactBookService(db).get_all_contacts(
+                0, DEFAULT_PAGE_SIZE, user
+            )
+            await birthday_digest.get(db, user_id)
+        await cache.set_object(
+            principal_key(user.username), principal_codec, user, PRINCIPAL_TTL
+        )
+        await cache.set_object(
+            contacts_page_key(user_id), contact_codec, contacts, CONTACTS_PAGE_TTL
+        )
+
+    async def warm_recent(self, count: int) -> None:
+        """
+        Прогрів кешу для count користувачів, що входили останніми.
+        """
+        user_ids = await redis_cache.get_recent(ACTIVE_USERS_KEY, count)
+        await asyncio.gather(*(self.warm_user(int(user_id)) for user_id in user_ids))
+        logger.info("Cache warmed up for %d recently active users", len(user_ids))
+
+    def start(self, count: int) -> None:
+        """
+        Запуск фонового прогріву для нещодавно активних користувачів.
+        """
+        if count > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self.warm_recent(count))
+
+    async def stop(self) -> None:
+        """
+        Скасування незавершеного фонового прогріву.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+cache_warmer = CacheWarmer(settings.WARMUP_CONCURRENCY)
+
+
+async def warm_up_after_login(user_id: int) -> None:
+    """
+    Фонова задача після входу: запам'ятовування активності та прогрів кешу.
+
+    Аргументи:
+        user_id: ID користувача.
+    """
+    await redis_cache.add_recent(
+        ACTIVE_USERS_KEY, str(user_id), settings.WARMUP_ACTIVE_USERS_MAX
+    )
+    await cache_warmer.warm_user(user_id)
@@ -0,0 +1,39 @@
+import re
+
+_NON_DIGITS = re.compile(r"\D")
+E164_MIN_DIGITS = 8
+E164_MAX_DIGITS = 15
+
+
+def normalize_phone(raw: str | None, country_code: str) -> str | None:
+    """
+    Приведення номера телефону до формату E.164 (напр. '+380441234567').
+
+    Номер з '+' або міжнародним префіксом '00' вважається повним. Номер, що
+    починається з коду країни за замовчуванням, лише отримує '+'. Національний
+    номер з префіксом '0' або без нього доповнюється кодом країни.
+
+    Аргументи:
+        raw: Номер у довільному форматі.
+        country_code: Код країни для номерів без нього, напр. '380'.
+
+    Повертає:
+        str | None: Номер у форматі E.164 або None, якщо номер неможливо розпізнати.
+    """
+    if not raw:
+        return None
+    raw = raw.strip()
+    digits = _NON_DIGITS.sub("", raw)
+    if raw.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif digits.startswith(country_code):
+        pass
+    elif digits.startswith("0"):
+        digits = country_code + digits[1:]
+    else:
+        digits = country_code + digits
+    if not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS or digits[0] == "0":
+        return None
+    return "+" + digits
@@ -1,4 +1,5 @@
 import asyncio
+import os
 
 import pytest
 import pytest_asyncio
@@ -10,10 +11,19 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
 )
 
+# Single test process: rate limits are counted in memory instead of Redis.
+os.environ.setdefault("RATE_LIMIT_STORAGE_URI", "memory://")
+
 from main import app
 from src.database.models import Base, User
 from src.database.db import get_db
 from src.services.auth import create_access_token, Hash
+from src.services.limiter import limiter
+from src.services.tracing import instrument_engine
+from src.services.birthdays import birthday_digest
+from src.services.refresh_tokens import refresh_token_purge
+from src.services.reminders import birthday_reminders
+from src.services.warmup import cache_warmer
 
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
@@ -22,6 +32,7 @@ engine = create_async_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+instrument_engine(engine)
 
 TestingSessionLocal = async_sessionmaker(
     autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
@@ -70,6 +81,12 @@ def client():
                 raise
 
     app.dependency_overrides[get_db] = override_get_db
+    # Background jobs open their own sessions outside of get_db.
+    cache_warmer.session_factory = TestingSessionLocal
+    birthday_reminders.session_factory = TestingSessionLocal
+    birthday_digest.session_factory = TestingSessionLocal
+    refresh_token_purge.session_factory = TestingSessionLocal
+    limiter.reset()
 
     yield TestClient(app)
 
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from src.services.admission import AdmissionController, is_expensive_route
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_timeout_expires():
+    controller = AdmissionController(
+        max_in_flight=1, max_expensive=1, queue_timeout=0.05
+    )
+
+    assert await controller.acquire()
+    assert not await controller.acquire()
+    assert controller.retry_after() >= 1
+
+    await controller.release(False, 0.01)
+    assert await controller.acquire()
+
+
+@pytest.mark.asyncio
+async def test_expensive_requests_have_separate_limit():
+    controller = AdmissionController(
+        max_in_flight=10, max_expensive=1, queue_timeout=0.05
+    )
+
+    assert await controller.acquire(expensive=True)
+    assert not await controller.acquire(expensive=True)
+    assert await controller.acquire(expensive=False)
+
+
+@pytest.mark.asyncio
+async def test_regular_requests_are_admitted_before_expensive():
+    controller = AdmissionController(max_in_flight=1, max_expensive=1, queue_timeout=1)
+    assert await controller.acquire()
+
+    regular = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    expensive = asyncio.create_task(controller.acquire(expensive=True))
+    await asyncio.sleep(0)
+
+    await controller.release(False, 0.01)
+
+    assert await regular
+    await controller.release(False, 0.01)
+    assert await expensive
+
+
+def test_is_expensive_route():
+    assert is_expensive_route("/api/auth/login")
+    assert not is_expensive_route("/api/contacts/")
@@ -0,0 +1,65 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.cache import LocalCache, TieredCache
+
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(max_entries=2, ttl=60)
+    local.set("a", b"1", 60)
+    local.set("b", b"2", 60)
+    local.get("a")
+    local.set("c", b"3", 60)
+
+    assert local.get("a") == b"1"
+    assert local.get("b") is None
+    assert local.get("c") == b"3"
+
+
+def test_local_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.services.cache.time.monotonic", lambda: now[0])
+    local = LocalCache(max_entries=10, ttl=5)
+    local.set("a", b"1", 300)
+
+    now[0] += 4
+    assert local.get("a") == b"1"
+    now[0] += 2
+    assert local.get("a") is None
+
+
+def make_cache(remote_value=None):
+    remote = MagicMock()
+    remote.get = AsyncMock(return_value=remote_value)
+    remote.set = AsyncMock()
+    remote.delete = AsyncMock()
+    remote.publish = AsyncMock()
+    return TieredCache(LocalCache(10, 60), remote, "invalidation"), remote
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_fills_l1_from_redis():
+    cache, remote = make_cache(b"value")
+
+    assert await cache.get("key") == b"value"
+    assert await cache.get("key") == b"value"
+
+    remote.get.assert_awaited_once_with("key")
+    stats = cache.stats.snapshot()
+    assert stats["l1_hits"] == 1
+    assert stats["l2_hits"] == 1
+    assert stats["l1_hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_delete_publishes_invalidation():
+    cache, remote = make_cache()
+    await cache.set("a", b"1", 60)
+    await cache.set("b", b"2", 60)
+
+    await cache.delete("a", "b")
+
+    assert await cache.get("a") is None
+    remote.delete.assert_awaited_once_with("a", "b")
+    remote.publish.assert_awaited_once_with("invalidation", "a\nb")
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from src.services.deadline import (
+    DeadlineMiddleware,
+    remaining_time,
+    route_timeout,
+    timeout_for,
+)
+
+
+async def run_middleware(app, headers=None, disconnect_after=None):
+    sent = []
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        if disconnect_after is not None:
+            await asyncio.sleep(disconnect_after)
+            return {"type": "http.disconnect"}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/contacts/",
+        "headers": headers or [],
+    }
+    await DeadlineMiddleware(app)(scope, receive, send)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_deadline_visible_inside_request():
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["remaining"] = remaining_time()
+        seen["timeout"] = timeout_for(10)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    sent = await run_middleware(app, headers=[(b"x-request-timeout", b"2")])
+
+    assert 0 < seen["remaining"] <= 2
+    assert seen["timeout"] <= 2
+    assert sent[0]["status"] == 200
+    assert remaining_time() is None
+
+
+@pytest.mark.asyncio
+async def test_timeout_returns_504():
+    async def app(scope, receive, send):
+        await asyncio.sleep(1)
+
+    sent = await run_middleware(app, headers=[(b"x-request-timeout", b"0.05")])
+
+    assert sent[0]["status"] == 504
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_work():
+    cancelled = asyncio.Event()
+
+    async def app(scope, receive, send):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    sent = await run_middleware(app, disconnect_after=0.05)
+
+    assert cancelled.is_set()
+    assert sent == []
+
+
+def test_route_timeout_uses_longest_prefix(monkeypatch):
+    monkeypatch.setattr(
+        "src.services.deadline.settings.REQUEST_TIMEOUT_ROUTES",
+        {"/api/contacts/": 10.0, "/api/contacts/find/": 5.0},
+    )
+    assert route_timeout("/api/contacts/find/") == 5.0
+    assert route_timeout("/api/contacts/1") == 10.0
+    assert route_timeout("/api/users/me") == 30.0
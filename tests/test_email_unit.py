@@ -0,0 +1,67 @@
+import pytest
+
+from src.services.email import (
+    EmailQueue,
+    EmailSender,
+    MemoryBackend,
+    build_message,
+    send_email,
+    send_reset_password_email,
+)
+
+
+@pytest.fixture
+def sender(monkeypatch):
+    sender = EmailSender(MemoryBackend(), concurrency=2)
+    monkeypatch.setattr("src.services.email.email_sender", sender)
+    return sender
+
+
+@pytest.mark.asyncio
+async def test_send_verification_email(sender):
+    await send_email("taras@email.com", "Taras", "http://localhost/")
+
+    message = sender.backend.outbox[0]
+    body = message.get_content()
+    assert message["To"] == "taras@email.com"
+    assert message["Subject"] == "Confirm your email"
+    assert "Hi Taras" in body
+    assert "http://localhost/api/auth/confirmed_email/" in body
+
+
+@pytest.mark.asyncio
+async def test_send_reset_password_email(sender):
+    await send_reset_password_email(
+        "taras@email.com", "Taras", "http://localhost/", "reset-token"
+    )
+
+    body = sender.backend.outbox[0].get_content()
+    assert "http://localhost/api/auth/confirm_reset_password/reset-token" in body
+
+
+@pytest.mark.asyncio
+async def test_queue_sends_in_batches(sender, monkeypatch):
+    batches = []
+    send_batch = sender.send_batch
+
+    async def record_batch(messages):
+        batches.append(len(messages))
+        return await send_batch(messages)
+
+    monkeypatch.setattr(sender, "send_batch", record_batch)
+    queue = EmailQueue(sender, batch_size=3)
+    for i in range(5):
+        await queue.put(
+            build_message(
+                "Confirm your email",
+                f"user{i}@email.com",
+                "verify_email.html",
+                {"host": "http://localhost/", "username": f"user{i}", "token": "t"},
+            )
+        )
+
+    queue.start()
+    await queue.stop()
+
+    assert batches == [3, 2]
+    assert len(sender.backend.outbox) == 5
@@ -0,0 +1,10 @@
+from src.services.gravatar import gravatar_url
+
+
+def test_gravatar_url_is_built_locally():
+    url = gravatar_url("taras@email.com")
+
+    assert url.startswith("https://www.gravatar.com/avatar/")
+    assert url.endswith("?default=mp")
+    assert gravatar_url(" Taras@Email.com ") == url
+    assert gravatar_url("lesya@email.com") != url
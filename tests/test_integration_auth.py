@@ -1,9 +1,14 @@
+from datetime import date, datetime
 from unittest.mock import Mock, AsyncMock
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, update
 
-from src.database.models import User
+from src.database.models import RefreshToken, User
+from src.services.auth import Hash, build_password_context
+from src.services.cache import cache, principal_key
+from src.services.limiter import limiter
+from src.services.refresh_tokens import hash_token, refresh_token_purge
 from tests.conftest import TestingSessionLocal
 
 user_data = {
@@ -23,7 +28,7 @@ def test_signup(client, monkeypatch):
     assert data["username"] == user_data["username"]
     assert data["email"] == user_data["email"]
     assert "hashed_password" not in data
-    assert "avatar" in data
+    assert data["avatar"].startswith("https://www.gravatar.com/avatar/")
 
 
 def test_repeat_signup(client, monkeypatch):
@@ -35,6 +40,39 @@ def test_repeat_signup(client, monkeypatch):
     assert data["detail"] == "Користувач з таким email вже існує"
 
 
+def test_repeat_signup_username(client, monkeypatch):
+    monkeypatch.setattr("src.api.auth.send_email", Mock())
+    response = client.post(
+        "api/auth/register", json={**user_data, "email": "other@email.com"}
+    )
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"] == "Користувач з таким іменем вже існує"
+
+
+def test_repeat_signup_email_case_insensitive(client, monkeypatch):
+    monkeypatch.setattr("src.api.auth.send_email", Mock())
+    response = client.post(
+        "api/auth/register",
+        json={**user_data, "username": "Other", "email": "TARAS@email.com"},
+    )
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"] == "Користувач з таким email вже існує"
+
+
+def test_concurrent_signup_conflict(client, monkeypatch):
+    monkeypatch.setattr("src.api.auth.send_email", Mock())
+    mock_lookup = AsyncMock(
+        side_effect=[[], [Mock(email=user_data["email"], username="other")]]
+    )
+    monkeypatch.setattr(
+        "src.api.auth.UserService.get_users_by_email_or_username", mock_lookup
+    )
+    response = client.post("api/auth/register", json={**user_data, "username": "Other"})
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"] == "Користувач з таким email вже існує"
+    assert mock_lookup.await_count == 2
+
+
 def test_not_confirmed_login(client):
     response = client.post(
         "api/auth/login",
@@ -69,7 +107,138 @@ async def test_login(client):
     assert response.status_code == 200, response.text
     data = response.json()
     assert "access_token" in data
+    assert "refresh_token" in data
     assert "token_type" in data
+    assert cache.local.get(principal_key(user_data["username"])) is not None
+
+
+def test_refresh_token_rotation(client):
+    response = client.post(
+        "api/auth/login",
+        data={
+            "username": user_data.get("username"),
+            "password": user_data.get("password"),
+        },
+    )
+    old_refresh_token = response.json()["refresh_token"]
+
+    response = client.post(
+        "api/auth/refresh", json={"refresh_token": old_refresh_token}
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["refresh_token"] != old_refresh_token
+    headers = {"Authorization": f"Bearer {data['access_token']}"}
+    assert client.get("api/users/me", headers=headers).status_code == 200
+
+    response = client.post(
+        "api/auth/refresh", json={"refresh_token": old_refresh_token}
+    )
+    assert response.status_code == 401, response.text
+
+    response = client.post(
+        "api/auth/refresh", json={"refresh_token": data["refresh_token"]}
+    )
+    assert response.status_code == 401, response.text
+
+
+def login(client) -> dict:
+    limiter.reset()
+    response = client.post(
+        "api/auth/login",
+        data={
+            "username": user_data.get("username"),
+            "password": user_data.get("password"),
+        },
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_logout_revokes_refresh_tokens(client):
+    tokens = login(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    response = client.post(
+        "api/auth/logout",
+        json={"refresh_token": tokens["refresh_token"]},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    response = client.post(
+        "api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401, response.text
+
+    tokens = login(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    response = client.post("api/auth/logout", headers=headers)
+    assert response.status_code == 200, response.text
+    response = client.post(
+        "api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401, response.text
+
+
+def test_reset_password_revokes_refresh_tokens(client, monkeypatch):
+    tokens = login(client)
+    monkeypatch.setattr(
+        "src.api.auth.get_email_from_token", AsyncMock(return_value=user_data["email"])
+    )
+    monkeypatch.setattr(
+        "src.api.auth.get_password_from_token",
+        AsyncMock(return_value=Hash().get_password_hash(user_data["password"])),
+    )
+
+    response = client.get("api/auth/confirm_reset_password/token")
+    assert response.status_code == 200, response.text
+    response = client.post(
+        "api/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401, response.text
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_only_expired_refresh_tokens(client):
+    expired = login(client)["refresh_token"]
+    revoked = login(client)["refresh_token"]
+    response = client.post("api/auth/refresh", json={"refresh_token": revoked})
+    assert response.status_code == 200, response.text
+    async with TestingSessionLocal() as session:
+        await session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.token_hash == hash_token(expired))
+            .values(expires_at=datetime(2000, 1, 1))
+        )
+        await session.commit()
+
+    await refresh_token_purge.run(date.today())
+
+    async with TestingSessionLocal() as session:
+        hashes = set((await session.execute(select(RefreshToken.token_hash))).scalars())
+    assert hash_token(expired) not in hashes
+    # Revoked but unexpired tokens are kept for reuse detection.
+    assert hash_token(revoked) in hashes
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_password(client, monkeypatch):
+    limiter.reset()
+    monkeypatch.setattr(Hash, "pwd_context", build_password_context(bcrypt_rounds=4))
+
+    response = client.post(
+        "api/auth/login",
+        data={
+            "username": user_data.get("username"),
+            "password": user_data.get("password"),
+        },
+    )
+    assert response.status_code == 200, response.text
+
+    async with TestingSessionLocal() as session:
+        user = await session.execute(
+            select(User).where(User.username == user_data.get("username"))
+        )
+        assert user.scalar_one().hashed_password.startswith("$2b$04$")
 
 
 def test_wrong_password_login(client):
@@ -160,3 +329,32 @@ async def test_confirm_reset_password(client, monkeypatch):
     mock_get_password_from_token.assert_called_once_with("token")
     mock_user_service.get_user_by_email.assert_called_once_with("taras@email.com")
     mock_user_service.reset_password.assert_called_once_with(1, "new_hashed_password")
+
+
+def test_login_rate_limit(client):
+    for _ in range(10):
+        response = client.post(
+            "api/auth/login",
+            data={"username": "username", "password": "password"},
+        )
+        if response.status_code == 429:
+            break
+    assert response.status_code == 429, response.text
+    limiter.reset()
+
+
+def test_logout_revokes_token(client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+
+    response = client.post("api/auth/logout", headers=headers)
+    assert response.status_code == 200, response.text
+
+    response = client.post("api/auth/logout", headers=headers)
+    assert response.status_code == 401, response.text
+
+
+def test_argon2_policy_requires_backend(monkeypatch):
+    monkeypatch.setattr("src.services.auth.argon2.has_backend", lambda: False)
+
+    with pytest.raises(ValueError, match="argon2-cffi"):
+        build_password_context(scheme="argon2")
@@ -1,5 +1,18 @@
+import asyncio
+import io
 from unittest.mock import patch
 
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from starlette.applications import Starlette
+
+from main import app
+from src.services.email import EmailSender, MemoryBackend
+from src.services.reminders import birthday_reminders
+from src.services.scheduler import scheduler
+from src.services.storage import CachedStaticFiles, LocalStorage
+from src.services.upload_file import UploadFileService, get_upload_service
 from tests.conftest import test_user
 
 
@@ -14,14 +27,26 @@ def test_get_me(client, get_token):
     assert "avatar" in data
 
 
-@patch("src.services.upload_file.UploadFileService.upload_file")
-def test_update_avatar_user(mock_upload_file, client, get_token):
-    fake_url = "<http://example.com/avatar.jpg>"
-    mock_upload_file.return_value = fake_url
+def make_image(color="red", size=(600, 400)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def upload_service(tmp_path_factory):
+    service = UploadFileService(
+        LocalStorage(tmp_path_factory.mktemp("avatars"), "/avatars", "webp")
+    )
+    app.dependency_overrides[get_upload_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_upload_service)
 
+
+def test_update_avatar_user(upload_service, client, get_token):
     headers = {"Authorization": f"Bearer {get_token}"}
 
-    file_data = {"file": ("avatar.jpg", b"fake image content", "image/jpeg")}
+    file_data = {"file": ("avatar.jpg", make_image(), "image/jpeg")}
 
     response = client.patch("/api/users/avatar", headers=headers, files=file_data)
 
@@ -30,6 +55,102 @@ def test_update_avatar_user(mock_upload_file, client, get_token):
     data = response.json()
     assert data["username"] == test_user["username"]
     assert data["email"] == test_user["email"]
-    assert data["avatar"] == fake_url
+    assert data["avatar"].startswith("/avatars/")
+    assert data["avatar"].endswith("_250.webp")
+
+    root = upload_service.storage.root
+    for size in (250, 100, 50):
+        path = root / data["avatar"].replace("_250.", f"_{size}.").removeprefix(
+            "/avatars/"
+        )
+        with Image.open(path) as image:
+            assert image.size == (size, size)
+            assert image.format == "WEBP"
+
+    static = TestClient(Starlette())
+    static.app.mount("/avatars", CachedStaticFiles(directory=root))
+    response = static.get(data["avatar"])
+    assert response.status_code == 200
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_update_same_avatar_skips_upload(upload_service, client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    file_data = {"file": ("avatar.jpg", make_image(), "image/jpeg")}
+
+    with patch.object(upload_service.storage, "save") as mock_save:
+        response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 200, response.text
+    mock_save.assert_not_called()
+
+
+def test_update_avatar_invalid_image(upload_service, client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    file_data = {"file": ("avatar.jpg", b"fake image content", "image/jpeg")}
+
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 400, response.text
+
+
+def test_update_avatar_too_many_pixels(upload_service, client, get_token, monkeypatch):
+    monkeypatch.setattr("src.services.upload_file.settings.AVATAR_MAX_PIXELS", 10_000)
+    headers = {"Authorization": f"Bearer {get_token}"}
+    file_data = {"file": ("avatar.jpg", make_image(), "image/jpeg")}
+
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 413, response.text
+
+
+def test_update_avatar_wrong_type(upload_service, client, get_token):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    file_data = {"file": ("avatar.txt", b"not an image", "text/plain")}
+
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 415, response.text
+
+
+def test_update_avatar_too_large(upload_service, client, get_token, monkeypatch):
+    monkeypatch.setattr(upload_service, "max_size", 10)
+    headers = {"Authorization": f"Bearer {get_token}"}
+    file_data = {"file": ("avatar.jpg", b"fake image content", "image/jpeg")}
+
+    response = client.patch("/api/users/avatar", headers=headers, files=file_data)
+
+    assert response.status_code == 413, response.text
+
+
+def test_birthday_reminders_are_sent_to_opted_in_users(client, get_token, monkeypatch):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    today = scheduler.today()
+    response = client.post(
+        "/api/contacts",
+        json={
+            "first_name": "Lesya",
+            "last_name": "Ukrainka",
+            "email": "lesya@email.com",
+            "phone": "380-222-2222",
+            "birthday": today.replace(year=1871).isoformat(),
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+
+    sender = EmailSender(MemoryBackend(), concurrency=2)
+    monkeypatch.setattr("src.services.reminders.email_sender", sender)
+    asyncio.run(birthday_reminders.send(today))
+    assert sender.backend.outbox == []
+
+    response = client.patch(
+        "api/users/birthday_reminders", json={"enabled": True}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["birthday_reminders"] is True
 
-    mock_upload_file.assert_called_once()
+    asyncio.run(birthday_reminders.send(today))
+    [message] = sender.backend.outbox
+    assert message["To"] == test_user["email"]
+    assert "Lesya Ukrainka" in message.get_content()
@@ -1,7 +1,13 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
 import pytest
 
+from src.services.scheduler import scheduler
+
 # !!! Redis needs to be running !!!
 
+
 @pytest.fixture
 def test_contact_data():
     return {
@@ -82,3 +88,196 @@ def test_delete_contact(client, get_token):
     data = response.json()
     assert "id" in data
     assert data["first_name"] == "John"
+
+
+def test_missing_contact_is_negatively_cached(
+    client, get_token, test_contact_data, monkeypatch
+):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.get("/api/contacts/1", headers=headers)
+    assert response.status_code == 404, response.text
+
+    mock_get_contact = AsyncMock()
+    monkeypatch.setattr(
+        "src.api.contacts.ContactBookService.get_contact", mock_get_contact
+    )
+    response = client.get("/api/contacts/1", headers=headers)
+    assert response.status_code == 404, response.text
+    mock_get_contact.assert_not_called()
+    monkeypatch.undo()
+
+    response = client.post("/api/contacts", json=test_contact_data, headers=headers)
+    assert response.status_code == 201, response.text
+    assert response.json()["id"] == 1
+    response = client.get("/api/contacts/1", headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def test_birthdays_digest_follows_contact_changes(client, get_token, test_contact_data):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    today = scheduler.today()
+    body = {**test_contact_data, "birthday": today.replace(year=1990).isoformat()}
+    response = client.post("/api/contacts", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    contact_id = response.json()["id"]
+
+    response = client.get("/api/contacts/birthdays/", headers=headers)
+    assert response.status_code == 200, response.text
+    assert contact_id in [c["id"] for c in response.json()]
+
+    response = client.patch(
+        f"/api/contacts/{contact_id}", json={"first_name": "Marko"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    response = client.get("/api/contacts/birthdays/", headers=headers)
+    [contact] = [c for c in response.json() if c["id"] == contact_id]
+    assert contact["first_name"] == "Marko"
+
+    far_away = (today + timedelta(days=60)).replace(year=1990)
+    response = client.patch(
+        f"/api/contacts/{contact_id}",
+        json={"birthday": far_away.isoformat()},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.get("/api/contacts/birthdays/", headers=headers)
+    assert response.status_code == 200, response.text
+    assert contact_id not in [c["id"] for c in response.json()]
+
+
+def test_birthdays_window_and_time_zone(client, get_token, test_contact_data):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    in_three_weeks = (scheduler.today() + timedelta(days=21)).replace(year=1990)
+    body = {**test_contact_data, "birthday": in_three_weeks.isoformat()}
+    response = client.post("/api/contacts", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    contact_id = response.json()["id"]
+
+    response = client.get("/api/contacts/birthdays/", headers=headers)
+    assert contact_id not in [c["id"] for c in response.json()]
+
+    response = client.get(
+        "/api/contacts/birthdays/",
+        params={"days": 30, "tz": "Pacific/Kiritimati"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert contact_id in [c["id"] for c in response.json()]
+
+    response = client.get(
+        "/api/contacts/birthdays/", params={"tz": "Mars/Olympus"}, headers=headers
+    )
+    assert response.status_code == 400, response.text
+    response = client.get(
+        "/api/contacts/birthdays/", params={"days": 400}, headers=headers
+    )
+    assert response.status_code == 422, response.text
+
+
+def test_contact_stats(client, get_token, test_contact_data):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.get("/api/contacts/stats/", headers=headers)
+    assert response.status_code == 200, response.text
+    before = response.json()
+    assert len(before["birthdays_by_month"]) == 12
+    assert sum(m["count"] for m in before["birthdays_by_month"]) == before["total"]
+
+    body = {**test_contact_data, "email": "ivan.franko@Lviv.UA"}
+    response = client.post("/api/contacts", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+
+    response = client.get(
+        "/api/contacts/stats", headers=headers, follow_redirects=False
+    )
+    assert response.status_code == 200, response.text
+    stats = response.json()
+    assert stats["total"] == before["total"] + 1
+    assert stats["birthdays_by_month"][2] == {
+        "month": 3,
+        "count": before["birthdays_by_month"][2]["count"] + 1,
+    }
+    assert {"domain": "lviv.ua", "count": 1} in stats["email_domains"]
+
+
+def test_total_count_headers(client, get_token, test_contact_data, monkeypatch):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    response = client.get("/api/contacts", headers=headers)
+    assert "X-Total-Count" not in response.headers
+    total = len(response.json())
+
+    response = client.get(
+        "/api/contacts", params={"include_total": True, "limit": 1}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["X-Total-Count"] == str(total)
+
+    response = client.post("/api/contacts", json=test_contact_data, headers=headers)
+    contact_id = response.json()["id"]
+    response = client.get(
+        "/api/contacts", params={"include_total": True}, headers=headers
+    )
+    assert response.headers["X-Total-Count"] == str(total + 1)
+    client.delete(f"/api/contacts/{contact_id}", headers=headers)
+
+    params = {"query": "Taras", "include_total": True}
+    response = client.get("/api/contacts/find/", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    found = len(response.json())
+    assert response.headers["X-Total-Count"] == str(found)
+
+    monkeypatch.setattr("src.api.contacts.settings.FIND_COUNT_LIMIT", 1)
+    response = client.get(
+        "/api/contacts/find/", params={**params, "limit": 1}, headers=headers
+    )
+    assert response.headers["X-Total-Count"] == "1"
+    assert response.headers["X-Total-Count-Estimated"] == "true"
+
+
+def test_suggest_contacts(client, get_token, test_contact_data):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    body = {**test_contact_data, "first_name": "Mykhailo", "last_name": "Kotsiubynsky"}
+    response = client.post("/api/contacts", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    contact_id = response.json()["id"]
+
+    response = client.get(
+        "/api/contacts/suggest",
+        params={"prefix": "KOTS"},
+        headers=headers,
+        follow_redirects=False,
+    )
+    assert response.status_code == 200, response.text
+    assert [s["id"] for s in response.json()] == [contact_id]
+
+    response = client.get(
+        "/api/contacts/suggest/", params={"prefix": "%"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == []
+
+
+def test_get_contacts_by_phone(client, get_token, test_contact_data):
+    headers = {"Authorization": f"Bearer {get_token}"}
+    body = {**test_contact_data, "phone": "(067) 123 45 67"}
+    response = client.post("/api/contacts", json=body, headers=headers)
+    assert response.status_code == 201, response.text
+    contact_id = response.json()["id"]
+    assert response.json()["phone_e164"] == "+380671234567"
+
+    response = client.get("/api/contacts/by-phone/+380671234567", headers=headers)
+    assert response.status_code == 200, response.text
+    assert [c["id"] for c in response.json()] == [contact_id]
+
+    response = client.patch(
+        f"/api/contacts/{contact_id}", json={"phone": "0441234567"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    response = client.get("/api/contacts/by-phone/0671234567", headers=headers)
+    assert response.json() == []
+    response = client.get("/api/contacts/by-phone/00380441234567", headers=headers)
+    assert [c["id"] for c in response.json()] == [contact_id]
+
+    response = client.get("/api/contacts/by-phone/12", headers=headers)
+    assert response.status_code == 400, response.text
+    client.delete(f"/api/contacts/{contact_id}", headers=headers)
@@ -0,0 +1,18 @@
+from src.services.limiter import rate_limit_storage_uri
+
+
+def test_storage_defaults_to_shared_redis(monkeypatch):
+    monkeypatch.setattr("src.services.limiter.settings.RATE_LIMIT_STORAGE_URI", None)
+    monkeypatch.setattr("src.services.limiter.settings.REDIS_HOST", "redis")
+    monkeypatch.setattr("src.services.limiter.settings.REDIS_PORT", 6380)
+    monkeypatch.setattr("src.services.limiter.settings.REDIS_PASSWORD", "p@ss")
+
+    assert rate_limit_storage_uri() == "redis://:p%40ss@redis:6380/0"
+
+
+def test_explicit_storage_is_used(monkeypatch):
+    monkeypatch.setattr(
+        "src.services.limiter.settings.RATE_LIMIT_STORAGE_URI", "memory://"
+    )
+
+    assert rate_limit_storage_uri() == "memory://"
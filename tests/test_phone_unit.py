@@ -0,0 +1,22 @@
+import pytest
+
+from src.utils.phone import normalize_phone
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("+380 (44) 123-45-67", "+380441234567"),
+        ("00380441234567", "+380441234567"),
+        ("380441234567", "+380441234567"),
+        ("044 123 45 67", "+380441234567"),
+        ("441234567", "+380441234567"),
+        ("+1 202 555 0143", "+12025550143"),
+        ("12", None),
+        ("+0441234567", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw, country_code="380") == expected
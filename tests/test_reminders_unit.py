@@ -0,0 +1,36 @@
+import contextlib
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.services.reminders import BirthdayReminders
+
+
+@pytest.mark.asyncio
+async def test_reminders_are_sent_outside_the_session(monkeypatch):
+    sessions = []
+
+    @contextlib.asynccontextmanager
+    async def session_factory():
+        sessions.append("open")
+        yield Mock()
+        sessions[-1] = "closed"
+
+    user = Mock(id=1, email="taras@email.com", username="Taras")
+    batches = [[Mock(user_id=1, user=user)], []]
+    service = Mock(get_reminder_birthdays=AsyncMock(side_effect=batches))
+    monkeypatch.setattr("src.services.reminders.ContactBookService", lambda db: service)
+    monkeypatch.setattr("src.services.reminders.build_reminder", Mock())
+
+    async def send_batch(batch):
+        assert sessions == ["closed"]
+        return len(batch)
+
+    sender = Mock(send_batch=AsyncMock(side_effect=send_batch))
+    monkeypatch.setattr("src.services.reminders.email_sender", sender)
+
+    await BirthdayReminders(session_factory).send(date(2026, 3, 9))
+
+    sender.send_batch.assert_awaited_once()
+    assert service.get_reminder_birthdays.await_args_list[1].args[2] == 1
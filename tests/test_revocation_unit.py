@@ -0,0 +1,57 @@
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.revocation import BloomFilter, RevocationList
+
+
+def test_bloom_filter_membership():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def make_revocation_list(capacity=100):
+    client = MagicMock()
+    client.set = AsyncMock()
+    client.publish = AsyncMock()
+    client.exists = AsyncMock(return_value=0)
+    return RevocationList(MagicMock(client=client), capacity, 0.01), client
+
+
+@pytest.mark.asyncio
+async def test_unknown_token_skips_redis():
+    revocations, client = make_revocation_list()
+
+    assert await revocations.is_revoked("unknown") is False
+    client.exists.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_revoke_stores_and_publishes():
+    revocations, client = make_revocation_list()
+
+    await revocations.revoke("abc", time.time() + 60)
+
+    assert await revocations.is_revoked("abc") is True
+    client.set.assert_awaited_once()
+    assert client.set.await_args.args[0] == "revoked:abc"
+    client.publish.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bloom_is_rebuilt_without_expired_tokens():
+    revocations, _ = make_revocation_list(capacity=4)
+
+    for i in range(4):
+        await revocations.revoke(f"old-{i}", time.time() - 1)
+    await revocations.revoke("fresh", time.time() + 60)
+
+    assert list(revocations._revoked) == ["fresh"]
+    assert await revocations.is_revoked("fresh") is True
+    assert await revocations.is_revoked("old-0") is False
@@ -0,0 +1,140 @@
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.database.models import Contact
+from src.repository.contacts import birthday_window
+from src.services.birthdays import BirthdayDigest, in_birthday_window
+from src.services.scheduler import Scheduler
+
+
+@pytest.mark.asyncio
+async def test_job_runs_only_on_leader():
+    redis_cache = AsyncMock()
+    redis_cache.acquire_lock.side_effect = [True, False]
+    job = AsyncMock()
+    scheduler = Scheduler(redis_cache, "Europe/Kyiv")
+    scheduler.daily("digest", job)
+
+    assert await scheduler.run_once("digest", date(2026, 10, 19)) is True
+    assert await scheduler.run_once("digest", date(2026, 10, 19)) is False
+
+    job.assert_awaited_once_with(date(2026, 10, 19))
+    redis_cache.acquire_lock.assert_awaited_with(
+        "scheduler:digest:2026-10-19", 26 * 3600
+    )
+
+
+@pytest.mark.asyncio
+async def test_job_runs_without_redis():
+    redis_cache = AsyncMock()
+    redis_cache.acquire_lock.return_value = None
+    job = AsyncMock(side_effect=RuntimeError("boom"))
+    scheduler = Scheduler(redis_cache, "Europe/Kyiv")
+    scheduler.daily("digest", job)
+
+    assert await scheduler.run_once("digest", date(2026, 10, 19)) is True
+    job.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_locked_job_is_skipped_without_redis():
+    redis_cache = AsyncMock()
+    redis_cache.acquire_lock.return_value = None
+    job = AsyncMock()
+    scheduler = Scheduler(redis_cache, "Europe/Kyiv")
+    scheduler.daily("reminders", job, require_lock=True)
+
+    assert await scheduler.run_once("reminders", date(2026, 10, 19)) is False
+    job.assert_not_awaited()
+
+
+def test_birthday_md_is_set_from_birthday():
+    assert Contact(birthday=date(1814, 3, 9)).birthday_md == 309
+    assert Contact(birthday="2000-02-29").birthday_md == 229
+
+
+def test_birthday_window_wraps_year():
+    condition, _ = birthday_window(date(2026, 12, 28), 7)
+    sql = str(condition.compile(compile_kwargs={"literal_binds": True}))
+
+    assert "birthday_md >= 1228" in sql
+    assert "birthday_md <= 104" in sql
+
+
+def test_in_birthday_window_matches_sql_bounds():
+    assert in_birthday_window(date(1990, 1, 3), date(2026, 12, 28), 7)
+    assert not in_birthday_window(date(1990, 1, 5), date(2026, 12, 28), 7)
+    assert in_birthday_window(date(2000, 2, 29), date(2027, 2, 27), 2)
+    assert not in_birthday_window(date(2000, 2, 29), date(2027, 2, 20), 8)
+
+
+@pytest.mark.asyncio
+async def test_digest_change_invalidates_affected_days(monkeypatch):
+    cache = AsyncMock()
+    monkeypatch.setattr("src.services.birthdays.cache", cache)
+    monkeypatch.setattr(
+        "src.services.birthdays.scheduler.today", lambda: date(2026, 12, 30)
+    )
+    birthdays = BirthdayDigest(7)
+
+    await birthdays.apply_change(5, date(1990, 1, 2))
+
+    cache.delete.assert_awaited_once_with(
+        "bdays:5:2026-12-29", "bdays:5:2026-12-30", "bdays:5:2026-12-31"
+    )
+
+    cache.reset_mock()
+    await birthdays.apply_change(5, date(1990, 6, 1))
+    cache.delete.assert_not_awaited()
+
+
+class FakeCache:
+    def __init__(self):
+        self.data = {}
+
+    async def get_object(self, key, codec):
+        await asyncio.sleep(0)
+        return key in self.data, self.data.get(key)
+
+    async def set_object(self, key, codec, value, ttl):
+        await asyncio.sleep(0)
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        await asyncio.sleep(0)
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_digest_changes_are_not_lost(monkeypatch):
+    today = date(2026, 10, 19)
+    stored = []
+
+    class FakeContactBookService:
+        def __init__(self, db):
+            pass
+
+        async def get_birthdays(self, user_id, day, days):
+            return [c for c in stored if in_birthday_window(c.birthday, day, days)]
+
+    monkeypatch.setattr("src.services.birthdays.cache", FakeCache())
+    monkeypatch.setattr(
+        "src.services.birthdays.ContactBookService", FakeContactBookService
+    )
+    monkeypatch.setattr("src.services.birthdays.scheduler.today", lambda: today)
+    birthdays = BirthdayDigest(7)
+    assert await birthdays.get(None, 5) == []
+
+    stored.append(SimpleNamespace(id=1, birthday=date(1990, 10, 20)))
+    stored.append(SimpleNamespace(id=2, birthday=date(1990, 10, 21)))
+    await asyncio.gather(
+        birthdays.apply_change(5, date(1990, 10, 20)),
+        birthdays.apply_change(5, date(1990, 10, 21)),
+    )
+
+    assert [c.id for c in await birthdays.get(None, 5)] == [1, 2]
@@ -0,0 +1,52 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from src.schemas import ContactGet
+from src.services.serialization import CacheFormatError, ModelCodec
+
+
+def make_contact(contact_id=1):
+    return SimpleNamespace(
+        id=contact_id,
+        first_name="Taras",
+        last_name="Shevchenko",
+        email="taras@email.com",
+        phone="380-111-1111",
+        birthday=date(1814, 3, 9),
+        info="not cached",
+    )
+
+
+def test_roundtrip_single_and_none():
+    codec = ModelCodec(ContactGet)
+
+    contact = codec.loads(codec.dumps(make_contact()))
+
+    assert isinstance(contact, ContactGet)
+    assert contact.birthday == date(1814, 3, 9)
+    assert codec.loads(codec.dumps(None)) is None
+
+
+def test_large_lists_are_compressed():
+    codec = ModelCodec(ContactGet, compress_min_size=512)
+    contacts = [make_contact(i) for i in range(50)]
+
+    data = codec.dumps(contacts)
+
+    assert data[4] & 0x02
+    assert len(data) < 512
+    assert [c.id for c in codec.loads(data)] == list(range(50))
+
+
+def test_other_schema_version_is_rejected():
+    class OtherContact(ContactGet):
+        nickname: str = ""
+
+    data = ModelCodec(OtherContact).dumps(make_contact())
+
+    with pytest.raises(CacheFormatError):
+        ModelCodec(ContactGet).loads(data)
+    with pytest.raises(CacheFormatError):
+        ModelCodec(ContactGet).loads(b"\x80\x04\x95pickle")
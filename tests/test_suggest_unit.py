@@ -0,0 +1,61 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.database.models import User
+from src.repository.contacts import escape_like
+from src.services.suggest import ContactSuggester, PrefixIndex
+
+ENTRIES = [
+    (1, "Taras", "Shevchenko", "taras@email.com"),
+    (2, "Lesya", "Ukrainka", "lesya@email.com"),
+    (3, "Ivan", "Franko", "ivan@lviv.ua"),
+    (4, "Taisiya", "Bilous", "t.bilous@email.com"),
+]
+
+
+def test_prefix_index_orders_by_name():
+    index = PrefixIndex(ENTRIES, max_limit=10)
+
+    assert [s.id for s in index.search("TA", 10)] == [4, 1]
+    assert [s.id for s in index.search("ta", 1)] == [4]
+    assert [s.id for s in index.search("ukr", 10)] == [2]
+    assert [s.id for s in index.search("ivan@", 10)] == [3]
+    assert index.search("zz", 10) == []
+
+
+def test_escape_like():
+    assert escape_like("50%_a\\b") == "50\\%\\_a\\\\b"
+
+
+@pytest.mark.asyncio
+async def test_suggester_caches_index_until_invalidated(monkeypatch):
+    service = MagicMock()
+    service.count_contacts = AsyncMock(return_value=len(ENTRIES))
+    service.get_suggestion_entries = AsyncMock(return_value=ENTRIES)
+    monkeypatch.setattr("src.services.suggest.ContactBookService", lambda db: service)
+    suggester = ContactSuggester(min_contacts=2, max_users=4, ttl=60)
+    user = User(id=7)
+
+    assert [s.id for s in await suggester.suggest(None, user, "les", 5)] == [2]
+    assert [s.id for s in await suggester.suggest(None, user, "iv", 5)] == [3]
+    service.get_suggestion_entries.assert_awaited_once()
+
+    suggester.invalidate(["contacts:7", "suggest:7"])
+    await suggester.suggest(None, user, "les", 5)
+    assert service.get_suggestion_entries.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_small_books_use_database(monkeypatch):
+    service = MagicMock()
+    service.count_contacts = AsyncMock(return_value=1)
+    service.suggest_contacts = AsyncMock(return_value=[])
+    monkeypatch.setattr("src.services.suggest.ContactBookService", lambda db: service)
+    suggester = ContactSuggester(min_contacts=2, max_users=4, ttl=60)
+
+    await suggester.suggest(None, User(id=7), "les", 5)
+    await suggester.suggest(None, User(id=7), "lesy", 5)
+
+    service.count_contacts.assert_awaited_once()
+    assert service.suggest_contacts.await_count == 2
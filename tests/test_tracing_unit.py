@@ -0,0 +1,89 @@
+import pytest
+
+from src.services.cache import cache
+from src.services.tracing import (
+    FileSpanExporter,
+    InMemorySpanExporter,
+    Tracer,
+    parse_traceparent,
+    traced,
+    tracer,
+)
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    return exporter
+
+
+def test_nested_spans_share_trace_id():
+    local_tracer = Tracer(InMemorySpanExporter())
+
+    with local_tracer.start_span("outer") as outer:
+        with local_tracer.start_span("inner") as inner:
+            pass
+
+    assert inner.trace_id == outer.trace_id
+    assert inner.parent_id == outer.span_id
+    assert [s.name for s in local_tracer.exporter.spans] == ["inner", "outer"]
+
+
+def test_file_exporter_keeps_file_open(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    local_tracer = Tracer(FileSpanExporter(str(path)))
+
+    with local_tracer.start_span("first"):
+        pass
+    handle = local_tracer.exporter._file
+    with local_tracer.start_span("second"):
+        pass
+
+    assert local_tracer.exporter._file is handle
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+    local_tracer.shutdown()
+    assert handle.closed
+
+
+def test_span_continues_incoming_traceparent():
+    local_tracer = Tracer()
+    header = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+    with local_tracer.start_span("request", traceparent=header) as span:
+        pass
+
+    assert span.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert span.parent_id == "b7ad6b7169203331"
+
+
+def test_parse_invalid_traceparent():
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent("00-" + "0" * 32 + "-b7ad6b7169203331-01") is None
+
+
+@pytest.mark.asyncio
+async def test_traced_marks_errors(exporter):
+    @traced("failing")
+    async def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await failing()
+
+    assert exporter.spans[-1].name == "failing"
+    assert exporter.spans[-1].status == "ERROR"
+
+
+def test_request_span_and_db_spans(client, get_token, exporter):
+    cache.local.clear()
+    response = client.get(
+        "api/users/me", headers={"Authorization": f"Bearer {get_token}"}
+    )
+
+    assert response.status_code == 200, response.text
+    trace_id = response.headers["x-trace-id"]
+    names = [s.name for s in exporter.spans if s.trace_id == trace_id]
+    assert "HTTP GET /api/users/me" in names
+    assert "repository.UserRepository.get_user_by_username" in names
+    assert "db.statement" in names
@@ -79,6 +79,20 @@ async def test_get_user_by_email(user_repository, mock_session, user):
     mock_session.execute.return_value.scalar_one_or_none.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_get_users_by_email_or_username(user_repository, mock_session, user):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [user]
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    result = await user_repository.get_users_by_email_or_username(
+        "test@email.com", "testuser"
+    )
+
+    assert result == [user]
+    mock_session.execute.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_create_user(user_repository, mock_session, user, user_data):
     mock_result = MagicMock()
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from src.services.warmup import CacheWarmer
+
+
+@pytest.mark.asyncio
+async def test_warm_up_concurrency_is_capped(monkeypatch):
+    warmer = CacheWarmer(concurrency=2)
+    running = []
+    peak = []
+
+    async def fake_warm(user_id):
+        running.append(user_id)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(user_id)
+
+    monkeypatch.setattr(warmer, "_warm", fake_warm)
+
+    await asyncio.gather(*(warmer.warm_user(i) for i in range(6)))
+
+    assert len(peak) == 6
+    assert max(peak) == 2
+
+
+@pytest.mark.asyncio
+async def test_duplicate_warm_up_is_skipped(monkeypatch):
+    warmer = CacheWarmer(concurrency=2)
+    calls = []
+
+    async def fake_warm(user_id):
+        calls.append(user_id)
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(warmer, "_warm", fake_warm)
+
+    await asyncio.gather(warmer.warm_user(1), warmer.warm_user(1))
+
+    assert calls == [1]